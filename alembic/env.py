@@ -14,8 +14,10 @@ load_dotenv()
 # access to the values within the .ini file in use.
 config = context.config
 
-# Prefer DATABASE_URL from environment (e.g. Render) over the ini file value
-db_url = os.getenv("DATABASE_URL")
+# Prefer the environment (e.g. Render) over the ini file value; migrations
+# take session-level settings, so a direct MIGRATION_DATABASE_URL (bypassing
+# PgBouncer) wins over DATABASE_URL
+db_url = os.getenv("MIGRATION_DATABASE_URL") or os.getenv("DATABASE_URL")
 if db_url:
     config.set_main_option("sqlalchemy.url", db_url)
 
@@ -29,9 +31,17 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 from app.core.database import Base
+from app.core.online_migrations import MIGRATION_LOCK_TIMEOUT_MS
 from app.models.user import User
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.models.seat_counter import CourseSeatCounter
+from app.models.auth_revocation import AuthRevocation
+from app.models.cache_version import CacheVersion
+from app.models.waitlist import WaitlistEntry
+from app.models.outbox import OutboxEvent
+from app.models.enrollment_change import EnrollmentChange
+from app.models.change_log_horizon import ChangeLogHorizon
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -78,6 +88,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # DDL queued behind a long transaction blocks every query behind
+            # it; give up quickly instead (the next deploy retries)
+            connection.exec_driver_sql(f"SET lock_timeout = {MIGRATION_LOCK_TIMEOUT_MS}")
+            connection.commit()
+
         context.configure(
             connection=connection, target_metadata=target_metadata
         )
@@ -0,0 +1,56 @@
+"""Unique (user_id, course_id) on enrollments
+
+Revision ID: a3c9e1f0b7d2
+Revises: 5100fb246f4e
+Create Date: 2026-10-17 09:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.online_migrations import (
+    add_unique_constraint_concurrently, create_index_concurrently, drop_index_concurrently, execute_in_batches,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f0b7d2'
+down_revision: Union[str, Sequence[str], None] = '5100fb246f4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # enrollments has no index yet: a temporary one keeps each batch's
+    # duplicate probe from scanning the whole table
+    create_index_concurrently("ix_enrollments_user_course_dedupe", "enrollments", ["user_id", "course_id"])
+    # Racing enrollments may already have produced duplicates; keep the oldest row.
+    # Duplicates written by old workers after this fail the unique build;
+    # the next deploy drops the invalid index and dedupes again.
+    execute_in_batches(
+        "enrollments",
+        """
+        DELETE FROM enrollments AS a
+        WHERE {batch}
+          AND EXISTS (
+            SELECT 1 FROM enrollments b
+            WHERE b.user_id = a.user_id
+              AND b.course_id = a.course_id
+              AND b.id < a.id
+          )
+        """,
+        range_key="a.id",
+    )
+    add_unique_constraint_concurrently("uq_enrollments_user_course", "enrollments", ["user_id", "course_id"])
+    drop_index_concurrently("ix_enrollments_user_course_dedupe", "enrollments")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == "postgresql":
+        op.drop_constraint("uq_enrollments_user_course", "enrollments", type_="unique")
+    else:
+        op.drop_index("uq_enrollments_user_course", table_name="enrollments")
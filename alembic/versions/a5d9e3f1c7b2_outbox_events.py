@@ -0,0 +1,40 @@
+"""Transactional outbox for enrollment events
+
+Revision ID: a5d9e3f1c7b2
+Revises: f3a7c9e2b5d8
+Create Date: 2026-10-17 19:12:08.240577
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d9e3f1c7b2'
+down_revision: Union[str, Sequence[str], None] = 'f3a7c9e2b5d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_outbox_events_available_at_id", "outbox_events", ["available_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outbox_events_available_at_id", table_name="outbox_events")
+    op.drop_table("outbox_events")
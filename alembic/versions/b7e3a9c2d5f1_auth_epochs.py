@@ -0,0 +1,39 @@
+"""Per-user auth epoch and the revocation log
+
+Revision ID: b7e3a9c2d5f1
+Revises: e8b2f4c6d1a9
+Create Date: 2026-10-17 14:22:08.517390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3a9c2d5f1'
+down_revision: Union[str, Sequence[str], None] = 'e8b2f4c6d1a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("auth_epoch", sa.Integer(), server_default="0", nullable=False))
+
+    op.create_table(
+        "auth_revocations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("epoch", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_auth_revocations_created_at", "auth_revocations", ["created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_auth_revocations_created_at", table_name="auth_revocations")
+    op.drop_table("auth_revocations")
+    op.drop_column("users", "auth_epoch")
@@ -0,0 +1,62 @@
+"""Enrollment change log for the incremental change feed
+
+Revision ID: b8e4f2a6c9d3
+Revises: a5d9e3f1c7b2
+Create Date: 2026-10-17 20:31:55.907164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.online_migrations import execute_in_batches
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4f2a6c9d3'
+down_revision: Union[str, Sequence[str], None] = 'a5d9e3f1c7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "enrollment_changes",
+        sa.Column("seq", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("txid", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("op", sa.String(), nullable=False),
+        sa.Column("enrollment_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("enrolled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sqlite_autoincrement=True,
+    )
+    op.create_table(
+        "change_log_horizons",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("txid", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("seq", sa.BigInteger(), server_default="0", nullable=False),
+    )
+    op.create_index("ix_enrollment_changes_txid_seq", "enrollment_changes", ["txid", "seq"])
+    op.create_index("ix_enrollment_changes_enrollment_id", "enrollment_changes", ["enrollment_id"])
+    # Existing enrollments enter the log as inserts (txid 0: before any
+    # feed reader), so reading from the start yields the full table. Copied
+    # in id ranges, each its own transaction, so enrollments is never held
+    # for the whole table.
+    execute_in_batches(
+        "enrollments",
+        "INSERT INTO enrollment_changes (txid, op, enrollment_id, user_id, course_id, enrolled_at) "
+        "SELECT 0, 'insert', id, user_id, course_id, created_at FROM enrollments "
+        "WHERE {batch} AND user_id IS NOT NULL AND course_id IS NOT NULL ORDER BY id",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_enrollment_changes_enrollment_id", table_name="enrollment_changes")
+    op.drop_index("ix_enrollment_changes_txid_seq", table_name="enrollment_changes")
+    op.drop_table("change_log_horizons")
+    op.drop_table("enrollment_changes")
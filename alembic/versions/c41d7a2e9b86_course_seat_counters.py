@@ -0,0 +1,49 @@
+"""Denormalized seat counters on courses
+
+Revision ID: c41d7a2e9b86
+Revises: a3c9e1f0b7d2
+Create Date: 2026-10-17 10:03:51.402216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7a2e9b86'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f0b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("courses", sa.Column("enrolled_count", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("courses", sa.Column("counter_shards", sa.Integer(), server_default="1", nullable=False))
+
+    op.create_table(
+        "course_seat_counters",
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("shard", sa.Integer(), primary_key=True),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("enrolled_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # Backfill from the existing enrollments
+    op.execute(
+        """
+        UPDATE courses
+        SET enrolled_count = counts.n
+        FROM (SELECT course_id, count(*) AS n FROM enrollments GROUP BY course_id) AS counts
+        WHERE counts.course_id = courses.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("course_seat_counters")
+    op.drop_column("courses", "counter_shards")
+    op.drop_column("courses", "enrolled_count")
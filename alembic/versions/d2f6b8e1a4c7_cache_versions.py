@@ -0,0 +1,32 @@
+"""Shared version counters for response caches
+
+Revision ID: d2f6b8e1a4c7
+Revises: b7e3a9c2d5f1
+Create Date: 2026-10-17 16:41:27.093512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8e1a4c7'
+down_revision: Union[str, Sequence[str], None] = 'b7e3a9c2d5f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("cache_versions")
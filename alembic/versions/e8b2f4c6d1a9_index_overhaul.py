@@ -0,0 +1,41 @@
+"""Indexes for enrollment, user and course lookups
+
+Revision ID: e8b2f4c6d1a9
+Revises: c41d7a2e9b86
+Create Date: 2026-10-17 11:20:07.663019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2f4c6d1a9'
+down_revision: Union[str, Sequence[str], None] = 'c41d7a2e9b86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, kwargs). The (user_id, course_id) unique constraint
+# from a3c9e1f0b7d2 already covers lookups by user_id.
+INDEXES = [
+    ("ix_enrollments_course_id_created_at", "enrollments", ["course_id", "created_at"], {}),
+    ("ix_enrollments_created_at", "enrollments", ["created_at", "id"], {}),
+    ("ix_users_email_lower", "users", [sa.text("lower(email)")], {}),
+    ("ix_courses_active", "courses", ["id"], {"postgresql_where": sa.text("is_active")}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns, kwargs in INDEXES:
+        create_index_concurrently(name, table, columns, **kwargs)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _ in reversed(INDEXES):
+        drop_index_concurrently(name, table)
@@ -0,0 +1,38 @@
+"""Course waitlists
+
+Revision ID: f3a7c9e2b5d8
+Revises: d2f6b8e1a4c7
+Create Date: 2026-10-17 18:02:44.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c9e2b5d8'
+down_revision: Union[str, Sequence[str], None] = 'd2f6b8e1a4c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "waitlist_entries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("course_id", sa.Integer(), sa.ForeignKey("courses.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("user_id", "course_id", name="uq_waitlist_entries_user_course"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_waitlist_entries_course_id_id", "waitlist_entries", ["course_id", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_waitlist_entries_course_id_id", table_name="waitlist_entries")
+    op.drop_table("waitlist_entries")
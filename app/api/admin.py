@@ -1,5 +1,187 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import csv
+import io
 import os
 import logging
+import orjson
 
-router = APIRouter()
+from app.core.database import get_sessionmaker
+from app.core.hashing import password_hasher
+from app.core.replicas import replica_set
+from app.crud.course import upsert_courses
+from app.deps import get_db, get_current_admin, ReleaseSessionRoute
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.schemas.course import CourseCreate, CourseImportResult
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"], route_class=ReleaseSessionRoute)
+
+# Rows fetched per server-side cursor round trip and written per response chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Validated rows per upsert round trip when importing
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+# Rejected rows reported back in detail; past this only the count grows
+IMPORT_MAX_REJECTS = 1000
+
+IMPORT_SUFFIXES = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def _export_statement(course_id: int | None, details: bool):
+    columns = [Enrollment.id, Enrollment.user_id, Enrollment.course_id, Enrollment.created_at]
+    stmt = select(*columns)
+    if details:
+        stmt = (
+            select(*columns, User.email.label("user_email"), Course.code.label("course_code"))
+            .join(User, User.id == Enrollment.user_id)
+            .join(Course, Course.id == Enrollment.course_id)
+        )
+    if course_id is not None:
+        stmt = stmt.where(Enrollment.course_id == course_id)
+    return stmt.order_by(Enrollment.id)
+
+
+def _stream_rows(stmt, fmt: str):
+    """Yield the export in chunks of EXPORT_BATCH_SIZE rows from a server-side cursor.
+
+    The generator owns its session so the connection is held exactly as long
+    as the response is streaming, and memory stays flat regardless of row count.
+    """
+    db = get_sessionmaker()()
+    try:
+        result = db.execute(stmt, execution_options={"stream_results": True, "yield_per": EXPORT_BATCH_SIZE})
+        header = list(result.keys())
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(header)
+            yield buffer.getvalue()
+        for batch in result.partitions():
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(
+                    [value.isoformat() if hasattr(value, "isoformat") else value for value in row]
+                    for row in batch
+                )
+                yield buffer.getvalue()
+            else:
+                yield b"".join(orjson.dumps(dict(zip(header, row))) + b"\n" for row in batch)
+    except Exception:
+        logging.exception("Enrollment export failed mid-stream")
+        raise
+    finally:
+        db.close()
+
+
+@router.get("/export/enrollments")
+def export_enrollments(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    course_id: int | None = Query(None, description="Only export this course's roster"),
+    details: bool = Query(False, description="Join the student's email and the course code"),
+    admin_user = Depends(get_current_admin),
+):
+    """Stream all enrollments (or one course's roster) as NDJSON or CSV (admin only)."""
+    filename = f"enrollments{f'_course_{course_id}' if course_id is not None else ''}.{format}"
+    return StreamingResponse(
+        _stream_rows(_export_statement(course_id, details), format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _import_records(upload, fmt: str):
+    """Yield (line_number, record) from the upload one row at a time.
+
+    Records are dicts; an NDJSON line that does not parse comes back as None.
+    """
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line_number, None
+
+
+def _validation_message(error: ValidationError):
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors())
+
+
+@router.post("/import/courses", response_model=CourseImportResult)
+def import_courses(
+    file: UploadFile = File(...),
+    format: str | None = Query(None, pattern="^(ndjson|csv)$", description="Defaults to the file extension"),
+    db: Session = Depends(get_db),
+    admin_user = Depends(get_current_admin),
+):
+    """Create or update (by code) courses from a CSV or NDJSON upload (admin only).
+
+    Rows are validated one at a time and upserted in batches of
+    IMPORT_BATCH_SIZE, each batch committed on its own, so memory stays flat
+    for large catalogs. Invalid rows are skipped and reported by line number.
+    """
+    fmt = format or IMPORT_SUFFIXES.get(os.path.splitext(file.filename or "")[1].lower())
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot tell the file format; pass format=csv or format=ndjson")
+
+    summary = {"inserted": 0, "updated": 0, "rejected": 0, "rejected_rows": []}
+    batch = {}
+
+    def reject(line: int, error: str):
+        summary["rejected"] += 1
+        if len(summary["rejected_rows"]) < IMPORT_MAX_REJECTS:
+            summary["rejected_rows"].append({"line": line, "error": error})
+
+    def flush():
+        inserted, updated = upsert_courses(db, list(batch.values()))
+        summary["inserted"] += len(inserted)
+        summary["updated"] += len(updated)
+        batch.clear()
+
+    line_number = 0
+    try:
+        for line_number, record in _import_records(file.file, fmt):
+            if not isinstance(record, dict):
+                reject(line_number, "Row is not a JSON object")
+                continue
+            try:
+                course = CourseCreate.model_validate(record)
+            except ValidationError as e:
+                reject(line_number, _validation_message(e))
+                continue
+            # A code repeated within one batch would hit the same row twice in a single upsert
+            if course.code in batch or len(batch) >= IMPORT_BATCH_SIZE:
+                flush()
+            batch[course.code] = course.model_dump()
+    except (csv.Error, UnicodeDecodeError) as e:
+        reject(line_number + 1, f"Unreadable input, import stopped: {e}")
+    if batch:
+        flush()
+    return summary
+
+
+@router.get("/password-hashing")
+def password_hashing_stats(admin_user = Depends(get_current_admin)):
+    """Hashing pool size, queue depth and recent per-call latencies, for tuning PASSWORD_HASH_ROUNDS (admin only)."""
+    return password_hasher.info()
+
+
+@router.get("/replicas")
+def replica_health(admin_user = Depends(get_current_admin)):
+    """Read replicas with their last health check result and replication lag (admin only)."""
+    return replica_set.info()
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+import sqlalchemy
+
+from app.api.auth import SignupRequest, UserOut, Token
+from app.crud.user import get_user_by_email, create_user, update_password_hash
+from app.core.hashing import password_hasher
+from app.core.security import create_user_token
+from app.deps import get_async_db, limit_login, ReleaseSessionRoute
+
+router = APIRouter(prefix="/api/v1/auth", tags=["Auth"], route_class=ReleaseSessionRoute)
+
+
+@router.post("/signup", response_model=UserOut)
+async def signup(user: SignupRequest, db: AsyncSession = Depends(get_async_db)):
+    """Sign up a new user."""
+    if user.role not in ("student", "admin"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid role")
+
+    try:
+        existing_user = await db.run_sync(get_user_by_email, user.email)
+    except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError):
+        logging.exception("Database error during signup")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Database error. Ensure migrations have been applied.")
+
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    # PBKDF2 is CPU-bound; it runs in the hashing process pool
+    hashed_pwd = await asyncio.wrap_future(password_hasher.hash(user.password))
+
+    try:
+        new_user = await db.run_sync(create_user, user.name, user.email, hashed_pwd, user.role)
+    except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError):
+        await db.rollback()
+        logging.exception("Database error when creating user")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Database error. Ensure migrations have been applied.")
+
+    return new_user
+
+
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Log in a user using form-encoded credentials."""
+    try:
+        user = await db.run_sync(get_user_by_email, form_data.username)
+    except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError):
+        logging.exception("Database error during login")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Database error. Ensure migrations have been applied.")
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+
+    matches, new_hash = await asyncio.wrap_future(password_hasher.verify(form_data.password, user.hashed_password))
+    if not matches:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+
+    # Stored with older hash parameters; upgrade it while we have the password
+    if new_hash:
+        await db.run_sync(update_password_hash, user, new_hash)
+
+    access_token = create_user_token(user)
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.course import CourseCreate, CourseOut, CourseUpdate, CourseWithStudentsOut
+from app.crud.course import (
+    create_course, update_course, delete_course, get_course as crud_get_course,
+    get_course_by_code, get_active_courses, get_active_course_row, get_course_students,
+)
+from app.crud.seats import seats_taken
+from app.core.pagination import PageParams, page_params
+from app.core.cache import catalog_cache, catalog_version, conditional_response
+from app.core.responses import json_bytes
+from app.schemas.pagination import Page
+from app.deps import get_async_db, get_async_read_db, get_current_admin_async, get_current_user_async, ReleaseSessionRoute
+
+router = APIRouter(prefix="/api/v1/course", tags=["Course"], route_class=ReleaseSessionRoute)
+
+
+@router.post("/", response_model=CourseOut)
+async def admin_create_course(course: CourseCreate, db: AsyncSession = Depends(get_async_db), admin_user = Depends(get_current_admin_async)):
+    existing_course = await db.run_sync(get_course_by_code, course.code)
+    if existing_course:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Course code already exists"
+        )
+
+    return await db.run_sync(create_course, course)
+
+
+@router.get("/", response_model=Page[CourseOut])
+async def get_all_courses(request: Request, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_read_db), current_user = Depends(get_current_user_async)):
+    # Cached serialized pages; response_model still documents the shape
+    async def load():
+        return json_bytes(await db.run_sync(get_active_courses, page))
+
+    key = ("list", tuple(page.after or ()), page.limit)
+    cached = await catalog_cache.load_async(key, await db.run_sync(catalog_version.current), load)
+    return conditional_response(request, *cached)
+
+
+@router.get("/{course_id}", response_model=CourseOut)
+async def get_course(course_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db), current_user = Depends(get_current_user_async)):
+    async def load():
+        row = await db.run_sync(get_active_course_row, course_id)
+        return json_bytes(row) if row else None
+
+    cached = await catalog_cache.load_async(("course", course_id), await db.run_sync(catalog_version.current), load)
+    if not cached:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return conditional_response(request, *cached)
+
+
+@router.put("/{course_id}", response_model=CourseOut)
+async def admin_update_course(course_id: int, payload: CourseUpdate, db: AsyncSession = Depends(get_async_db), admin_user = Depends(get_current_admin_async)):
+    course = await db.run_sync(crud_get_course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    return await db.run_sync(update_course, course, payload)
+
+
+@router.get("/{course_id}/students", response_model=CourseWithStudentsOut)
+async def get_course_with_students(
+    course_id: int,
+    sort: str = Query("enrolled_at", pattern="^(enrolled_at|name)$"),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_read_db),
+    admin_user = Depends(get_current_admin_async),
+):
+    course = await db.run_sync(crud_get_course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    roster = await db.run_sync(get_course_students, course_id, page, sort)
+
+    return {
+        "id": course.id,
+        "title": course.title,
+        "code": course.code,
+        "capacity": course.capacity,
+        "is_active": course.is_active,
+        "students": roster["items"],
+        "next_cursor": roster["next_cursor"],
+    }
+
+
+@router.delete("/{course_id}")
+async def admin_delete_course(course_id: int, db: AsyncSession = Depends(get_async_db), admin_user = Depends(get_current_admin_async)):
+    course = await db.run_sync(crud_get_course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    enrollments_count = await db.run_sync(seats_taken, course)
+    if enrollments_count > 0:
+        raise HTTPException(status_code=400, detail="Cannot delete course with active enrollments")
+
+    await db.run_sync(delete_course, course)
+    return {"message": "Course deleted successfully"}
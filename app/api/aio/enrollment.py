@@ -0,0 +1,167 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.schemas.enrollment import (
+    EnrollmentCreate, EnrollmentOut, BulkDeregisterRequest, BulkDeregisterResult,
+    BulkEnrollRequest, BulkEnrollResult, WaitlistStatus, ChangeFeedPage,
+)
+from app.crud.enrollment import (
+    EnrollmentError, enroll_student, get_enrollment, get_all_enrollments, get_user_enrollments, user_enrollments_version,
+    get_course_enrollments, remove_enrollment, bulk_remove_enrollments, bulk_enroll_students, join_waitlist,
+)
+from app.crud.waitlist import leave_waitlist, waitlist_position
+from app.crud.change_feed import CursorExpiredError, changes_since, decode_change_cursor
+from app.core.pagination import MAX_PAGE_SIZE, PageParams, page_params
+from app.core.cache import conditional_response, etag_matches, make_etag, not_modified
+from app.core.replicas import pin_to_primary
+from app.core.responses import FastJSONResponse, json_bytes
+from app.schemas.pagination import Page
+from app.deps import get_async_db, get_async_read_db, get_current_user_async, get_current_admin_async, ReleaseSessionRoute
+
+router = APIRouter(prefix="/api/v1/enrollment", tags=["Enrollment"], route_class=ReleaseSessionRoute)
+
+
+@router.post("/", response_model=EnrollmentOut)
+async def student_enroll(enrollment: EnrollmentCreate, response: Response, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user_async)):
+    # Only students may enroll themselves
+    if current_user.role != "student":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students may enroll in courses")
+
+    try:
+        new_enrollment = await db.run_sync(enroll_student, current_user.id, enrollment.course_id)
+    except EnrollmentError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Their next reads go to the primary, so they see this enrollment
+    pin_to_primary(response, current_user.id)
+    return new_enrollment
+
+
+@router.delete("/{course_id}", response_model=dict)
+async def student_deregister(course_id: int, response: Response, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user_async)):
+    if current_user.role != "student":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students may deregister from courses")
+
+    if not await db.run_sync(remove_enrollment, current_user.id, course_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
+
+    pin_to_primary(response, current_user.id)
+    return {"message": "Successfully deregistered from course"}
+
+
+@router.post("/waitlist/{course_id}", response_model=WaitlistStatus)
+async def student_join_waitlist(course_id: int, response: Response, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user_async)):
+    # Enrolls straight away while seats are left, queues the student otherwise
+    if current_user.role != "student":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students may join course waitlists")
+
+    try:
+        enrollment = await db.run_sync(join_waitlist, current_user.id, course_id)
+    except EnrollmentError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    pin_to_primary(response, current_user.id)
+    if enrollment is not None:
+        return {"course_id": course_id, "status": "enrolled", "enrollment_id": enrollment.id}
+    position = await db.run_sync(waitlist_position, current_user.id, course_id)
+    return {"course_id": course_id, "status": "waitlisted", "position": position}
+
+
+@router.get("/waitlist/{course_id}", response_model=WaitlistStatus)
+async def view_waitlist_position(course_id: int, db: AsyncSession = Depends(get_async_read_db), current_user = Depends(get_current_user_async)):
+    position = await db.run_sync(waitlist_position, current_user.id, course_id)
+    if position is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not on this course's waitlist")
+    return {"course_id": course_id, "status": "waitlisted", "position": position}
+
+
+@router.delete("/waitlist/{course_id}", response_model=dict)
+async def student_leave_waitlist(course_id: int, response: Response, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user_async)):
+    if not await db.run_sync(leave_waitlist, current_user.id, course_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not on this course's waitlist")
+
+    pin_to_primary(response, current_user.id)
+    return {"message": "Successfully left the waitlist"}
+
+
+@router.get("/all", response_model=Page[EnrollmentOut])
+async def view_all_enrollments(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_read_db), current_admin = Depends(get_current_admin_async)):
+    return FastJSONResponse(await db.run_sync(get_all_enrollments, page))
+
+
+@router.get("/changes", response_model=ChangeFeedPage)
+async def view_enrollment_changes(
+    since: str | None = Query(None, description="`next_cursor` from the previous call; omit to read the whole log"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_admin = Depends(get_current_admin_async),
+):
+    after = decode_change_cursor(since) if since else None
+    try:
+        return FastJSONResponse(await db.run_sync(changes_since, after, limit))
+    except CursorExpiredError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+
+
+@router.get("/my-enrollments", response_model=List[EnrollmentOut])
+async def view_my_enrollments(request: Request, db: AsyncSession = Depends(get_async_read_db), current_user = Depends(get_current_user_async)):
+    version = await db.run_sync(user_enrollments_version, current_user.id)
+    etag = make_etag(repr(("my-enrollments", current_user.id, *version)).encode())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return conditional_response(request, json_bytes(await db.run_sync(get_user_enrollments, current_user.id)), etag)
+
+
+@router.get("/{enrollment_id}", response_model=EnrollmentOut)
+async def get_enrollment_by_id(enrollment_id: int, db: AsyncSession = Depends(get_async_read_db), current_user = Depends(get_current_user_async)):
+    # Any authenticated user can view their own enrollment; admins can view any
+    enrollment = await db.run_sync(get_enrollment, enrollment_id)
+    if not enrollment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
+
+    if current_user.role != "admin" and enrollment.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot view other users' enrollments")
+
+    return enrollment
+
+
+@router.get("/course/{course_id}", response_model=Page[EnrollmentOut])
+async def view_course_enrollments(course_id: int, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_read_db), current_admin = Depends(get_current_admin_async)):
+    return await db.run_sync(get_course_enrollments, course_id, page)
+
+
+@router.delete("/admin/{course_id}/user/{user_id}", response_model=dict)
+async def admin_remove_student(course_id: int, user_id: int, db: AsyncSession = Depends(get_async_db), current_admin = Depends(get_current_admin_async)):
+    if not await db.run_sync(remove_enrollment, user_id, course_id, "removed_by_admin"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
+
+    return {"message": "Student removed from course successfully"}
+
+
+@router.post("/admin/{course_id}", response_model=BulkEnrollResult)
+async def admin_bulk_enroll_students(course_id: int, request: BulkEnrollRequest, db: AsyncSession = Depends(get_async_db), current_admin = Depends(get_current_admin_async)):
+    try:
+        results = await db.run_sync(bulk_enroll_students, course_id, request.user_ids, request.emails)
+    except EnrollmentError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    enrolled = sum(result["status"] == "enrolled" for result in results)
+    return {
+        "message": f"Enrolled {enrolled} student(s) in course",
+        "enrolled": enrolled,
+        "results": results,
+    }
+
+
+@router.delete("/admin/{course_id}", response_model=BulkDeregisterResult)
+async def admin_bulk_remove_students(course_id: int, request: BulkDeregisterRequest, db: AsyncSession = Depends(get_async_db), current_admin = Depends(get_current_admin_async)):
+    removed, not_found = await db.run_sync(bulk_remove_enrollments, course_id, request.user_ids)
+
+    if not removed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No enrollments found for the specified users")
+
+    return {
+        "message": f"Removed {len(removed)} student(s) from course successfully",
+        "removed_user_ids": removed,
+        "not_found_user_ids": not_found,
+    }
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.users import UserOut
+from app.core.security import TokenUser
+from app.crud import user as crud_user
+from app.core.pagination import PageParams, page_params
+from app.schemas.pagination import Page
+from app.deps import get_async_db, get_current_user_async, get_current_admin_async, ReleaseSessionRoute
+
+router = APIRouter(prefix="/api/v1/user", tags=["User"], route_class=ReleaseSessionRoute)
+
+
+@router.get("/me", response_model=UserOut)
+async def get_current_user_info(db: AsyncSession = Depends(get_async_db), current_user: TokenUser = Depends(get_current_user_async)):
+    """Get current authenticated user info."""
+    user = await db.run_sync(crud_user.get_user, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@router.get("", response_model=Page[UserOut])
+async def get_all_users(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_db), admin_user: TokenUser = Depends(get_current_admin_async)):
+    """Get all users, one keyset page at a time (admin only)."""
+    return await db.run_sync(crud_user.get_users, page)
+
+
+@router.get("/{email}", response_model=UserOut)
+async def get_user_by_email(email: str, db: AsyncSession = Depends(get_async_db), admin_user: TokenUser = Depends(get_current_admin_async)):
+    """Get user by email (admin only)."""
+    user = await db.run_sync(crud_user.get_user_by_email, email)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@router.patch("/{user_id}/activate")
+async def activate_user(user_id: int, db: AsyncSession = Depends(get_async_db), admin_user: TokenUser = Depends(get_current_admin_async)):
+    """Activate a user (admin only)."""
+    user = await db.run_sync(crud_user.get_user, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    await db.run_sync(crud_user.activate_user, user)
+    return {"message": "User activated successfully"}
+
+
+@router.patch("/{user_id}/deactivate")
+async def deactivate_user(user_id: int, db: AsyncSession = Depends(get_async_db), admin_user: TokenUser = Depends(get_current_admin_async)):
+    """Deactivate a user and revoke their tokens (admin only)."""
+    user = await db.run_sync(crud_user.get_user, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    await db.run_sync(crud_user.deactivate_user, user)
+    return {"message": "User deactivated successfully"}
+
+
+@router.delete("/{user_id}")
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db), admin_user: TokenUser = Depends(get_current_admin_async)):
+    """Delete a user and their enrollments (admin only)."""
+    user = await db.run_sync(crud_user.get_user, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if user.role != "student":
+        raise HTTPException(status_code=400, detail="Can only delete student accounts")
+
+    await db.run_sync(crud_user.delete_user, user)
+    return {"message": "Student deleted successfully"}
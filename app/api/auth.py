@@ -5,11 +5,12 @@ from pydantic import BaseModel, EmailStr
 import logging
 import sqlalchemy
 
-from app.models.user import User
-from app.core.security import hash_password, verify_password, create_access_token
-from app.deps import get_db
+from app.crud.user import get_user_by_email, create_user, update_password_hash
+from app.core.hashing import password_hasher
+from app.core.security import create_user_token
+from app.deps import get_db, limit_login, ReleaseSessionRoute
 
-router = APIRouter(prefix="/api/v1/auth", tags=["Auth"])
+router = APIRouter(prefix="/api/v1/auth", tags=["Auth"], route_class=ReleaseSessionRoute)
 
 
 class SignupRequest(BaseModel):
@@ -39,7 +40,7 @@ def signup(user: SignupRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid role")
 
     try:
-        existing_user = db.query(User).filter(User.email == user.email).first()
+        existing_user = get_user_by_email(db, user.email)
     except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError) as e:
         logging.exception("Database error during signup")
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -51,20 +52,11 @@ def signup(user: SignupRequest, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
 
-    hashed_pwd = hash_password(user.password)
-
-    new_user = User(
-        name=user.name,
-        email=user.email,
-        hashed_password=hashed_pwd,
-        role=user.role,
-        is_active=True
-    )
+    # Runs in the hashing process pool; this thread just waits
+    hashed_pwd = password_hasher.hash(user.password).result()
 
     try:
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        new_user = create_user(db, user.name, user.email, hashed_pwd, user.role)
     except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError) as e:
         db.rollback()
         logging.exception("Database error when creating user")
@@ -74,11 +66,11 @@ def signup(user: SignupRequest, db: Session = Depends(get_db)):
     return new_user
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Log in a user using form-encoded credentials."""
     try:
-        user = db.query(User).filter(User.email == form_data.username).first()
+        user = get_user_by_email(db, form_data.username)
     except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError) as e:
         logging.exception("Database error during login")
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -96,13 +88,18 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="User account is inactive"
         )
 
-    if not verify_password(form_data.password, user.hashed_password):
+    matches, new_hash = password_hasher.verify(form_data.password, user.hashed_password).result()
+    if not matches:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
 
-    access_token = create_access_token(data={"sub": user.email})
+    # Stored with older hash parameters; upgrade it while we have the password
+    if new_hash:
+        update_password_hash(db, user, new_hash)
+
+    access_token = create_user_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -110,35 +107,3 @@ class LoginRequest(BaseModel):
     """JSON-based login request (alternative to form-encoded)."""
     email: EmailStr
     password: str
-
-
-# @router.post("/login-json", response_model=Token)
-# def login_json(creds: LoginRequest, db: Session = Depends(get_db)):
-#     """Log in using JSON credentials (alternative to form-encoded)."""
-#     try:
-#         user = db.query(User).filter(User.email == creds.email).first()
-#     except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError) as e:
-#         logging.exception("Database error during login_json")
-#         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-#                             detail="Database error. Ensure migrations have been applied.")
-
-#     if not user:
-#         raise HTTPException(
-#             status_code=status.HTTP_401_UNAUTHORIZED,
-#             detail="Invalid email or password"
-#         )
-
-#     if not user.is_active:
-#         raise HTTPException(
-#             status_code=status.HTTP_403_FORBIDDEN,
-#             detail="User account is inactive"
-#         )
-
-#     if not verify_password(creds.password, user.hashed_password):
-#         raise HTTPException(
-#             status_code=status.HTTP_401_UNAUTHORIZED,
-#             detail="Invalid email or password"
-#         )
-
-#     access_token = create_access_token(data={"sub": user.email})
-#     return {"access_token": access_token, "token_type": "bearer"}
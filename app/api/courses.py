@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from typing import List
-from pydantic import BaseModel
 
-from app.models.course import Course
-from app.schemas.course import CourseCreate, CourseOut, CourseUpdate
-from app.crud.course import create_course, update_course
-from app.deps import get_db, get_current_admin, get_current_user
-from app.models.user import User
+from app.schemas.course import CourseCreate, CourseOut, CourseUpdate, CourseWithStudentsOut
+from app.crud.course import (
+    create_course, update_course, delete_course, get_course as crud_get_course,
+    get_course_by_code, get_active_courses, get_active_course_row, get_course_students,
+)
+from app.crud.seats import seats_taken
+from app.core.pagination import PageParams, page_params
+from app.core.cache import catalog_cache, catalog_version, conditional_response
+from app.core.responses import json_bytes
+from app.schemas.pagination import Page
+from app.deps import get_db, get_read_db, get_current_admin, get_current_user, ReleaseSessionRoute
 
-router = APIRouter(prefix="/api/v1/course", tags=["Course"])
+router = APIRouter(prefix="/api/v1/course", tags=["Course"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/", response_model=CourseOut)
 def admin_create_course(course: CourseCreate, db: Session = Depends(get_db), admin_user = Depends(get_current_admin)):
-    existing_course = db.query(Course).filter(Course.code == course.code).first()
+    existing_course = get_course_by_code(db, course.code)
     if existing_course:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,49 +29,48 @@ def admin_create_course(course: CourseCreate, db: Session = Depends(get_db), adm
     return new_course
 
 
-@router.get("/", response_model=List[CourseOut])
-def get_all_courses(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    courses = db.query(Course).filter(Course.is_active == True).all()
-    return courses
+@router.get("/", response_model=Page[CourseOut])
+def get_all_courses(request: Request, page: PageParams = Depends(page_params), db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
+    # Cached serialized pages; response_model still documents the shape
+    key = ("list", tuple(page.after or ()), page.limit)
+    cached = catalog_cache.load(key, catalog_version.current(db), lambda: json_bytes(get_active_courses(db, page)))
+    return conditional_response(request, *cached)
 
 
 @router.get("/{course_id}", response_model=CourseOut)
-def get_course(course_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    course = db.query(Course).filter(Course.id == course_id, Course.is_active == True).first()
-    if not course:
+def get_course(course_id: int, request: Request, db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
+    def load():
+        row = get_active_course_row(db, course_id)
+        return json_bytes(row) if row else None
+
+    cached = catalog_cache.load(("course", course_id), catalog_version.current(db), load)
+    if not cached:
         raise HTTPException(status_code=404, detail="Course not found")
-    return course
+    return conditional_response(request, *cached)
 
 
 @router.put("/{course_id}", response_model=CourseOut)
 def admin_update_course(course_id: int, payload: CourseUpdate, db: Session = Depends(get_db), admin_user = Depends(get_current_admin)):
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = crud_get_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
     updated = update_course(db, course, payload)
     return updated
 
-from app.models.enrollment import Enrollment
-from app.schemas.user import UserOut
-
-class CourseWithStudentsOut(BaseModel):
-    id: int
-    title: str
-    code: str
-    capacity: int
-    is_active: bool
-    students: list[UserOut]
-
 @router.get("/{course_id}/students", response_model=CourseWithStudentsOut)
-def get_course_with_students(course_id: int, db: Session = Depends(get_db), admin_user = Depends(get_current_admin)):
-    course = db.query(Course).filter(Course.id == course_id).first()
+def get_course_with_students(
+    course_id: int,
+    sort: str = Query("enrolled_at", pattern="^(enrolled_at|name)$"),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_read_db),
+    admin_user = Depends(get_current_admin),
+):
+    course = crud_get_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    enrollments = db.query(Enrollment).filter(Enrollment.course_id == course_id).all()
-    student_ids = [e.user_id for e in enrollments]
-    students = db.query(User).filter(User.id.in_(student_ids)).all()
+    roster = get_course_students(db, course_id, page, sort)
     
     return {
         "id": course.id,
@@ -75,19 +78,19 @@ def get_course_with_students(course_id: int, db: Session = Depends(get_db), admi
         "code": course.code,
         "capacity": course.capacity,
         "is_active": course.is_active,
-        "students": students
+        "students": roster["items"],
+        "next_cursor": roster["next_cursor"],
     }
 
 @router.delete("/{course_id}")
 def admin_delete_course(course_id: int, db: Session = Depends(get_db), admin_user = Depends(get_current_admin)):
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = crud_get_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    enrollments_count = db.query(Enrollment).filter(Enrollment.course_id == course_id).count()
+    enrollments_count = seats_taken(db, course)
     if enrollments_count > 0:
         raise HTTPException(status_code=400, detail="Cannot delete course with active enrollments")
     
-    db.delete(course)
-    db.commit()
+    delete_course(db, course)
     return {"message": "Course deleted successfully"}
@@ -1,17 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.models.enrollment import Enrollment
-from app.schemas.enrollment import EnrollmentCreate, EnrollmentOut
-from app.crud.enrollment import enroll_student
-from app.deps import get_db, get_current_user, get_current_admin
-
-router = APIRouter(prefix="/api/v1/enrollment", tags=["Enrollment"])
+from app.schemas.enrollment import (
+    EnrollmentCreate, EnrollmentOut, BulkDeregisterRequest, BulkDeregisterResult,
+    BulkEnrollRequest, BulkEnrollResult, WaitlistStatus, ChangeFeedPage,
+)
+from app.crud.enrollment import (
+    EnrollmentError, enroll_student, get_enrollment, get_all_enrollments, get_user_enrollments, user_enrollments_version,
+    get_course_enrollments, remove_enrollment, bulk_remove_enrollments, bulk_enroll_students, join_waitlist,
+)
+from app.crud.waitlist import leave_waitlist, waitlist_position
+from app.crud.change_feed import CursorExpiredError, changes_since, decode_change_cursor
+from app.core.pagination import MAX_PAGE_SIZE, PageParams, page_params
+from app.core.cache import conditional_response, etag_matches, make_etag, not_modified
+from app.core.replicas import pin_to_primary
+from app.core.responses import FastJSONResponse, json_bytes
+from app.schemas.pagination import Page
+from app.deps import get_db, get_read_db, get_current_user, get_current_admin, ReleaseSessionRoute
+
+router = APIRouter(prefix="/api/v1/enrollment", tags=["Enrollment"], route_class=ReleaseSessionRoute)
 
 
 @router.post("/", response_model=EnrollmentOut)
-def student_enroll(enrollment: EnrollmentCreate, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+def student_enroll(enrollment: EnrollmentCreate, response: Response, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
     # Only students may enroll themselves
     if current_user.role != "student":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students may enroll in courses")
@@ -20,46 +32,95 @@ def student_enroll(enrollment: EnrollmentCreate, db: Session = Depends(get_db),
     
     try:
         new_enrollment = enroll_student(db, user_id, enrollment.course_id)
-    except Exception as e:
+    except EnrollmentError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Their next reads go to the primary, so they see this enrollment
+    pin_to_primary(response, current_user.id)
     return new_enrollment
 
 
 @router.delete("/{course_id}", response_model=dict)
-def student_deregister(course_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+def student_deregister(course_id: int, response: Response, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students may deregister from courses")
-    enrollment = db.query(Enrollment).filter(
-        Enrollment.user_id == current_user.id,
-        Enrollment.course_id == course_id
-    ).first()
 
-    if not enrollment:
+    if not remove_enrollment(db, current_user.id, course_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
 
-    db.delete(enrollment)
-    db.commit()
+    pin_to_primary(response, current_user.id)
     return {"message": "Successfully deregistered from course"}
 
 
-@router.get("/all", response_model=List[EnrollmentOut])
-def view_all_enrollments(db: Session = Depends(get_db), current_admin = Depends(get_current_admin)):
+@router.post("/waitlist/{course_id}", response_model=WaitlistStatus)
+def student_join_waitlist(course_id: int, response: Response, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    # Enrolls straight away while seats are left, queues the student otherwise
+    if current_user.role != "student":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students may join course waitlists")
+
+    try:
+        enrollment = join_waitlist(db, current_user.id, course_id)
+    except EnrollmentError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    pin_to_primary(response, current_user.id)
+    if enrollment is not None:
+        return {"course_id": course_id, "status": "enrolled", "enrollment_id": enrollment.id}
+    return {"course_id": course_id, "status": "waitlisted", "position": waitlist_position(db, current_user.id, course_id)}
+
+
+@router.get("/waitlist/{course_id}", response_model=WaitlistStatus)
+def view_waitlist_position(course_id: int, db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
+    position = waitlist_position(db, current_user.id, course_id)
+    if position is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not on this course's waitlist")
+    return {"course_id": course_id, "status": "waitlisted", "position": position}
+
+
+@router.delete("/waitlist/{course_id}", response_model=dict)
+def student_leave_waitlist(course_id: int, response: Response, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    if not leave_waitlist(db, current_user.id, course_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not on this course's waitlist")
+
+    pin_to_primary(response, current_user.id)
+    return {"message": "Successfully left the waitlist"}
+
+
+@router.get("/all", response_model=Page[EnrollmentOut])
+def view_all_enrollments(page: PageParams = Depends(page_params), db: Session = Depends(get_read_db), current_admin = Depends(get_current_admin)):
     # Admins only: view all enrollments
-    enrollments = db.query(Enrollment).all()
-    return enrollments
+    return FastJSONResponse(get_all_enrollments(db, page))
+
+
+@router.get("/changes", response_model=ChangeFeedPage)
+def view_enrollment_changes(
+    since: str | None = Query(None, description="`next_cursor` from the previous call; omit to read the whole log"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    current_admin = Depends(get_current_admin),
+):
+    # Admins only: inserts and deletes since the cursor, for incremental sync
+    after = decode_change_cursor(since) if since else None
+    try:
+        return FastJSONResponse(changes_since(db, after, limit))
+    except CursorExpiredError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
 
 
 @router.get("/my-enrollments", response_model=List[EnrollmentOut])
-def view_my_enrollments(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+def view_my_enrollments(request: Request, db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
     # Students (and admins if needed) can view their own enrollments
-    enrollments = db.query(Enrollment).filter(Enrollment.user_id == current_user.id).all()
-    return enrollments
+    # Enrollment rows never change in place, so the per-user version identifies the body
+    version = user_enrollments_version(db, current_user.id)
+    etag = make_etag(repr(("my-enrollments", current_user.id, *version)).encode())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return conditional_response(request, json_bytes(get_user_enrollments(db, current_user.id)), etag)
 
 
 @router.get("/{enrollment_id}", response_model=EnrollmentOut)
-def get_enrollment_by_id(enrollment_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+def get_enrollment_by_id(enrollment_id: int, db: Session = Depends(get_read_db), current_user = Depends(get_current_user)):
     # Any authenticated user can view their own enrollment; admins can view any
-    enrollment = db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+    enrollment = get_enrollment(db, enrollment_id)
     if not enrollment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
     
@@ -69,46 +130,43 @@ def get_enrollment_by_id(enrollment_id: int, db: Session = Depends(get_db), curr
     return enrollment
 
 
-@router.get("/course/{course_id}", response_model=List[EnrollmentOut])
-def view_course_enrollments(course_id: int, db: Session = Depends(get_db), current_admin = Depends(get_current_admin)):
-    enrollments = db.query(Enrollment).filter(Enrollment.course_id == course_id).all()
-    return enrollments
+@router.get("/course/{course_id}", response_model=Page[EnrollmentOut])
+def view_course_enrollments(course_id: int, page: PageParams = Depends(page_params), db: Session = Depends(get_read_db), current_admin = Depends(get_current_admin)):
+    return get_course_enrollments(db, course_id, page)
 
 
 @router.delete("/admin/{course_id}/user/{user_id}", response_model=dict)
 def admin_remove_student(course_id: int, user_id: int, db: Session = Depends(get_db), current_admin = Depends(get_current_admin)):
-    enrollment = db.query(Enrollment).filter(
-        Enrollment.course_id == course_id,
-        Enrollment.user_id == user_id
-    ).first()
-
-    if not enrollment:
+    if not remove_enrollment(db, user_id, course_id, "removed_by_admin"):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Enrollment not found")
 
-    db.delete(enrollment)
-    db.commit()
     return {"message": "Student removed from course successfully"}
 
-from pydantic import BaseModel
-from typing import List
 
-class BulkDeregisterRequest(BaseModel):
-    user_ids: List[int]
+@router.post("/admin/{course_id}", response_model=BulkEnrollResult)
+def admin_bulk_enroll_students(course_id: int, request: BulkEnrollRequest, db: Session = Depends(get_db), current_admin = Depends(get_current_admin)):
+    try:
+        results = bulk_enroll_students(db, course_id, request.user_ids, request.emails)
+    except EnrollmentError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    enrolled = sum(result["status"] == "enrolled" for result in results)
+    return {
+        "message": f"Enrolled {enrolled} student(s) in course",
+        "enrolled": enrolled,
+        "results": results,
+    }
+
 
-@router.delete("/admin/{course_id}", response_model=dict)
+@router.delete("/admin/{course_id}", response_model=BulkDeregisterResult)
 def admin_bulk_remove_students(course_id: int, request: BulkDeregisterRequest, db: Session = Depends(get_db), current_admin = Depends(get_current_admin)):
-    removed_count = 0
-    for user_id in request.user_ids:
-        enrollment = db.query(Enrollment).filter(
-            Enrollment.course_id == course_id,
-            Enrollment.user_id == user_id
-        ).first()
-        if enrollment:
-            db.delete(enrollment)
-            removed_count += 1
+    removed, not_found = bulk_remove_enrollments(db, course_id, request.user_ids)
     
-    if removed_count == 0:
+    if not removed:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No enrollments found for the specified users")
     
-    db.commit()
-    return {"message": f"Removed {removed_count} student(s) from course successfully"}
+    return {
+        "message": f"Removed {len(removed)} student(s) from course successfully",
+        "removed_user_ids": removed,
+        "not_found_user_ids": not_found,
+    }
@@ -4,11 +4,13 @@ from pydantic import BaseModel, EmailStr
 import logging
 import sqlalchemy
 
-from app.models.user import User
-from app.models.enrollment import Enrollment
-from app.deps import get_db, get_current_user, get_current_admin
+from app.core.security import TokenUser
+from app.crud import user as crud_user
+from app.core.pagination import PageParams, page_params
+from app.schemas.pagination import Page
+from app.deps import get_db, get_current_user, get_current_admin, ReleaseSessionRoute
 
-router = APIRouter(prefix="/api/v1/user", tags=["User"])
+router = APIRouter(prefix="/api/v1/user", tags=["User"], route_class=ReleaseSessionRoute)
 
 
 class UserOut(BaseModel):
@@ -20,53 +22,60 @@ class UserOut(BaseModel):
 
 
 @router.get("/me", response_model=UserOut)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(db: Session = Depends(get_db), current_user: TokenUser = Depends(get_current_user)):
     """Get current authenticated user info."""
-    return current_user
+    user = crud_user.get_user(db, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 
-@router.get("", response_model=list[UserOut])
-def get_all_users(db: Session = Depends(get_db), admin_user: User = Depends(get_current_admin)):
-    """Get all users (admin only)."""
-    users = db.query(User).all()
-    return users
+@router.get("", response_model=Page[UserOut])
+def get_all_users(page: PageParams = Depends(page_params), db: Session = Depends(get_db), admin_user: TokenUser = Depends(get_current_admin)):
+    """Get all users, one keyset page at a time (admin only)."""
+    return crud_user.get_users(db, page)
 
 
 @router.get("/{email}", response_model=UserOut)
-def get_user_by_email(email: str, db: Session = Depends(get_db), admin_user: User = Depends(get_current_admin)):
+def get_user_by_email(email: str, db: Session = Depends(get_db), admin_user: TokenUser = Depends(get_current_admin)):
     """Get user by email (admin only)."""
-    user = db.query(User).filter(User.email == email).first()
+    user = crud_user.get_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.patch("/{user_id}/activate")
-def activate_user(user_id: int, db: Session = Depends(get_db), admin_user: User = Depends(get_current_admin)):
+def activate_user(user_id: int, db: Session = Depends(get_db), admin_user: TokenUser = Depends(get_current_admin)):
     """Activate a user (admin only)."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = crud_user.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user.is_active = True
-    db.commit()
+    crud_user.activate_user(db, user)
     return {"message": "User activated successfully"}
 
 
+@router.patch("/{user_id}/deactivate")
+def deactivate_user(user_id: int, db: Session = Depends(get_db), admin_user: TokenUser = Depends(get_current_admin)):
+    """Deactivate a user and revoke their tokens (admin only)."""
+    user = crud_user.get_user(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    crud_user.deactivate_user(db, user)
+    return {"message": "User deactivated successfully"}
+
+
 @router.delete("/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db), admin_user: User = Depends(get_current_admin)):
+def delete_user(user_id: int, db: Session = Depends(get_db), admin_user: TokenUser = Depends(get_current_admin)):
     """Delete a user and their enrollments (admin only)."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = crud_user.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     if user.role != "student":
         raise HTTPException(status_code=400, detail="Can only delete student accounts")
 
-    # Delete enrollments first
-    db.query(Enrollment).filter(Enrollment.user_id == user_id).delete()
-    
-    # Delete user
-    db.delete(user)
-    db.commit()
+    crud_user.delete_user(db, user)
     return {"message": "Student deleted successfully"}
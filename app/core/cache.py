@@ -0,0 +1,189 @@
+"""In-process cache of serialized catalog responses, plus conditional-GET helpers.
+
+Bodies are cached as the exact bytes sent, keyed by (request key, catalog
+version). The version lives in the cache_versions table: admin writes to
+courses bump it in their own transaction, and each process re-reads it at
+most every CATALOG_VERSION_CHECK_SECONDS (immediately after a bump made by
+this process). Entries also expire after CATALOG_CACHE_TTL seconds, which
+bounds how stale enrolled_count/seats_left can be, since enrollments do not
+bump the version.
+
+ETags are a hash of the cached bytes, so they are strong validators.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from hashlib import blake2b
+from os import getenv
+from typing import NamedTuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.database import insert_for
+from app.core.metrics import SHARED_REFRESH
+from app.models.cache_version import CacheVersion
+
+CATALOG_CACHE_TTL = float(getenv("CATALOG_CACHE_TTL", "10"))
+CATALOG_CACHE_MAX_ENTRIES = int(getenv("CATALOG_CACHE_MAX_ENTRIES", "1024"))
+CATALOG_VERSION_CHECK_SECONDS = float(getenv("CATALOG_VERSION_CHECK_SECONDS", "1"))
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache:
+    """TTL + LRU-bounded map of serialized bodies with single-flight loading.
+
+    On a miss the first caller runs the loader; concurrent callers for the
+    same key and version wait for its result instead of querying too.
+    """
+
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL, max_entries: int = CATALOG_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version: int) -> CachedBody | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, expires, cached = entry
+            if entry_version != version or expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return cached
+
+    def _begin(self, key, version: int) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._inflight.get((key, version))
+            if future is not None:
+                return future, False
+            future = self._inflight[(key, version)] = Future()
+            return future, True
+
+    def _finish(self, key, version: int, future: Future, body: bytes | None):
+        cached = CachedBody(body, make_etag(body)) if body is not None else None
+        with self._lock:
+            if cached is not None:
+                self._entries[key] = (version, time.monotonic() + self.ttl, cached)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._inflight.pop((key, version), None)
+        future.set_result(cached)
+        return cached
+
+    def _abort(self, key, version: int, future: Future, exc: BaseException):
+        with self._lock:
+            self._inflight.pop((key, version), None)
+        future.set_exception(exc)
+
+    def load(self, key, version: int, loader) -> CachedBody | None:
+        """Cached body for `key`, calling `loader()` (bytes, or None for "not found") on a miss."""
+        cached = self.get(key, version)
+        if cached is not None:
+            return cached
+        future, leader = self._begin(key, version)
+        if not leader:
+            return future.result()
+        try:
+            body = loader()
+        except BaseException as e:
+            self._abort(key, version, future, e)
+            raise
+        return self._finish(key, version, future, body)
+
+    async def load_async(self, key, version: int, loader) -> CachedBody | None:
+        """load() for async routes; `loader` is an async callable."""
+        cached = self.get(key, version)
+        if cached is not None:
+            return cached
+        future, leader = self._begin(key, version)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            body = await loader()
+        except BaseException as e:
+            self._abort(key, version, future, e)
+            raise
+        return self._finish(key, version, future, body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedVersion:
+    """A cache_versions counter, re-read from the database at most every `check_seconds`."""
+
+    def __init__(self, name: str, check_seconds: float = CATALOG_VERSION_CHECK_SECONDS):
+        self.name = name
+        self.check_seconds = check_seconds
+        self._value = 0
+        self._checked_at: float | None = None
+
+    def current(self, db: Session) -> int:
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+            stmt = select(CacheVersion.version).where(CacheVersion.name == self.name).execution_options(**SHARED_REFRESH)
+            self._value = db.execute(stmt).scalar() or 0
+            self._checked_at = time.monotonic()
+        return self._value
+
+    def bump(self, db: Session):
+        """Increment in the caller's transaction; this process re-reads on its next lookup."""
+        insert = insert_for(db)
+        stmt = insert(CacheVersion).values(name=self.name, version=1)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.name],
+            set_={"version": CacheVersion.version + 1},
+        ))
+        # Not the new value: if the caller rolls back, the old one still stands.
+        # Again after commit, in case a lookup in between re-read the old value.
+        self._checked_at = None
+        event.listen(db, "after_commit", self._expire, once=True)
+
+    def _expire(self, session):
+        self._checked_at = None
+
+
+catalog_cache = ResponseCache()
+catalog_version = SharedVersion("catalog")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _validator_headers(etag: str) -> dict:
+    # Clients may keep the body but must revalidate before each use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_validator_headers(etag))
+
+
+def conditional_response(request: Request, body: bytes, etag: str) -> Response:
+    """200 with the body and its ETag, or a bodyless 304 if the client already has it."""
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(content=body, media_type="application/json", headers=_validator_headers(etag))
@@ -0,0 +1,181 @@
+"""Password hashing off the request threads, in a small dedicated process pool.
+
+PBKDF2 is pure CPU: run in the request threadpool, a burst of logins pins
+every core and starves unrelated endpoints. Here hashing runs in
+PASSWORD_HASH_WORKERS processes with at most PASSWORD_HASH_MAX_PENDING calls
+queued or running; beyond that callers get PasswordHasherBusyError (a 503 with
+Retry-After) straight away instead of piling up.
+"""
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+
+from app.core.security import PASSWORD_HASH_ROUNDS, hash_password, verify_and_update_password
+
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    # Checked at import, so a bad value stops the process at startup
+    value = int(os.getenv(name, str(default)))
+    if value < minimum:
+        raise ValueError(f"{name}={value} must be at least {minimum}")
+    return value
+
+
+# 0 hashes inline in the calling thread (the old behaviour)
+PASSWORD_HASH_WORKERS = _env_int("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2), 0)
+# At least 1: with no slots every signup and login would get a 503
+PASSWORD_HASH_MAX_PENDING = _env_int("PASSWORD_HASH_MAX_PENDING", max(1, PASSWORD_HASH_WORKERS) * 8, 1)
+PASSWORD_HASH_RETRY_AFTER = _env_int("PASSWORD_HASH_RETRY_AFTER", 1, 0)
+
+# Latency samples kept for the stats snapshot
+STATS_WINDOW = 1024
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class HashStats:
+    """Rolling per-call latencies: time spent hashing, and time spent queued for a worker."""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self._lock = threading.Lock()
+        self._compute = deque(maxlen=window)
+        self._wait = deque(maxlen=window)
+        self.calls = 0
+        self.rejected = 0
+
+    def record(self, compute: float, wait: float):
+        with self._lock:
+            self.calls += 1
+            self._compute.append(compute)
+            self._wait.append(wait)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            compute, wait = sorted(self._compute), sorted(self._wait)
+            calls, rejected = self.calls, self.rejected
+        pct = lambda values, q: round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2) if values else None
+        return {
+            "calls": calls,
+            "rejected": rejected,
+            "compute_ms": {"p50": pct(compute, 0.5), "p99": pct(compute, 0.99), "mean": round(statistics.fmean(compute) * 1000, 2) if compute else None},
+            "queue_wait_ms": {"p50": pct(wait, 0.5), "p99": pct(wait, 0.99)},
+        }
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stats = HashStats()
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending > 0 else None
+        self._pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def hash(self, password: str) -> "Future[str]":
+        return self._submit(hash_password, password)
+
+    def verify(self, password: str, hashed_password: str) -> "Future[tuple[bool, str | None]]":
+        """Resolves to (matches, new_hash); new_hash is set when the stored hash should be replaced."""
+        return self._submit(verify_and_update_password, password, hashed_password)
+
+    def _submit(self, fn, *args) -> Future:
+        if self._slots is None or not self._slots.acquire(blocking=False):
+            self.stats.reject()
+            raise PasswordHasherBusyError()
+        with self._lock:
+            self._pending += 1
+
+        queued = time.perf_counter()
+        outer = Future()
+
+        def finish(inner: Future):
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+            try:
+                result, compute = inner.result()
+            except BaseException as e:
+                outer.set_exception(e)
+                return
+            self.stats.record(compute, max(time.perf_counter() - queued - compute, 0.0))
+            outer.set_result(result)
+
+        try:
+            inner = self._run(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+            raise
+        inner.add_done_callback(finish)
+        return outer
+
+    def _run(self, fn, *args) -> Future:
+        if self.workers <= 0:
+            inner = Future()
+            try:
+                inner.set_result(_timed(fn, *args))
+            except Exception as e:
+                inner.set_exception(e)
+            return inner
+        try:
+            return self._pool().submit(_timed, fn, *args)
+        except BrokenProcessPool:
+            logging.warning("Password hashing pool broke; starting a new one")
+            self.shutdown()
+            return self._pool().submit(_timed, fn, *args)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the parent holds DB connections and threads
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def info(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rounds": PASSWORD_HASH_ROUNDS,
+            **self.stats.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher()
+
+
+async def hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many sign-ins in progress, please retry shortly"},
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
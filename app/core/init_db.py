@@ -5,6 +5,13 @@ from app.core.database import Base, engine
 from app.models.user import User
 from app.models.course import Course
 from app.models.enrollment import Enrollment
+from app.models.seat_counter import CourseSeatCounter
+from app.models.auth_revocation import AuthRevocation
+from app.models.cache_version import CacheVersion
+from app.models.waitlist import WaitlistEntry
+from app.models.outbox import OutboxEvent
+from app.models.enrollment_change import EnrollmentChange
+from app.models.change_log_horizon import ChangeLogHorizon
 
 
 Base.metadata.create_all(bind=engine)
@@ -0,0 +1,284 @@
+"""Request and database metrics, exposed in the Prometheus text format on /metrics.
+
+MetricsMiddleware times every request and labels it by route template (not
+the raw path, so ids don't explode the label set). SQL statements are counted
+through cursor events on each instrumented engine and charged to the request
+that issued them via a context variable, which follows the request into the
+threadpool and into run_sync. Per-statement bookkeeping is two clock reads
+and two additions; the shared registry lock is taken once per request.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import getenv
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from starlette.responses import Response
+
+METRICS_ENABLED = getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# Requests that matched no API route (404s, /docs, /openapi.json) share one label
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Execution options for statements not caused by the request at hand: refreshes
+# of process-wide state (revocations, cache versions) run by whichever request
+# comes along, and background work (outbox dispatch); query budgets skip them
+SHARED_REFRESH = {"shared_refresh": True}
+
+
+class _RequestSQL:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+_request_sql: ContextVar[_RequestSQL | None] = ContextVar("request_sql", default=None)
+
+
+class _RouteStats:
+    __slots__ = ("latency", "latency_sum", "statuses", "statements", "statement_seconds", "statements_per_request")
+
+    def __init__(self):
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.statuses = {}
+        self.statements = 0
+        self.statement_seconds = 0.0
+        self.statements_per_request = [0] * (len(STATEMENT_BUCKETS) + 1)
+
+
+class _PoolStats:
+    __slots__ = ("engine", "checkouts", "connects", "disconnects", "timeouts", "wait", "wait_sum")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.checkouts = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.timeouts = 0
+        self.wait = [0] * (len(POOL_WAIT_BUCKETS) + 1)
+        self.wait_sum = 0.0
+
+    def observe_wait(self, seconds: float):
+        self.wait[bisect_left(POOL_WAIT_BUCKETS, seconds)] += 1
+        self.wait_sum += seconds
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[tuple[str, str], _RouteStats] = {}
+        self._pools: dict[str, _PoolStats] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, sql: _RequestSQL):
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats()
+            stats.latency[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.latency_sum += seconds
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.statements += sql.statements
+            stats.statement_seconds += sql.seconds
+            stats.statements_per_request[bisect_left(STATEMENT_BUCKETS, sql.statements)] += 1
+
+    def instrument_engine(self, engine, name: str):
+        """Count statements on `engine` (a sync Engine, or an AsyncEngine's sync_engine) and report its pool."""
+        pool_stats = self._pools[name] = _PoolStats(engine)
+        if hasattr(engine.pool, "_metrics_stats"):
+            # Pools from app.core.pooling time their own checkouts
+            engine.pool._metrics_stats = pool_stats
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._metrics_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            sql = _request_sql.get()
+            if sql is not None:
+                sql.statements += 1
+                sql.seconds += time.perf_counter() - context._metrics_started
+
+        @event.listens_for(engine, "checkout")
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            pool_stats.checkouts += 1
+
+        @event.listens_for(engine, "connect")
+        def connect(dbapi_connection, connection_record):
+            pool_stats.connects += 1
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(context):
+            if context.is_disconnect:
+                pool_stats.disconnects += 1
+
+    def render(self) -> str:
+        with self._lock:
+            routes = {
+                key: (list(s.latency), s.latency_sum, dict(s.statuses), s.statements, s.statement_seconds, list(s.statements_per_request))
+                for key, s in self._routes.items()
+            }
+            in_flight = self.in_flight
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, labels, bounds, counts, total):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {total}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        labels = {key: f'method="{_escape(key[0])}",route="{_escape(key[1])}"' for key in routes}
+
+        header("http_requests_in_flight", "gauge", "Requests currently being served.")
+        lines.append(f"http_requests_in_flight {in_flight}")
+
+        header("http_requests_total", "counter", "Requests served, by route and status code.")
+        for key, stats in routes.items():
+            for code, count in sorted(stats[2].items()):
+                lines.append(f'http_requests_total{{{labels[key]},status="{code}"}} {count}')
+
+        header("http_request_duration_seconds", "histogram", "Request latency, until the last body chunk is sent.")
+        for key, stats in routes.items():
+            histogram("http_request_duration_seconds", labels[key], LATENCY_BUCKETS, stats[0], stats[1])
+
+        header("db_statements_total", "counter", "SQL statements executed while serving requests.")
+        for key, stats in routes.items():
+            lines.append(f"db_statements_total{{{labels[key]}}} {stats[3]}")
+
+        header("db_statement_seconds_total", "counter", "Time spent in SQL statements while serving requests.")
+        for key, stats in routes.items():
+            lines.append(f"db_statement_seconds_total{{{labels[key]}}} {stats[4]}")
+
+        header("db_statements_per_request", "histogram", "SQL statements issued by a single request.")
+        for key, stats in routes.items():
+            histogram("db_statements_per_request", labels[key], STATEMENT_BUCKETS, stats[5], stats[3])
+
+        self._render_pools(lines, header)
+        return "\n".join(lines) + "\n"
+
+    def _render_pools(self, lines, header):
+        pools = dict(self._pools)
+        gauges = {
+            "db_pool_size": ("Configured pool size.", lambda pool: pool.size()),
+            "db_pool_checked_out": ("Connections currently checked out.", lambda pool: pool.checkedout()),
+            "db_pool_checked_in": ("Idle connections in the pool.", lambda pool: pool.checkedin()),
+            # Negative while the pool is still below its size
+            "db_pool_overflow": ("Connections open beyond the pool size.", lambda pool: pool.overflow()),
+        }
+        queue_pools = {name: stats for name, stats in pools.items() if isinstance(stats.engine.pool, QueuePool)}
+        for metric, (help_text, read) in gauges.items():
+            header(metric, "gauge", help_text)
+            for name, stats in queue_pools.items():
+                lines.append(f'{metric}{{engine="{name}"}} {read(stats.engine.pool)}')
+        counters = {
+            "db_pool_checkouts_total": ("Connections handed out by the pool.", "checkouts"),
+            "db_pool_connects_total": ("New DBAPI connections opened.", "connects"),
+            "db_pool_timeouts_total": ("Checkouts that gave up after DB_POOL_TIMEOUT.", "timeouts"),
+            "db_disconnects_total": ("Statements that failed on a dead connection (the pool is then invalidated).", "disconnects"),
+        }
+        for metric, (help_text, attr) in counters.items():
+            header(metric, "counter", help_text)
+            for name, stats in pools.items():
+                lines.append(f'{metric}{{engine="{name}"}} {getattr(stats, attr)}')
+
+        header("db_pool_wait_seconds", "histogram", "Time a checkout waited for a free connection (or to connect).")
+        for name, stats in pools.items():
+            cumulative = 0
+            for bound, count in zip(POOL_WAIT_BUCKETS, stats.wait):
+                cumulative += count
+                lines.append(f'db_pool_wait_seconds_bucket{{engine="{name}",le="{bound}"}} {cumulative}')
+            cumulative += stats.wait[-1]
+            lines.append(f'db_pool_wait_seconds_bucket{{engine="{name}",le="+Inf"}} {cumulative}')
+            lines.append(f'db_pool_wait_seconds_sum{{engine="{name}"}} {stats.wait_sum}')
+            lines.append(f'db_pool_wait_seconds_count{{engine="{name}"}} {cumulative}')
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+
+def instrument_engine(engine, name: str):
+    if METRICS_ENABLED:
+        metrics.instrument_engine(engine, name)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware), so streaming bodies pass straight through."""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        sql = _RequestSQL()
+        token = _request_sql.set(sql)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry = self.registry
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.in_flight -= 1
+            _request_sql.reset(token)
+            # FastAPI records the matched APIRoute in the scope during routing
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            registry.observe(scope["method"], route, status_code, elapsed, sql)
+
+
+@contextmanager
+def count_statements(engine):
+    """Collect the SQL of every statement `engine` runs inside the block, from any thread.
+
+    Statements marked with SHARED_REFRESH are left out: they are periodic and
+    not caused by the code under test.
+    """
+    statements = []
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not context.execution_options.get("shared_refresh"):
+            statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def metrics_endpoint():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,123 @@
+"""Schema migrations run by the app itself (AUTO_MIGRATE).
+
+Alembic, and the migration environment with it (alembic/env.py imports
+every model), is only loaded when a migration actually has to run: the
+database's revision is read with one query and compared against the heads
+in alembic/versions first, so restarting an up-to-date deployment costs a
+single round trip.
+
+On Postgres the upgrade runs under a session advisory lock, so of N workers
+booting together exactly one migrates. The others either wait for it (up to
+MIGRATION_WAIT_SECONDS, then start anyway) or, with AUTO_MIGRATE_WAIT=false,
+start straight away on the old schema, which is safe for the additive
+changes app.core.online_migrations makes.
+
+The lock is per server session, as are the SET lock_timeout and the
+CONCURRENTLY index builds of the migrations themselves, so none of them
+work through PgBouncer in transaction mode. MIGRATION_DATABASE_URL, if set,
+is a direct connection used for the lock and the migrations (alembic/env.py
+prefers it too); under DB_POOL_PROFILE=pgbouncer it is required.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from os import getenv
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+
+from app.core.database import connect_args_for, normalize_url
+from app.core.pooling import POOL_SETTINGS, PoolSettings
+
+ALEMBIC_INI = "alembic.ini"
+
+# Arbitrary, fixed key for pg_advisory_lock shared by every worker
+MIGRATION_LOCK_KEY = 0x636F75727365
+MIGRATION_WAIT = getenv("AUTO_MIGRATE_WAIT", "true").lower() in ("1", "true", "yes")
+MIGRATION_WAIT_SECONDS = float(getenv("MIGRATION_WAIT_SECONDS", "600"))
+MIGRATION_DATABASE_URL = getenv("MIGRATION_DATABASE_URL", "")
+_LOCK_POLL_SECONDS = 1.0
+
+
+def migration_engine(engine, url: str = MIGRATION_DATABASE_URL, settings: PoolSettings = POOL_SETTINGS):
+    """Engine to take the migration lock and run the upgrade on: a direct one for `url`, else `engine`.
+
+    Raises ValueError for Postgres behind PgBouncer without a direct URL,
+    where the advisory lock could not keep workers from migrating at once.
+    """
+    if url:
+        url = normalize_url(url)
+        return create_engine(url, poolclass=NullPool, connect_args=connect_args_for(url))
+    if settings.profile == "pgbouncer" and engine.dialect.name == "postgresql":
+        raise ValueError(
+            "AUTO_MIGRATE with DB_POOL_PROFILE=pgbouncer needs MIGRATION_DATABASE_URL, a direct (non-PgBouncer) "
+            "connection: the migration lock and the migrations' session settings do not survive transaction pooling"
+        )
+    return engine
+
+
+def current_revisions(engine) -> set[str]:
+    """Revisions stamped in alembic_version; empty for a database never migrated."""
+    try:
+        with engine.connect() as conn:
+            return set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    except DBAPIError:
+        return set()
+
+
+def head_revisions(config) -> set[str]:
+    # Parses the revision files only; env.py is not run
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+@contextmanager
+def migration_lock(engine, wait: bool = MIGRATION_WAIT, wait_seconds: float = MIGRATION_WAIT_SECONDS):
+    """Yield True while holding the cluster-wide migration lock, False if another process has it.
+
+    Polls pg_try_advisory_lock rather than blocking in pg_advisory_lock, so
+    the wait is bounded and no statement_timeout applies. Other dialects
+    have no such lock and always get True.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    with engine.connect() as conn:
+        deadline = time.monotonic() + (wait_seconds if wait else 0)
+        while True:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}).scalar()
+            conn.commit()
+            if acquired or time.monotonic() >= deadline:
+                break
+            time.sleep(_LOCK_POLL_SECONDS)
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                conn.commit()
+
+
+def upgrade_to_head(engine, ini_path: str = ALEMBIC_INI) -> bool:
+    """Run `alembic upgrade head` unless the database is already there; True if it ran."""
+    from alembic.config import Config
+
+    config = Config(ini_path)
+    heads = head_revisions(config)
+    if current_revisions(engine) == heads:
+        return False
+
+    with migration_lock(engine) as locked:
+        if not locked:
+            logging.warning("Another process holds the migration lock; starting on the current schema")
+            return False
+        # Whoever held the lock before us may have done the work already
+        if current_revisions(engine) == heads:
+            return False
+
+        from alembic import command
+
+        command.upgrade(config, "head")
+    return True
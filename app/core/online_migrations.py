@@ -0,0 +1,149 @@
+"""Alembic operations that change large, busy tables without stalling traffic.
+
+For use inside revision scripts, in place of the plain `op` calls:
+
+  create_index_concurrently / drop_index_concurrently
+      CREATE/DROP INDEX CONCURRENTLY outside the migration transaction, so
+      writes continue while the index builds. A failed concurrent build
+      leaves an INVALID index behind; create drops any leftover first.
+  add_check_not_valid / add_foreign_key_not_valid, then validate_constraint
+      The constraint is added NOT VALID (brief lock, no table scan) and
+      enforced for new rows at once; VALIDATE later checks the existing
+      rows under a lock that does not block reads or writes.
+  add_unique_constraint_concurrently
+      Builds the unique index concurrently, then attaches it as the
+      constraint (ADD CONSTRAINT ... USING INDEX), which takes only a brief
+      lock.
+  backfill_in_batches / execute_in_batches
+      UPDATE (or run any INSERT ... SELECT / DELETE) over a table in
+      primary-key ranges, each range its own short transaction, sleeping
+      between them so replicas and the request workload keep up.
+
+On other dialects (SQLite in development) they fall back to the plain
+operations. The migration connection also gets a lock_timeout
+(alembic/env.py): DDL that cannot get its lock quickly fails and is
+retried by the next deploy rather than queueing every request behind it.
+Concurrent index builds and drops wait for every older transaction to
+finish, which counts against lock_timeout, so they run under
+MIGRATION_CONCURRENT_LOCK_TIMEOUT_MS instead (default 0, no limit).
+"""
+import logging
+import time
+from contextlib import contextmanager
+from os import getenv
+
+import sqlalchemy as sa
+from alembic import op
+
+BACKFILL_BATCH_SIZE = 10_000
+BACKFILL_PAUSE_SECONDS = 0.1
+MIGRATION_LOCK_TIMEOUT_MS = int(getenv("MIGRATION_LOCK_TIMEOUT_MS", "5000"))
+MIGRATION_CONCURRENT_LOCK_TIMEOUT_MS = int(getenv("MIGRATION_CONCURRENT_LOCK_TIMEOUT_MS", "0"))
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+@contextmanager
+def _concurrently():
+    """Autocommit block with the concurrent lock_timeout, restoring the migration one after."""
+    with op.get_context().autocommit_block():
+        if not _is_postgres():
+            yield
+            return
+        op.execute(f"SET lock_timeout = {MIGRATION_CONCURRENT_LOCK_TIMEOUT_MS}")
+        try:
+            yield
+        finally:
+            op.execute(f"SET lock_timeout = {MIGRATION_LOCK_TIMEOUT_MS}")
+
+
+def create_index_concurrently(name: str, table: str, columns, **kwargs):
+    with _concurrently():
+        op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+        op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+
+def drop_index_concurrently(name: str, table: str):
+    with _concurrently():
+        op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def add_unique_constraint_concurrently(name: str, table: str, columns: list[str]):
+    """Unique constraint backed by an index built without blocking writes; a plain unique index off Postgres."""
+    create_index_concurrently(name, table, columns, unique=True)
+    if _is_postgres():
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}")
+
+
+def add_check_not_valid(name: str, table: str, condition: str):
+    if not _is_postgres():
+        op.create_check_constraint(name, table, condition)
+        return
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID")
+
+
+def add_foreign_key_not_valid(name: str, source: str, referent: str, local_cols: list[str], remote_cols: list[str], ondelete: str | None = None):
+    if not _is_postgres():
+        op.create_foreign_key(name, source, referent, local_cols, remote_cols, ondelete=ondelete)
+        return
+    on_delete = f" ON DELETE {ondelete}" if ondelete else ""
+    op.execute(
+        f"ALTER TABLE {source} ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(local_cols)}) "
+        f"REFERENCES {referent} ({', '.join(remote_cols)}){on_delete} NOT VALID"
+    )
+
+
+def validate_constraint(name: str, table: str):
+    """Check existing rows against a NOT VALID constraint, outside the migration transaction."""
+    if not _is_postgres():
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def execute_in_batches(table: str, statement: str, key: str = "id", range_key: str | None = None,
+                       batch_size: int = BACKFILL_BATCH_SIZE, pause: float = BACKFILL_PAUSE_SECONDS) -> int:
+    """Run `statement` once per `key` range of `table` (batch_size wide), committing each.
+
+    `statement` marks where the range condition goes with `{batch}`; it is
+    written against `range_key` (default `key`), e.g. "a.id" when the table
+    is aliased. Returns the total rowcount. Offline (--sql) the statement
+    is emitted once over the whole table, since the key range is not known.
+    """
+    if op.get_context().as_sql:
+        op.execute(statement.format(batch="1 = 1"))
+        return 0
+
+    range_key = range_key or key
+    batch = sa.text(statement.format(batch=f"{range_key} >= :low AND {range_key} < :high"))
+    affected = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        low, high = bind.execute(sa.text(f"SELECT min({key}), max({key}) FROM {table}")).one()
+        if low is None:
+            return 0
+        while low <= high:
+            affected += bind.execute(batch, {"low": low, "high": low + batch_size}).rowcount
+            low += batch_size
+            if pause and low <= high:
+                time.sleep(pause)
+    logging.info("Batched statement affected %s row(s) of %s", affected, table)
+    return affected
+
+
+def backfill_in_batches(table: str, assignments: str, where: str | None = None, key: str = "id",
+                        batch_size: int = BACKFILL_BATCH_SIZE, pause: float = BACKFILL_PAUSE_SECONDS) -> int:
+    """`UPDATE table SET assignments [WHERE where]` over `key` ranges of batch_size, committing each.
+
+    Returns the number of rows updated. Offline (--sql) the update is
+    emitted as a single statement, since the key range is not known.
+    """
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table} SET {assignments}{f' WHERE {where}' if where else ''}")
+        return 0
+    condition = f" AND ({where})" if where else ""
+    return execute_in_batches(
+        table, f"UPDATE {table} SET {assignments} WHERE {{batch}}{condition}", key=key, batch_size=batch_size, pause=pause,
+    )
@@ -0,0 +1,274 @@
+"""Delivery of outbox events (app.models.outbox) to downstream sinks.
+
+Requests only INSERT events, in the transaction that makes the change; all
+delivery happens here, off the request path. OutboxDispatcher repeatedly:
+
+  1. claims up to OUTBOX_BATCH_SIZE due events with one UPDATE ... RETURNING
+     that pushes their available_at out by OUTBOX_LEASE_SECONDS (FOR UPDATE
+     SKIP LOCKED on Postgres, so dispatchers in several processes split the
+     backlog instead of sending it twice),
+  2. delivers them in up to OUTBOX_CONCURRENCY parallel calls to the sink,
+     partitioned by course (or user) so one course's events stay in order
+     within a batch,
+  3. deletes what was delivered and reschedules the rest with exponential
+     backoff (OUTBOX_RETRY_BASE_SECONDS doubling up to
+     OUTBOX_RETRY_MAX_SECONDS, with jitter).
+
+Delivery is at least once: a dispatcher that dies mid-batch leaves its
+claim to expire and the batch is sent again, and a retried event can
+arrive after later ones. Consumers dedupe on the event id.
+
+With OUTBOX_SINK set (file:///path/to/events.jsonl or an http(s) URL),
+every app process runs a dispatcher thread unless OUTBOX_IN_PROCESS=false,
+in which case run `python -m app.jobs.dispatch_outbox` instead. Without
+OUTBOX_SINK, app.crud.outbox records no events at all.
+"""
+import logging
+import os
+import random
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from os import getenv
+from urllib.parse import urlparse
+
+import orjson
+from sqlalchemy import delete, select, update
+
+from app.core.database import get_sessionmaker
+from app.core.metrics import SHARED_REFRESH
+from app.models.outbox import OutboxEvent
+
+OUTBOX_SINK = getenv("OUTBOX_SINK", "")
+OUTBOX_IN_PROCESS = getenv("OUTBOX_IN_PROCESS", "true").lower() in ("1", "true", "yes")
+OUTBOX_BATCH_SIZE = int(getenv("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_CONCURRENCY = int(getenv("OUTBOX_CONCURRENCY", "4"))
+OUTBOX_POLL_SECONDS = float(getenv("OUTBOX_POLL_SECONDS", "1"))
+OUTBOX_LEASE_SECONDS = float(getenv("OUTBOX_LEASE_SECONDS", "60"))
+OUTBOX_RETRY_BASE_SECONDS = float(getenv("OUTBOX_RETRY_BASE_SECONDS", "1"))
+OUTBOX_RETRY_MAX_SECONDS = float(getenv("OUTBOX_RETRY_MAX_SECONDS", "300"))
+OUTBOX_HTTP_TIMEOUT = float(getenv("OUTBOX_HTTP_TIMEOUT", "10"))
+
+# Kept on the row for operators; the full error is logged
+LAST_ERROR_LENGTH = 500
+
+
+class Sink:
+    """Where events go. deliver() must raise unless every event in the list was accepted."""
+
+    def deliver(self, events: list[dict]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FileSink(Sink):
+    """Appends one JSON line per event and fsyncs before returning."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def deliver(self, events: list[dict]):
+        body = b"".join(orjson.dumps(event) + b"\n" for event in events)
+        with self._lock, open(self.path, "ab") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class HttpSink(Sink):
+    """POSTs {"events": [...]} to a URL; any non-2xx response fails the whole call."""
+
+    def __init__(self, url: str, timeout: float = OUTBOX_HTTP_TIMEOUT):
+        import httpx
+
+        self.url = url
+        self._client = httpx.Client(timeout=timeout)
+
+    def deliver(self, events: list[dict]):
+        response = self._client.post(
+            self.url, content=orjson.dumps({"events": events}), headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+    def close(self):
+        self._client.close()
+
+
+def sink_from_url(url: str) -> Sink:
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return FileSink(parsed.path)
+    if parsed.scheme in ("http", "https"):
+        return HttpSink(url)
+    raise ValueError(f"Unsupported OUTBOX_SINK '{url}' (expected file://, http:// or https://)")
+
+
+def _event_body(row) -> dict:
+    return {
+        "id": row.id,
+        "type": row.event_type,
+        "created_at": row.created_at.isoformat(),
+        "attempt": row.attempts,
+        "payload": row.payload,
+    }
+
+
+def _partition(row) -> int:
+    payload = row.payload
+    return payload.get("course_id", payload.get("user_id", row.id))
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        sink: Sink,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        concurrency: int = OUTBOX_CONCURRENCY,
+        poll_seconds: float = OUTBOX_POLL_SECONDS,
+        lease_seconds: float = OUTBOX_LEASE_SECONDS,
+        retry_base_seconds: float = OUTBOX_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = OUTBOX_RETRY_MAX_SECONDS,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.lease = timedelta(seconds=lease_seconds)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.delivered = 0
+        self.failed = 0
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="outbox")
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def backoff(self, attempts: int) -> timedelta:
+        seconds = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+        return timedelta(seconds=seconds * random.uniform(0.5, 1.0))
+
+    def claim(self, db) -> list:
+        """Lease up to batch_size due events to this dispatcher and commit; returns them in id order."""
+        now = datetime.now(timezone.utc)
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.available_at, OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(due.scalar_subquery()))
+            .values(available_at=now + self.lease, attempts=OutboxEvent.attempts + 1)
+            .returning(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload, OutboxEvent.created_at, OutboxEvent.attempts)
+            .execution_options(synchronize_session=False, **SHARED_REFRESH)
+        ).all()
+        db.commit()
+        return sorted(rows, key=lambda row: row.id)
+
+    def run_once(self) -> int:
+        """Claim, deliver and settle one batch; returns the number of events claimed."""
+        db = get_sessionmaker()()
+        try:
+            rows = self.claim(db)
+            if not rows:
+                return 0
+
+            groups = defaultdict(list)
+            for row in rows:
+                groups[_partition(row) % self.concurrency].append(row)
+            futures = [(group, self._executor.submit(self.sink.deliver, [_event_body(row) for row in group]))
+                       for group in groups.values()]
+
+            delivered, retries = [], []
+            for group, future in futures:
+                error = future.exception()
+                if error is None:
+                    delivered.extend(row.id for row in group)
+                    continue
+                logging.warning("Outbox delivery of %s event(s) failed: %r", len(group), error)
+                failed_at = datetime.now(timezone.utc)
+                retries.extend(
+                    {"id": row.id, "available_at": failed_at + self.backoff(row.attempts), "last_error": repr(error)[:LAST_ERROR_LENGTH]}
+                    for row in group
+                )
+
+            if delivered:
+                db.execute(
+                    delete(OutboxEvent)
+                    .where(OutboxEvent.id.in_(delivered))
+                    .execution_options(synchronize_session=False, **SHARED_REFRESH)
+                )
+            if retries:
+                db.execute(update(OutboxEvent).execution_options(**SHARED_REFRESH), retries)
+            db.commit()
+            self.delivered += len(delivered)
+            self.failed += len(retries)
+            return len(rows)
+        finally:
+            db.close()
+
+    def drain(self) -> int:
+        """Run batches until nothing is due; returns the number of events claimed."""
+        claimed = total = self.run_once()
+        while claimed:
+            claimed = self.run_once()
+            total += claimed
+        return total
+
+    def run_forever(self):
+        """Dispatch until stop(); start() runs this in a daemon thread."""
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                claimed = self.run_once()
+                failures = 0
+            except Exception:
+                # Database, sink or serialization errors alike: leases on
+                # whatever was claimed expire and it is sent again, so keep
+                # the thread alive and back off rather than stop delivering
+                logging.exception("Outbox dispatch failed")
+                failures += 1
+                self._stop.wait(self.backoff(failures).total_seconds())
+                continue
+            if claimed < self.batch_size:
+                self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        self.sink.close()
+
+
+def dispatcher_from_env() -> OutboxDispatcher | None:
+    return OutboxDispatcher(sink_from_url(OUTBOX_SINK)) if OUTBOX_SINK else None
+
+
+_dispatcher: OutboxDispatcher | None = None
+
+
+def start_dispatcher():
+    """Startup hook: run a dispatcher thread in this process if configured."""
+    global _dispatcher
+    if OUTBOX_IN_PROCESS and _dispatcher is None:
+        _dispatcher = dispatcher_from_env()
+        if _dispatcher is not None:
+            _dispatcher.start()
+            logging.info("Outbox dispatcher started (sink %s)", urlparse(OUTBOX_SINK).scheme)
+
+
+def stop_dispatcher():
+    global _dispatcher
+    if _dispatcher is not None:
+        _dispatcher.stop()
+        _dispatcher = None
@@ -0,0 +1,97 @@
+"""Opaque-cursor keyset pagination shared by the list endpoints.
+
+A cursor is the base64url-encoded JSON of the sort key of the last row on the
+previous page, so fetching page N costs the same as fetching page 1
+(`WHERE key > :last ORDER BY key LIMIT :n`) instead of degrading with OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+from fastapi import Query, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class PageParams(NamedTuple):
+    after: list | None
+    limit: int
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, default=lambda v: v.isoformat(), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(values, list) or not values:
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def page_params(
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    return PageParams(after=decode_cursor(cursor) if cursor else None, limit=limit)
+
+
+def _coerce(column, value):
+    try:
+        if column.type.python_type is datetime:
+            return datetime.fromisoformat(value)
+        return column.type.python_type(value)
+    except (TypeError, ValueError, NotImplementedError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def _keyset(query, key_columns: list, params: PageParams):
+    if params.after is not None:
+        if len(params.after) != len(key_columns):
+            raise InvalidCursorError("Invalid cursor")
+        after = [_coerce(col, value) for col, value in zip(key_columns, params.after)]
+        if len(key_columns) == 1:
+            query = query.filter(key_columns[0] > after[0])
+        else:
+            query = query.filter(tuple_(*key_columns) > tuple_(*after))
+    # One extra row tells us whether another page exists without a COUNT
+    return query.order_by(*key_columns).limit(params.limit + 1)
+
+
+def paginate(query, key_columns: list, params: PageParams) -> dict:
+    """Apply keyset pagination to an ORM query ordered by `key_columns` (which must be unique together)."""
+    rows = _keyset(query, key_columns, params).all()
+    items = rows[:params.limit]
+    next_cursor = None
+    if len(rows) > params.limit:
+        next_cursor = encode_cursor([getattr(items[-1], col.key) for col in key_columns])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def paginate_rows(db, stmt, key_columns: list, params: PageParams) -> dict:
+    """paginate() for a Core select() of plain columns; items are dicts ready for orjson."""
+    result = db.execute(_keyset(stmt, key_columns, params))
+    keys = list(result.keys())
+    items = [dict(zip(keys, row)) for row in result]
+    next_cursor = None
+    if len(items) > params.limit:
+        del items[params.limit:]
+        next_cursor = encode_cursor([items[-1][col.key] for col in key_columns])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
@@ -0,0 +1,182 @@
+"""Connection pool profiles, statement timeouts and disconnect handling for every engine.
+
+DB_POOL_PROFILE picks how connections are pooled:
+
+  queue      QueuePool of DB_POOL_SIZE (+ DB_MAX_OVERFLOW), FIFO; the default
+  lifo       the same, but hands out the most recently used connection, so
+             connections beyond the steady-state load sit idle and are
+             recycled after DB_POOL_RECYCLE seconds
+  pgbouncer  NullPool: PgBouncer (transaction mode) does the pooling, each
+             checkout is a fresh client connection to it
+
+There is no pre-ping round trip on checkout by default. A statement that
+fails with a disconnect error invalidates every connection in that pool
+(SQLAlchemy's default), so one request fails after a database restart and
+the next ones reconnect; DB_POOL_RECYCLE retires connections before server
+or proxy idle timeouts can kill them.
+
+Settings are parsed and validated when app.core.database is imported, so a
+bad value stops the process at startup.
+"""
+import logging
+import time
+from os import getenv
+from typing import NamedTuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.metrics import instrument_engine
+
+PROFILES = ("queue", "lifo", "pgbouncer")
+
+
+class PoolSettings(NamedTuple):
+    profile: str
+    size: int
+    max_overflow: int
+    timeout: float
+    recycle: int
+    pre_ping: bool
+    statement_timeout_ms: int
+
+
+def _env_number(name: str, default: str, cast, minimum):
+    raw = getenv(name, default)
+    try:
+        value = cast(raw)
+    except ValueError:
+        raise ValueError(f"{name}={raw!r} is not a valid {cast.__name__}")
+    if value < minimum:
+        raise ValueError(f"{name}={raw!r} must be at least {minimum}")
+    return value
+
+
+def pool_settings_from_env() -> PoolSettings:
+    """Read and validate the DB_POOL_* / DB_STATEMENT_TIMEOUT_MS settings; raises ValueError."""
+    profile = getenv("DB_POOL_PROFILE", "queue").lower()
+    if profile not in PROFILES:
+        raise ValueError(f"DB_POOL_PROFILE={profile!r} is not one of {', '.join(PROFILES)}")
+    settings = PoolSettings(
+        profile=profile,
+        size=_env_number("DB_POOL_SIZE", "5", int, 1),
+        max_overflow=_env_number("DB_MAX_OVERFLOW", "10", int, -1),
+        timeout=_env_number("DB_POOL_TIMEOUT", "30", float, 0),
+        # -1 = never; the lifo profile needs a limit to shed its idle connections
+        recycle=_env_number("DB_POOL_RECYCLE", "300" if profile == "lifo" else "1800", int, -1),
+        pre_ping=getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes"),
+        statement_timeout_ms=_env_number("DB_STATEMENT_TIMEOUT_MS", "30000", int, 0),
+    )
+    if profile == "lifo" and settings.recycle <= 0:
+        raise ValueError("DB_POOL_PROFILE=lifo needs DB_POOL_RECYCLE > 0")
+    return settings
+
+
+POOL_SETTINGS = pool_settings_from_env()
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waited (or connected), via the engine's metrics stats."""
+
+    _metrics_stats = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self._metrics_stats is not None:
+                self._metrics_stats.timeouts += 1
+            raise
+        if self._metrics_stats is not None:
+            self._metrics_stats.observe_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # dispose() swaps in a new pool; keep reporting into the same stats
+        pool = super().recreate()
+        pool._metrics_stats = self._metrics_stats
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def engine_options(url, connect_args: dict | None = None, is_async: bool = False, settings: PoolSettings = POOL_SETTINGS) -> dict:
+    """create_engine()/create_async_engine() keyword arguments for `url` under `settings`."""
+    parsed = make_url(url)
+    options = {"connect_args": dict(connect_args or {})}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's pool for it
+        return options
+
+    options["pool_pre_ping"] = settings.pre_ping
+    if settings.profile == "pgbouncer":
+        options["poolclass"] = TimedNullPool
+        if is_async and parsed.get_backend_name() == "postgresql":
+            # Prepared statements don't survive PgBouncer handing us another server connection
+            options["connect_args"].update(statement_cache_size=0, prepared_statement_cache_size=0)
+    else:
+        options.update(
+            poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+            pool_size=settings.size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.timeout,
+            pool_recycle=settings.recycle,
+            pool_use_lifo=settings.profile == "lifo",
+        )
+    return options
+
+
+def apply_statement_timeout(engine, settings: PoolSettings = POOL_SETTINGS):
+    """Cap statement run time on Postgres (`engine` is sync, or an AsyncEngine's sync_engine)."""
+    if not settings.statement_timeout_ms or engine.dialect.name != "postgresql":
+        return
+    timeout = int(settings.statement_timeout_ms)
+    if settings.profile == "pgbouncer":
+        # Session settings don't stick in transaction mode; set it per transaction
+        @event.listens_for(engine, "begin")
+        def set_local_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+    else:
+        @event.listens_for(engine, "connect")
+        def set_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(f"SET statement_timeout = {timeout}")
+            finally:
+                cursor.close()
+            if hasattr(dbapi_connection, "commit"):
+                dbapi_connection.commit()
+
+
+def log_disconnects(engine, name: str):
+    """Log the pool invalidation SQLAlchemy performs when a statement hits a dead connection."""
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        if context.is_disconnect and context.invalidate_pool_on_disconnect:
+            logging.warning("Database connection lost on %s engine; discarding its pooled connections", name)
+
+
+def configure_engine(engine, name: str, settings: PoolSettings = POOL_SETTINGS):
+    """Metrics, statement timeout and disconnect logging for a new engine (sync, or an AsyncEngine's sync_engine)."""
+    instrument_engine(engine, name)
+    apply_statement_timeout(engine, settings)
+    log_disconnects(engine, name)
+
+
+def check_connectivity(engine):
+    """Open one connection and run a trivial query; raises if the database is unreachable."""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
@@ -0,0 +1,137 @@
+"""Login throttling shared by every worker process on the host.
+
+Token buckets live in a memory-mapped file (under /dev/shm where available),
+so uvicorn/gunicorn workers see the same counts without Redis or another
+service. The table is set-associative: a key hashes to one bucket of WAYS
+slots and, when all are taken, evicts the least recently touched one.
+Updates are serialized per stripe of buckets, by a threading lock within
+the process and an fcntl byte-range lock across processes.
+"""
+import fcntl
+import mmap
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import time
+from hashlib import blake2b
+
+# "<attempts>/<seconds>": bucket size and the window it refills over; 0 disables
+LOGIN_RATE_LIMIT_IP = os.getenv("LOGIN_RATE_LIMIT_IP", "300/60")
+LOGIN_RATE_LIMIT_EMAIL = os.getenv("LOGIN_RATE_LIMIT_EMAIL", "10/60")
+LOGIN_RATE_LIMIT_FILE = os.getenv(
+    "LOGIN_RATE_LIMIT_FILE",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "course_enrollment_login_limits"),
+)
+
+# Proxies in front of the app that append to X-Forwarded-For (1 on Render).
+# The client is the entry this many from the right; anything further left
+# is whatever the client sent. 0 keys on the socket peer address.
+LOGIN_TRUSTED_PROXY_HOPS = int(os.getenv("LOGIN_TRUSTED_PROXY_HOPS", "0"))
+if LOGIN_TRUSTED_PROXY_HOPS < 0:
+    raise ValueError(f"LOGIN_TRUSTED_PROXY_HOPS={LOGIN_TRUSTED_PROXY_HOPS} must be at least 0")
+
+BUCKETS = 16384
+WAYS = 4
+STRIPES = 64
+
+_HEADER = struct.Struct("<8sII16s")  # magic, buckets, ways, hash salt
+_SLOT = struct.Struct("<Qdd")  # key fingerprint (0 = empty), tokens, last update (monotonic)
+_MAGIC = b"CEPRL001"
+
+
+def client_address(peer: str | None, forwarded_for: str | None, trusted_hops: int) -> str:
+    """The address to throttle: the X-Forwarded-For entry added by the outermost trusted proxy, else the peer."""
+    if trusted_hops > 0 and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if len(hops) >= trusted_hops:
+            return hops[-trusted_hops]
+    return peer or "unknown"
+
+
+def parse_limit(spec: str) -> tuple[float, float]:
+    """'10/60' -> (capacity 10, refill 10/60 tokens per second); '0' -> (0, 0), i.e. off."""
+    attempts, _, seconds = spec.partition("/")
+    capacity = float(attempts)
+    if capacity <= 0:
+        return 0.0, 0.0
+    return capacity, capacity / float(seconds or 60)
+
+
+class SharedRateLimiter:
+    def __init__(self, path: str = LOGIN_RATE_LIMIT_FILE, buckets: int = BUCKETS, ways: int = WAYS, stripes: int = STRIPES):
+        self.buckets, self.ways, self.stripes = buckets, ways, stripes
+        self._size = _HEADER.size + buckets * ways * _SLOT.size
+        # A whole bucket's slots in one unpack
+        self._bucket = struct.Struct("<" + "Qdd" * ways)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Stripe locks are single bytes past the end of the table
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _HEADER.size, 0)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            current = _HEADER.unpack(header) if len(header) == _HEADER.size else None
+            if current is None or current[:3] != (_MAGIC, buckets, ways) or os.fstat(self._fd).st_size != self._size:
+                # New file or an old layout: start from an empty table
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self._size)
+                os.pwrite(self._fd, _HEADER.pack(_MAGIC, buckets, ways, secrets.token_bytes(16)), 0)
+                current = _HEADER.unpack(os.pread(self._fd, _HEADER.size, 0))
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _HEADER.size, 0)
+        # Salted so nobody can aim keys at one bucket to evict a victim's slot
+        self._salt = current[3]
+        self._mm = mmap.mmap(self._fd, self._size)
+
+    def hit(self, key: str, capacity: float, per_second: float) -> float:
+        """Take one token from `key`'s bucket; returns 0.0 if allowed, else seconds until one is available."""
+        fingerprint = int.from_bytes(blake2b(key.encode(), digest_size=8, key=self._salt).digest(), "little") or 1
+        bucket = fingerprint % self.buckets
+        stripe = bucket % self.stripes
+        base = _HEADER.size + bucket * self.ways * _SLOT.size
+        mm = self._mm
+
+        with self._locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self._size + stripe)
+            try:
+                now = time.monotonic()
+                slots = self._bucket.unpack_from(mm, base)
+                victim, victim_updated = 0, slots[2]
+                for way in range(self.ways):
+                    slot_fingerprint, tokens, updated = slots[3 * way:3 * way + 3]
+                    if slot_fingerprint == fingerprint:
+                        tokens = min(capacity, tokens + (now - updated) * per_second)
+                        break
+                    if updated < victim_updated:
+                        victim, victim_updated = way, updated
+                else:
+                    way, tokens = victim, capacity
+                offset = base + way * _SLOT.size
+
+                if tokens >= 1:
+                    _SLOT.pack_into(mm, offset, fingerprint, tokens - 1, now)
+                    return 0.0
+                _SLOT.pack_into(mm, offset, fingerprint, tokens, now)
+                return (1 - tokens) / per_second
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._size + stripe)
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+
+_login_limiter = None
+_login_limiter_lock = threading.Lock()
+
+
+def get_login_limiter() -> SharedRateLimiter:
+    """The process-wide limiter; the shared file is opened on first use."""
+    global _login_limiter
+    if _login_limiter is None:
+        with _login_limiter_lock:
+            if _login_limiter is None:
+                _login_limiter = SharedRateLimiter()
+    return _login_limiter
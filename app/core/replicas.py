@@ -0,0 +1,174 @@
+"""Read replicas for the read-only routes.
+
+DATABASE_REPLICA_URLS (comma-separated) adds one engine per replica. Read
+routes take their session from `get_read_db` / `get_async_read_db`, which
+round-robin across the replicas that passed their last health check and fall
+back to the primary when there are none.
+
+Health is re-checked every REPLICA_CHECK_SECONDS by whichever request comes
+along first (the others keep the current view): a replica is healthy if it
+answers and, on Postgres, replays WAL within REPLICA_MAX_LAG_SECONDS. A
+connection error on a replica takes it out of rotation straight away.
+
+Read-your-writes: after a student enrolls or deregisters, their reads go to
+the primary for READ_YOUR_WRITES_SECONDS. The pin is kept in this process
+and in a cookie, so it also holds when the next request lands on another
+worker (for clients that keep cookies).
+"""
+import itertools
+import logging
+import threading
+import time
+from os import getenv
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import async_database_url, connect_args_for, normalize_url
+from app.core.metrics import SHARED_REFRESH
+from app.core.pooling import configure_engine, engine_options
+
+DATABASE_REPLICA_URLS = [normalize_url(url.strip()) for url in getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_CHECK_SECONDS = float(getenv("REPLICA_CHECK_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS = float(getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+READ_YOUR_WRITES_SECONDS = float(getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+PIN_COOKIE = "read_primary_until"
+
+# Seconds since the last replayed transaction; NULL on a primary. A replica
+# with nothing new to replay reports an old timestamp, hence the LSN check.
+_PG_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+).execution_options(**SHARED_REFRESH)
+_PING = text("SELECT 1").execution_options(**SHARED_REFRESH)
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.engine = create_engine(url, **engine_options(url, connect_args_for(url)))
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.lag: float | None = None
+        self._async_sessionmaker = None
+        configure_engine(self.engine, name)
+        event.listen(self.engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect:
+            logging.warning("Replica %s lost its connection; taking it out of rotation", self.name)
+            self.healthy = False
+
+    def check(self, max_lag: float):
+        try:
+            with self.engine.connect() as conn:
+                if self.engine.dialect.name == "postgresql":
+                    lag = conn.execute(_PG_LAG).scalar()
+                    self.lag = float(lag) if lag is not None else 0.0
+                else:
+                    conn.execute(_PING)
+                    self.lag = 0.0
+            self.healthy = self.lag <= max_lag
+        except SQLAlchemyError:
+            logging.warning("Replica %s failed its health check", self.name, exc_info=True)
+            self.lag = None
+            self.healthy = False
+
+    def async_sessionmaker(self):
+        """Created on first use, as for the primary, so sync deployments need no async driver."""
+        if self._async_sessionmaker is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            url, async_connect_args = async_database_url(self.url)
+            async_engine = create_async_engine(url, **engine_options(url, async_connect_args, is_async=True))
+            configure_engine(async_engine.sync_engine, f"{self.name}-async")
+            event.listen(async_engine.sync_engine, "handle_error", self._on_error)
+            self._async_sessionmaker = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        return self._async_sessionmaker
+
+
+class ReplicaSet:
+    def __init__(self, urls: list[str], check_seconds: float = REPLICA_CHECK_SECONDS, max_lag: float = REPLICA_MAX_LAG_SECONDS):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self.check_seconds = check_seconds
+        self.max_lag = max_lag
+        self._checked_at: float | None = None
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+
+    def check_due(self) -> bool:
+        return bool(self.replicas) and (self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds)
+
+    def maybe_check(self):
+        if not self.check_due() or not self._lock.acquire(blocking=False):
+            return
+        try:
+            if self.check_due():
+                for replica in self.replicas:
+                    replica.check(self.max_lag)
+        finally:
+            self._checked_at = time.monotonic()
+            self._lock.release()
+
+    def pick(self) -> Replica | None:
+        """The next healthy replica in turn, or None to use the primary."""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def info(self) -> list[dict]:
+        return [{"name": r.name, "healthy": r.healthy, "lag_seconds": r.lag} for r in self.replicas]
+
+
+class PrimaryPins:
+    """user id -> monotonic time until which that user's reads go to the primary."""
+
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS):
+        self.window = window
+        self._until: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def pin(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) > 10_000:
+                self._until = {uid: until for uid, until in self._until.items() if until > now}
+            self._until[user_id] = now + self.window
+
+    def is_pinned(self, user_id: int) -> bool:
+        return self._until.get(user_id, 0.0) > time.monotonic()
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS)
+primary_pins = PrimaryPins()
+
+
+def pin_to_primary(response: Response, user_id: int):
+    """Call after a user's write so their next reads see it."""
+    primary_pins.pin(user_id)
+    if replica_set.replicas:
+        response.set_cookie(
+            PIN_COOKIE, str(time.time() + primary_pins.window),
+            max_age=max(1, int(primary_pins.window)), httponly=True, samesite="lax",
+        )
+
+
+def _pinned(request: Request, user_id: int) -> bool:
+    if primary_pins.is_pinned(user_id):
+        return True
+    try:
+        return float(request.cookies.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_replica(request: Request, user_id: int) -> Replica | None:
+    """The replica to serve this read from, or None for the primary. Run maybe_check() first."""
+    if not replica_set.replicas or _pinned(request, user_id):
+        return None
+    return replica_set.pick()
@@ -0,0 +1,19 @@
+"""Response classes for the hot read endpoints.
+
+Handlers that build plain dicts from Core rows return these directly, which
+skips FastAPI's per-item response_model validation and the stdlib json
+encoder. The route keeps its response_model, so the OpenAPI schema is
+unchanged; keep the dict keys in step with that model.
+"""
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def json_bytes(content) -> bytes:
+    # OPT_UTC_Z writes UTC datetimes as ...Z, matching what Pydantic emits
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return json_bytes(content)
@@ -0,0 +1,117 @@
+"""In-process view of revoked auth epochs.
+
+Access tokens carry the user's auth epoch; bumping it (activation,
+deactivation, deletion) appends to the auth_revocations log. Each process
+keeps `user_id -> lowest valid epoch` in memory and reads the log entries
+added since its last read every REVOCATION_REFRESH_SECONDS, so
+authenticating a request is a dict lookup rather than a users query. Bumps
+made in this process apply immediately; other processes see them within one
+refresh interval of their commit.
+
+The log is tailed by id, not by time: created_at is the transaction start
+on Postgres, so a slow transaction can commit an entry far older than the
+last read. Ids are handed out at insert rather than commit, so ids skipped
+over by a read (their transaction still running, or rolled back) are asked
+for again on every refresh until they show up or a token lifetime passes.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from os import getenv
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.database import get_sessionmaker
+from app.core.metrics import SHARED_REFRESH
+from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.models.auth_revocation import AuthRevocation
+
+REVOCATION_REFRESH_SECONDS = float(getenv("REVOCATION_REFRESH_SECONDS", "5"))
+
+# Skipped ids are not tracked across a jump wider than this (sequence
+# cache loss after a crash); they are logged instead
+MAX_TRACKED_GAP = 1000
+
+
+class RevocationList:
+    def __init__(self, refresh_seconds: float = REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._floors: dict[int, int] = {}
+        self._last_id: int | None = None
+        # Skipped id -> monotonic time it was first skipped
+        self._gaps: dict[int, float] = {}
+        self._refreshed_at: float | None = None
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int, epoch: int):
+        """Apply a bump locally; tokens for `user_id` below `epoch` are revoked."""
+        if epoch > self._floors.get(user_id, 0):
+            self._floors[user_id] = epoch
+
+    def is_revoked(self, user_id: int, epoch: int, refresh: bool = True) -> bool:
+        """Whether the token epoch is below the user's floor; `refresh=False` skips the due refresh (async callers run it off the loop first)."""
+        if refresh:
+            self.maybe_refresh()
+        return epoch < self._floors.get(user_id, 0)
+
+    def refresh_due(self) -> bool:
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds
+
+    def maybe_refresh(self):
+        if not self.refresh_due():
+            return
+        # The first load blocks everyone; later refreshes are done by whoever
+        # gets there first while the rest keep using the current view.
+        if not self._lock.acquire(blocking=self._refreshed_at is None):
+            return
+        try:
+            if self.refresh_due():
+                self.refresh()
+        finally:
+            self._lock.release()
+
+    def refresh(self):
+        """Pull log entries past the last id read, plus skipped ids (entries from the token lifetime on first load)."""
+        lifetime = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        stmt = select(AuthRevocation.id, AuthRevocation.user_id, AuthRevocation.epoch)
+        if self._last_id is None:
+            stmt = stmt.where(AuthRevocation.created_at >= datetime.now(timezone.utc) - lifetime)
+        elif self._gaps:
+            stmt = stmt.where(or_(AuthRevocation.id > self._last_id, AuthRevocation.id.in_(self._gaps)))
+        else:
+            stmt = stmt.where(AuthRevocation.id > self._last_id)
+        db = get_sessionmaker()()
+        try:
+            rows = db.execute(stmt.order_by(AuthRevocation.id).execution_options(**SHARED_REFRESH)).all()
+            if self._last_id is None and not rows:
+                self._last_id = db.execute(
+                    select(func.coalesce(func.max(AuthRevocation.id), 0)).execution_options(**SHARED_REFRESH)
+                ).scalar()
+            for entry_id, user_id, epoch in rows:
+                self.record(user_id, epoch)
+                self._advance(entry_id)
+            expired = time.monotonic() - lifetime.total_seconds()
+            self._gaps = {entry_id: seen for entry_id, seen in self._gaps.items() if seen > expired}
+        except SQLAlchemyError:
+            # Keep serving the last good view and try again next interval
+            logging.exception("Could not refresh the auth revocation list")
+        finally:
+            db.close()
+            self._refreshed_at = time.monotonic()
+
+    def _advance(self, entry_id: int):
+        """Mark `entry_id` read, noting any ids it skips past."""
+        if self._gaps.pop(entry_id, None) is not None:
+            return
+        if self._last_id is not None and entry_id > self._last_id + 1:
+            skipped = range(self._last_id + 1, entry_id)
+            if len(skipped) <= MAX_TRACKED_GAP:
+                now = time.monotonic()
+                self._gaps.update((gap, now) for gap in skipped)
+            else:
+                logging.warning("Auth revocation ids jumped from %s to %s; not waiting for the ones between", self._last_id, entry_id)
+        self._last_id = max(self._last_id or 0, entry_id)
+
+revocations = RevocationList()
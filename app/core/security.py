@@ -1,12 +1,22 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple
 from jose import JWTError, jwt
 from os import getenv
+import time
 
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Changing this rehashes each user's password on their next successful login
+PASSWORD_HASH_ROUNDS = int(getenv("PASSWORD_HASH_ROUNDS", "29000"))
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_desired_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_desired_rounds=PASSWORD_HASH_ROUNDS,
+)
 
 def hash_password(password: str) -> str:
    
@@ -21,10 +31,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     pw = plain_password[:72]
     return pwd_context.verify(pw, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Like verify_password, plus a new hash if `hashed_password` was made with other parameters."""
+    if plain_password is None:
+        plain_password = ""
+    pw = plain_password[:72]
+    return pwd_context.verify_and_update(pw, hashed_password)
+
 
 SECRET_KEY = getenv("SECRET_KEY", "fallback-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# Distinct tokens whose signature check is remembered per process
+TOKEN_CACHE_SIZE = int(getenv("TOKEN_CACHE_SIZE", "4096"))
 
 def create_access_token(data: dict, expires_delta: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = data.copy()
@@ -32,3 +51,34 @@ def create_access_token(data: dict, expires_delta: int = ACCESS_TOKEN_EXPIRE_MIN
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+class TokenUser(NamedTuple):
+    """The authenticated caller as described by their access token; no DB row behind it."""
+    id: int
+    email: str
+    role: str
+    epoch: int
+
+
+def create_user_token(user) -> str:
+    return create_access_token(data={"sub": user.email, "uid": user.id, "role": user.role, "epoch": user.auth_epoch})
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _verified_claims(token: str) -> tuple[TokenUser, float]:
+    # Expiry is checked per call in decode_access_token, so cached entries can't outlive it
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    try:
+        user = TokenUser(int(payload["uid"]), payload["sub"], payload["role"], int(payload["epoch"]))
+        return user, float(payload["exp"])
+    except (KeyError, TypeError, ValueError):
+        raise JWTError("Token is missing claims")
+
+
+def decode_access_token(token: str) -> TokenUser:
+    """Verify a token (once per process, then from the LRU) and return its user; raises JWTError."""
+    user, expires = _verified_claims(token)
+    if expires <= time.time():
+        raise JWTError("Signature has expired")
+    return user
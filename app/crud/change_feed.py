@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import BigInteger, Text, cast, delete, exists, func, insert, select, tuple_
+from sqlalchemy.orm import Session, aliased
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.models.change_log_horizon import ChangeLogHorizon
+from app.models.enrollment_change import EnrollmentChange
+
+ENROLLMENT_LOG = "enrollments"
+
+# Feed rows as returned to clients (txid only goes into the cursor)
+CHANGE_OUT_COLUMNS = (
+    EnrollmentChange.seq, EnrollmentChange.op, EnrollmentChange.enrollment_id, EnrollmentChange.user_id,
+    EnrollmentChange.course_id, EnrollmentChange.enrolled_at, EnrollmentChange.created_at.label("changed_at"),
+)
+
+
+class CursorExpiredError(Exception):
+    """The cursor predates tombstones that compaction removed; the client must resync from the start."""
+    message = "Cursor is older than the change log's retention; resync by reading from the start (omit `since`)"
+
+    def __init__(self):
+        super().__init__(self.message)
+
+
+def _bigint(xid8):
+    # xid8 has no direct cast to bigint
+    return cast(cast(xid8, Text), BigInteger)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def record_changes(db: Session, op: str, rows: list[dict]):
+    """Append "insert" or "delete" rows (enrollment_id, user_id, course_id[, enrolled_at]) in the caller's transaction."""
+    if not rows:
+        return
+    stmt = insert(EnrollmentChange)
+    if _is_postgres(db):
+        stmt = stmt.values(txid=_bigint(func.pg_current_xact_id()))
+    db.execute(stmt, [{"op": op, **row} for row in rows])
+
+
+def decode_change_cursor(cursor: str) -> list[int]:
+    """[txid, seq] of the last change read, then the [txid, seq] horizon the cursor was issued under."""
+    position = decode_cursor(cursor)
+    if len(position) != 4 or not all(isinstance(v, int) and not isinstance(v, bool) for v in position):
+        raise InvalidCursorError("Invalid cursor")
+    return position
+
+
+def _horizon_column(column):
+    return func.coalesce(
+        select(column).where(ChangeLogHorizon.name == ENROLLMENT_LOG).scalar_subquery(), 0
+    )
+
+
+def changes_since(db: Session, after: list[int] | None, limit: int) -> dict:
+    """Up to `limit` changes after the cursor `after` (None: from the start of the log).
+
+    At most two indexed statements whatever the table size. On Postgres,
+    rows written by transactions that were still running when this snapshot
+    was taken (txid >= its xmin) are held back, along with everything after
+    them, so a late commit is never skipped by a cursor that has moved on.
+
+    The compaction horizon is read in the same statement as the rows. A
+    cursor issued under an older horizon and positioned below the current
+    one may have missed removed tombstones: CursorExpiredError. Cursors
+    issued since, including a replay from the start, stay valid.
+    """
+    stmt = select(
+        *CHANGE_OUT_COLUMNS, EnrollmentChange.txid,
+        _horizon_column(ChangeLogHorizon.txid).label("horizon_txid"),
+        _horizon_column(ChangeLogHorizon.seq).label("horizon_seq"),
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(EnrollmentChange.txid, EnrollmentChange.seq) > tuple_(*after[:2]))
+    if _is_postgres(db):
+        stmt = stmt.where(EnrollmentChange.txid < _bigint(func.pg_snapshot_xmin(func.pg_current_snapshot())))
+    rows = db.execute(stmt.order_by(EnrollmentChange.txid, EnrollmentChange.seq).limit(limit + 1)).mappings().all()
+
+    if rows:
+        horizon = (rows[0]["horizon_txid"], rows[0]["horizon_seq"])
+    else:
+        row = db.execute(
+            select(ChangeLogHorizon.txid, ChangeLogHorizon.seq).where(ChangeLogHorizon.name == ENROLLMENT_LOG)
+        ).first()
+        horizon = tuple(row) if row is not None else (0, 0)
+    if after is not None and tuple(after[2:]) < horizon and tuple(after[:2]) < horizon:
+        raise CursorExpiredError()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    position = [rows[-1]["txid"], rows[-1]["seq"]] if rows else (after[:2] if after else [0, 0])
+    changes = [
+        {key: value for key, value in row.items() if key not in ("txid", "horizon_txid", "horizon_seq")}
+        for row in rows
+    ]
+    return {"changes": changes, "next_cursor": encode_cursor([*position, *horizon]), "has_more": has_more}
+
+
+def compact_change_log(db: Session, tombstone_retention: timedelta) -> tuple[int, int]:
+    """Drop inserts of deleted enrollments, then tombstones older than `tombstone_retention`, and commit.
+
+    Removing an insert whose tombstone is still in the log is invisible to
+    every reader: anyone who has not yet read the insert will read the
+    delete. Removing a tombstone is not, so the log's horizon moves up to the
+    highest one removed and cursors behind it get CursorExpiredError. Returns
+    (inserts removed, tombstones removed).
+    """
+    tombstone = aliased(EnrollmentChange)
+    superseded = db.execute(
+        delete(EnrollmentChange)
+        .where(
+            EnrollmentChange.op == "insert",
+            exists().where(tombstone.enrollment_id == EnrollmentChange.enrollment_id, tombstone.op == "delete"),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    cutoff = datetime.now(timezone.utc) - tombstone_retention
+    expired = db.execute(
+        delete(EnrollmentChange)
+        .where(EnrollmentChange.op == "delete", EnrollmentChange.created_at < cutoff)
+        .returning(EnrollmentChange.txid, EnrollmentChange.seq)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if expired:
+        txid, seq = max(tuple(row) for row in expired)
+        horizon = db.get(ChangeLogHorizon, ENROLLMENT_LOG, with_for_update=True)
+        if horizon is None:
+            db.add(ChangeLogHorizon(name=ENROLLMENT_LOG, txid=txid, seq=seq))
+        elif (txid, seq) > (horizon.txid, horizon.seq):
+            horizon.txid, horizon.seq = txid, seq
+    db.commit()
+    return superseded, len(expired)
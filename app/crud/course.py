@@ -1,7 +1,69 @@
+from sqlalchemy import delete, select, case
 from sqlalchemy.orm import Session
+from app.core.cache import catalog_version
+from app.core.database import insert_for
 from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.core.pagination import PageParams, paginate, paginate_rows
+from app.crud.outbox import record_events
+from app.crud.seats import layout_shards
+from app.crud.waitlist import promote_waitlisted
 from app.schemas.course import CourseCreate, CourseUpdate
 
+def get_course(db: Session, course_id: int, active_only: bool = False):
+    query = db.query(Course).filter(Course.id == course_id)
+    if active_only:
+        query = query.filter(Course.is_active == True)
+    return query.first()
+
+def get_course_by_code(db: Session, code: str):
+    return db.query(Course).filter(Course.code == code).first()
+
+# CourseOut's fields as plain columns, for the catalog's ORM-free read path
+COURSE_OUT_COLUMNS = (
+    Course.title, Course.code, Course.capacity, Course.id, Course.is_active, Course.enrolled_total.label("enrolled_count"),
+    case((Course.capacity > Course.enrolled_total, Course.capacity - Course.enrolled_total), else_=0).label("seats_left"),
+)
+
+def get_active_courses(db: Session, page: PageParams):
+    """One catalog page as CourseOut-shaped dicts."""
+    return paginate_rows(db, select(*COURSE_OUT_COLUMNS).where(Course.is_active == True), [Course.id], page)
+
+def get_active_course_row(db: Session, course_id: int):
+    """One active course as a CourseOut-shaped dict, or None."""
+    row = db.execute(
+        select(*COURSE_OUT_COLUMNS).where(Course.id == course_id, Course.is_active == True)
+    ).mappings().first()
+    return dict(row) if row else None
+
+# Keyset columns per roster sort; Enrollment.id follows enrollment order and breaks name ties
+ROSTER_SORT_KEYS = {
+    "enrolled_at": [Enrollment.id],
+    "name": [User.name, Enrollment.id],
+}
+
+def get_course_students(db: Session, course_id: int, page: PageParams, sort: str = "enrolled_at"):
+    """One page of a course's roster from a single enrollments-users join."""
+    query = (
+        db.query(
+            Enrollment.id, Enrollment.user_id, Enrollment.created_at,
+            User.name, User.email, User.role, User.is_active,
+        )
+        .join(User, User.id == Enrollment.user_id)
+        .filter(Enrollment.course_id == course_id)
+    )
+    result = paginate(query, ROSTER_SORT_KEYS[sort], page)
+    result["items"] = [
+        {
+            "id": row.user_id, "name": row.name, "email": row.email, "role": row.role,
+            "is_active": row.is_active, "enrolled_at": row.created_at,
+        }
+        for row in result["items"]
+    ]
+    return result
+
 def create_course(db: Session, course: CourseCreate):
     new_course = Course(
         title=course.title,
@@ -10,20 +72,95 @@ def create_course(db: Session, course: CourseCreate):
         is_active=True
     )
     db.add(new_course)
+    catalog_version.bump(db)
     db.commit()
     db.refresh(new_course)
     return new_course
 
+def upsert_courses(db: Session, rows: list[dict]):
+    """Insert or update (by code) a batch of validated course rows; returns (inserted_codes, updated_codes).
+
+    `rows` must not repeat a code. Runs as one executemany upsert and commits.
+    As in update_course, a changed course gets a course.updated event, a
+    changed capacity on a sharded course re-lays its counter shards, and a
+    capacity increase promotes from the waitlist, all in the same transaction.
+    """
+    codes = [row["code"] for row in rows]
+    # Locked so a concurrent update_course cannot slip between this read and the upsert
+    before = {
+        row.code: row
+        for row in db.execute(
+            select(Course.code, Course.title, Course.capacity, Course.counter_shards)
+            .where(Course.code.in_(codes))
+            .with_for_update()
+        )
+    }
+
+    insert = insert_for(db)
+    stmt = insert(Course)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Course.code],
+        set_={"title": stmt.excluded.title, "capacity": stmt.excluded.capacity},
+    ).returning(Course.id, Course.code, Course.title, Course.capacity)
+    after = db.execute(stmt, [{**row, "is_active": True} for row in rows]).all()
+
+    events, grown, sharded = [], {}, []
+    for row in after:
+        old = before.get(row.code)
+        if old is None:
+            continue
+        changes = {field: getattr(row, field) for field in ("title", "capacity") if getattr(row, field) != getattr(old, field)}
+        if changes:
+            events.append({"course_id": row.id, "changes": changes})
+        if old.counter_shards > 1 and "capacity" in changes:
+            sharded.append(row.id)
+        if row.capacity > old.capacity:
+            grown[row.id] = row.capacity - old.capacity
+
+    if sharded:
+        courses = db.execute(
+            select(Course).where(Course.id.in_(sharded)).execution_options(populate_existing=True)
+        ).scalars().all()
+        for course in courses:
+            layout_shards(db, course, course.counter_shards)
+    record_events(db, "course.updated", events)
+    if grown:
+        # The new capacity must be in the counter rows before seats are claimed
+        db.flush()
+        for course_id in sorted(grown):
+            promote_waitlisted(db, course_id, grown[course_id])
+    catalog_version.bump(db)
+    db.commit()
+    return [code for code in codes if code not in before], [code for code in codes if code in before]
+
 def update_course(db: Session, course: Course, payload: CourseUpdate):
+    freed = (payload.capacity - course.capacity) if payload.capacity is not None else 0
     if payload.title is not None:
         course.title = payload.title
     if payload.capacity is not None:
         course.capacity = payload.capacity
     if payload.is_active is not None:
         course.is_active = payload.is_active
+    shards = payload.counter_shards if payload.counter_shards is not None else course.counter_shards
+    if shards != course.counter_shards or (shards > 1 and payload.capacity is not None):
+        layout_shards(db, course, shards)
 
     db.add(course)
+    changes = payload.model_dump(exclude_none=True)
+    if changes:
+        record_events(db, "course.updated", [{"course_id": course.id, "changes": changes}])
+    if freed > 0:
+        # The new capacity must be in the counter rows before seats are claimed
+        db.flush()
+        promote_waitlisted(db, course.id, freed)
+    catalog_version.bump(db)
     db.commit()
     db.refresh(course)
     return course
 
+def delete_course(db: Session, course: Course):
+    db.execute(delete(WaitlistEntry).where(WaitlistEntry.course_id == course.id))
+    db.delete(course)
+    catalog_version.bump(db)
+    db.commit()
+
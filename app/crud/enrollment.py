@@ -1,31 +1,269 @@
+from sqlalchemy import delete, select, func, or_
 from sqlalchemy.orm import Session
+from app.core.database import insert_for
+from app.core.pagination import PageParams, paginate, paginate_rows
+from app.crud.change_feed import record_changes
+from app.crud.outbox import record_events
+from app.crud.seats import claim_seat, claim_seats, release_seats
+from app.crud.waitlist import queue_student, promote_waitlisted
 from app.models.enrollment import Enrollment
 from app.models.course import Course
 from app.models.user import User
 
+# Bound parameters per IN (...) list; well under the Postgres and SQLite limits
+BULK_CHUNK_SIZE = 1000
+
+
+class EnrollmentError(Exception):
+    """Base class for enrollment rule violations; the message is safe to return to clients."""
+    message = "Enrollment failed"
+
+    def __init__(self, message: str | None = None):
+        super().__init__(message or self.message)
+
+class AlreadyEnrolledError(EnrollmentError):
+    message = "Student is already enrolled in this course"
+
+class CourseUnavailableError(EnrollmentError):
+    message = "Course does not exist or is inactive"
+
+class CourseFullError(EnrollmentError):
+    message = "Course is full"
+
+class AlreadyWaitlistedError(EnrollmentError):
+    message = "Student is already on this course's waitlist"
+
 
 def enroll_student(db: Session, user_id: int, course_id: int):
-    existing = db.query(Enrollment).filter(
+    """Enroll a student: claim a seat and insert the row in one short transaction.
+
+    claim_seat is a conditional UPDATE on the course's seat counter that locks
+    the row and re-checks capacity under the lock, so concurrent enrollments
+    cannot overbook and no enrollments are counted. INSERT ... ON CONFLICT DO
+    NOTHING on uq_enrollments_user_course then absorbs duplicates; rolling back
+    returns the claimed seat.
+    """
+    if not claim_seat(db, course_id):
+        db.rollback()
+        raise _enrollment_rejection(db, user_id, course_id)
+    return _insert_enrollment(db, user_id, course_id)
+
+
+def _insert_enrollment(db: Session, user_id: int, course_id: int):
+    """Insert the row for an already claimed seat and commit; a duplicate rolls back."""
+    row = db.execute(
+        insert_for(db)(Enrollment)
+        .values(user_id=user_id, course_id=course_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+        .returning(Enrollment.id, Enrollment.created_at)
+    ).first()
+    if row is None:
+        db.rollback()
+        raise AlreadyEnrolledError()
+
+    record_events(db, "enrollment.created", [
+        {"enrollment_id": row.id, "user_id": user_id, "course_id": course_id, "source": "student"},
+    ])
+    record_changes(db, "insert", [
+        {"enrollment_id": row.id, "user_id": user_id, "course_id": course_id, "enrolled_at": row.created_at},
+    ])
+    db.commit()
+    return Enrollment(id=row.id, user_id=user_id, course_id=course_id, created_at=row.created_at)
+
+
+def join_waitlist(db: Session, user_id: int, course_id: int):
+    """Enroll the student if a seat is free, otherwise put them on the waitlist.
+
+    Returns the new Enrollment, or None when the student was queued. Queueing
+    happens under the seat counter's lock (claim_seats), the same lock every
+    seat release holds while it promotes, so a seat freed concurrently is
+    either granted here or promoted to this entry once it is committed.
+    """
+    try:
+        return enroll_student(db, user_id, course_id)
+    except CourseFullError:
+        pass
+
+    granted = claim_seats(db, course_id, 1)
+    if granted is None:
+        db.rollback()
+        raise CourseUnavailableError()
+    if granted:
+        # A seat came free since enroll_student looked
+        return _insert_enrollment(db, user_id, course_id)
+
+    if not queue_student(db, user_id, course_id):
+        db.rollback()
+        raise AlreadyWaitlistedError()
+    db.commit()
+    return None
+
+
+def _enrollment_rejection(db: Session, user_id: int, course_id: int) -> EnrollmentError:
+    """Work out why the insert produced no row (only runs on the failure path)."""
+    existing = db.query(Enrollment.id).filter(
         Enrollment.user_id == user_id,
         Enrollment.course_id == course_id
     ).first()
     if existing:
-        raise Exception("Student is already enrolled in this course")
+        return AlreadyEnrolledError()
 
-    course = db.query(Course).filter(Course.id == course_id, Course.is_active == True).first()
+    course = db.query(Course.id).filter(Course.id == course_id, Course.is_active == True).first()
     if not course:
-        raise Exception("Course does not exist or is inactive")
+        return CourseUnavailableError()
 
-    
-    enrolled_count = db.query(Enrollment).filter(Enrollment.course_id == course_id).count()
-    if enrolled_count >= course.capacity:
-        raise Exception("Course is full")
+    return CourseFullError()
 
-    new_enrollment = Enrollment(
-        user_id=user_id,
-        course_id=course_id
-    )
-    db.add(new_enrollment)
+
+def bulk_enroll_students(db: Session, course_id: int, user_ids: list[int], emails: list[str]):
+    """Enroll a cohort into one course in a handful of statements.
+
+    Users are resolved in one query, capacity is claimed once for the whole
+    batch and the rows go in as a single multi-row INSERT ... ON CONFLICT DO
+    NOTHING. Returns one outcome per requested id/email, in request order.
+    """
+    wanted_ids = list(dict.fromkeys(user_ids))
+    wanted_emails = list(dict.fromkeys(email.lower() for email in emails))
+    users = db.execute(
+        select(User.id, func.lower(User.email).label("email"), User.role, User.is_active)
+        .where(or_(User.id.in_(wanted_ids), func.lower(User.email).in_(wanted_emails)))
+    ).all()
+    by_id = {u.id: u for u in users}
+    by_email = {u.email: u for u in users}
+
+    requested = [(by_id.get(uid), {"user_id": uid}) for uid in wanted_ids]
+    requested += [(by_email.get(email), {"email": email}) for email in wanted_emails]
+
+    candidates = list(dict.fromkeys(
+        u.id for u, _ in requested if u is not None and u.role == "student" and u.is_active
+    ))
+    already = set(db.execute(
+        select(Enrollment.user_id).where(Enrollment.course_id == course_id, Enrollment.user_id.in_(candidates))
+    ).scalars()) if candidates else set()
+    new_ids = [uid for uid in candidates if uid not in already]
+
+    granted = claim_seats(db, course_id, len(new_ids))
+    if granted is None:
+        db.rollback()
+        raise CourseUnavailableError()
+
+    inserted = set()
+    if granted:
+        rows = db.execute(
+            insert_for(db)(Enrollment)
+            .values([{"user_id": uid, "course_id": course_id} for uid in new_ids[:granted]])
+            .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+            .returning(Enrollment.id, Enrollment.user_id, Enrollment.created_at)
+        ).all()
+        inserted = {row.user_id for row in rows}
+        # Rows lost to a concurrent single enrollment give their seats back
+        release_seats(db, course_id, granted - len(inserted))
+        record_events(db, "enrollment.created", [
+            {"enrollment_id": row.id, "user_id": row.user_id, "course_id": course_id, "source": "admin"} for row in rows
+        ])
+        record_changes(db, "insert", [
+            {"enrollment_id": row.id, "user_id": row.user_id, "course_id": course_id, "enrolled_at": row.created_at} for row in rows
+        ])
+    db.commit()
+
+    seated = set(new_ids[:granted])
+    reported = set()
+    results = []
+    for user, key in requested:
+        if user is None:
+            results.append({**key, "status": "not_found"})
+            continue
+        if user.role != "student" or not user.is_active:
+            status = "ineligible"
+        elif user.id in inserted and user.id not in reported:
+            # A student listed by both id and email is reported as enrolled once
+            status = "enrolled"
+            reported.add(user.id)
+        elif user.id in already or user.id in seated:
+            status = "duplicate"
+        else:
+            status = "over_capacity"
+        results.append({"user_id": user.id, "email": user.email, "status": status})
+    return results
+
+
+def get_enrollment(db: Session, enrollment_id: int):
+    return db.query(Enrollment).filter(Enrollment.id == enrollment_id).first()
+
+# EnrollmentOut's fields; the list endpoints read these as plain rows
+ENROLLMENT_OUT_COLUMNS = (Enrollment.id, Enrollment.user_id, Enrollment.course_id, Enrollment.created_at)
+
+def get_all_enrollments(db: Session, page: PageParams):
+    """One page of all enrollments as EnrollmentOut-shaped dicts."""
+    return paginate_rows(db, select(*ENROLLMENT_OUT_COLUMNS), [Enrollment.id], page)
+
+def get_user_enrollments(db: Session, user_id: int):
+    """A user's enrollments as EnrollmentOut-shaped dicts."""
+    result = db.execute(select(*ENROLLMENT_OUT_COLUMNS).where(Enrollment.user_id == user_id))
+    return [dict(row) for row in result.mappings()]
+
+def user_enrollments_version(db: Session, user_id: int) -> tuple[int, int]:
+    """(count, max id) of a user's enrollments: changes on every enroll and drop, since ids are never reused."""
+    count, last_id = db.execute(
+        select(func.count(Enrollment.id), func.max(Enrollment.id)).where(Enrollment.user_id == user_id)
+    ).one()
+    return count, last_id or 0
+
+def get_course_enrollments(db: Session, course_id: int, page: PageParams):
+    return paginate(db.query(Enrollment).filter(Enrollment.course_id == course_id), [Enrollment.id], page)
+
+def remove_enrollment(db: Session, user_id: int, course_id: int, reason: str = "deregistered"):
+    """Delete one student's enrollment, handing the seat to the waitlist; returns False when there was none.
+
+    `reason` goes into the enrollment.deleted event ("deregistered" or "removed_by_admin").
+    """
+    enrollment = db.query(Enrollment).filter(
+        Enrollment.user_id == user_id,
+        Enrollment.course_id == course_id
+    ).first()
+    if not enrollment:
+        return False
+
+    db.delete(enrollment)
+    release_seats(db, course_id)
+    record_events(db, "enrollment.deleted", [
+        {"enrollment_id": enrollment.id, "user_id": user_id, "course_id": course_id, "reason": reason},
+    ])
+    record_changes(db, "delete", [{"enrollment_id": enrollment.id, "user_id": user_id, "course_id": course_id}])
+    promote_waitlisted(db, course_id, 1)
     db.commit()
-    db.refresh(new_enrollment)
-    return new_enrollment
+    return True
+
+def bulk_remove_enrollments(db: Session, course_id: int, user_ids: list[int]):
+    """Remove many students from a course with one DELETE ... RETURNING per chunk.
+
+    The freed seats go to the head of the waitlist in the same transaction.
+    Returns (removed_user_ids, not_found_user_ids) in request order.
+    """
+    requested = list(dict.fromkeys(user_ids))
+    removed = {}
+    for start in range(0, len(requested), BULK_CHUNK_SIZE):
+        chunk = requested[start:start + BULK_CHUNK_SIZE]
+        removed.update(db.execute(
+            delete(Enrollment)
+            .where(Enrollment.course_id == course_id, Enrollment.user_id.in_(chunk))
+            .returning(Enrollment.user_id, Enrollment.id)
+            .execution_options(synchronize_session=False)
+        ).all())
+
+    if removed:
+        release_seats(db, course_id, len(removed))
+        record_events(db, "enrollment.deleted", [
+            {"enrollment_id": enrollment_id, "user_id": user_id, "course_id": course_id, "reason": "removed_by_admin"}
+            for user_id, enrollment_id in removed.items()
+        ])
+        record_changes(db, "delete", [
+            {"enrollment_id": enrollment_id, "user_id": user_id, "course_id": course_id}
+            for user_id, enrollment_id in removed.items()
+        ])
+        promote_waitlisted(db, course_id, len(removed))
+        db.commit()
+    return (
+        [user_id for user_id in requested if user_id in removed],
+        [user_id for user_id in requested if user_id not in removed],
+    )
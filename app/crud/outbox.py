@@ -0,0 +1,13 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.outbox import OUTBOX_SINK
+from app.models.outbox import OutboxEvent
+
+# Only delivery removes events, so without a sink nothing is recorded
+RECORD_EVENTS = bool(OUTBOX_SINK)
+
+
+def record_events(db: Session, event_type: str, payloads: list[dict]):
+    """Queue events in the caller's transaction (one INSERT); they go out only if it commits."""
+    if payloads and RECORD_EVENTS:
+        db.execute(insert(OutboxEvent), [{"event_type": event_type, "payload": payload} for payload in payloads])
@@ -0,0 +1,271 @@
+import logging
+import random
+
+from sqlalchemy import select, update, delete, func, case
+from sqlalchemy.orm import Session
+
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.seat_counter import CourseSeatCounter
+
+MAX_COUNTER_SHARDS = 64
+
+
+def _rotation(shards: int):
+    """All shard numbers, starting from a random one so callers spread their row locks."""
+    start = random.randrange(shards)
+    return [(start + i) % shards for i in range(shards)]
+
+
+def claim_seat(db: Session, course_id: int) -> bool:
+    """Take one seat in an active course, or return False if none is left.
+
+    The conditional UPDATE takes the counter row's lock and re-checks capacity
+    under it, so concurrent claims cannot overbook. The caller owns the
+    transaction: rolling it back gives the seat back.
+    """
+    claimed = db.execute(
+        update(Course)
+        .where(
+            Course.id == course_id,
+            Course.is_active == True,
+            Course.counter_shards == 1,
+            Course.enrolled_count < Course.capacity,
+        )
+        .values(enrolled_count=Course.enrolled_count + 1)
+        .returning(Course.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if claimed:
+        return True
+
+    shards = db.execute(
+        select(Course.counter_shards).where(Course.id == course_id, Course.is_active == True)
+    ).scalar()
+    if not shards or shards == 1:
+        return False
+
+    for shard in _rotation(shards):
+        claimed = db.execute(
+            update(CourseSeatCounter)
+            .where(
+                CourseSeatCounter.course_id == course_id,
+                CourseSeatCounter.shard == shard,
+                CourseSeatCounter.enrolled_count < CourseSeatCounter.capacity,
+            )
+            .values(enrolled_count=CourseSeatCounter.enrolled_count + 1)
+            .returning(CourseSeatCounter.shard)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if claimed:
+            return True
+    return False
+
+
+def claim_seats(db: Session, course_id: int, wanted: int) -> int | None:
+    """Claim up to `wanted` seats in one go and return how many were granted.
+
+    Returns None if the course is missing or inactive. The counter rows are locked with a no-op UPDATE ... RETURNING, which both
+    reads the current counts and holds the lock (row lock on Postgres, the
+    write lock on SQLite) until the caller's transaction ends.
+    """
+    course = db.execute(
+        update(Course)
+        .where(Course.id == course_id, Course.is_active == True)
+        .values(enrolled_count=Course.enrolled_count)
+        .returning(Course.capacity, Course.enrolled_count, Course.counter_shards)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if course is None:
+        return None
+    if wanted <= 0:
+        return 0
+
+    if course.counter_shards == 1:
+        granted = max(0, min(wanted, course.capacity - course.enrolled_count))
+        if granted:
+            db.execute(
+                update(Course)
+                .where(Course.id == course_id)
+                .values(enrolled_count=Course.enrolled_count + granted)
+                .execution_options(synchronize_session=False)
+            )
+        return granted
+
+    shards = db.execute(
+        update(CourseSeatCounter)
+        .where(CourseSeatCounter.course_id == course_id)
+        .values(enrolled_count=CourseSeatCounter.enrolled_count)
+        .returning(CourseSeatCounter.shard, CourseSeatCounter.capacity, CourseSeatCounter.enrolled_count)
+        .execution_options(synchronize_session=False)
+    ).all()
+    granted = 0
+    for shard, shard_capacity, shard_count in shards:
+        take = max(0, min(wanted - granted, shard_capacity - shard_count))
+        if take:
+            db.execute(
+                update(CourseSeatCounter)
+                .where(CourseSeatCounter.course_id == course_id, CourseSeatCounter.shard == shard)
+                .values(enrolled_count=CourseSeatCounter.enrolled_count + take)
+                .execution_options(synchronize_session=False)
+            )
+            granted += take
+    return granted
+
+
+def release_seats(db: Session, course_id: int, count: int = 1):
+    """Give back `count` seats after enrollments were deleted (caller commits)."""
+    release_seats_many(db, {course_id: count})
+
+
+def release_seats_many(db: Session, per_course: dict[int, int]):
+    """Give back seats across many courses with one UPDATE for all unsharded counters."""
+    per_course = {course_id: count for course_id, count in per_course.items() if count > 0}
+    if not per_course:
+        return
+
+    released = db.execute(
+        update(Course)
+        .where(Course.id.in_(per_course), Course.counter_shards == 1)
+        .values(enrolled_count=Course.enrolled_count - case(per_course, value=Course.id))
+        .returning(Course.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    for course_id in per_course.keys() - set(released):
+        _release_shard_seats(db, course_id, per_course[course_id])
+
+
+def _release_shard_seats(db: Session, course_id: int, count: int):
+    remaining = count
+    shard_counts = db.execute(
+        select(CourseSeatCounter.shard, CourseSeatCounter.enrolled_count)
+        .where(CourseSeatCounter.course_id == course_id, CourseSeatCounter.enrolled_count > 0)
+    ).all()
+    random.shuffle(shard_counts)
+    for shard, shard_count in shard_counts:
+        take = min(remaining, shard_count)
+        remaining -= db.execute(
+            update(CourseSeatCounter)
+            .where(
+                CourseSeatCounter.course_id == course_id,
+                CourseSeatCounter.shard == shard,
+                CourseSeatCounter.enrolled_count >= take,
+            )
+            .values(enrolled_count=CourseSeatCounter.enrolled_count - take)
+            .execution_options(synchronize_session=False)
+        ).rowcount * take
+        if remaining <= 0:
+            return
+
+    if remaining > 0:
+        # Lost a race with another release; reconciliation repairs the drift.
+        logging.warning("Could not release %s seat(s) for course %s", remaining, course_id)
+
+
+def seats_taken(db: Session, course: Course) -> int:
+    """Exact enrolled count, summing the shards for sharded courses."""
+    if course.counter_shards == 1:
+        return course.enrolled_count
+    return db.execute(
+        select(func.coalesce(func.sum(CourseSeatCounter.enrolled_count), 0))
+        .where(CourseSeatCounter.course_id == course.id)
+    ).scalar()
+
+
+def layout_shards(db: Session, course: Course, shards: int, total: int | None = None):
+    """(Re)distribute a course's seats and enrolled total over `shards` counter rows.
+
+    Called when sharding is switched on/off, when capacity changes on a
+    sharded course and by reconciliation. Runs in the caller's transaction.
+    """
+    if not 1 <= shards <= MAX_COUNTER_SHARDS:
+        raise ValueError(f"counter_shards must be between 1 and {MAX_COUNTER_SHARDS}")
+
+    # Lock the course row with a no-op UPDATE ... RETURNING (as claim_seats
+    # does) and take the count from it, not from the possibly stale ORM
+    # object: claim_seat's increment then waits for this transaction instead
+    # of being overwritten by the total written back below.
+    live = db.execute(
+        update(Course)
+        .where(Course.id == course.id)
+        .values(enrolled_count=Course.enrolled_count)
+        .returning(Course.enrolled_count, Course.counter_shards)
+        .execution_options(synchronize_session=False)
+    ).one()
+    existing = db.execute(
+        select(CourseSeatCounter)
+        .where(CourseSeatCounter.course_id == course.id)
+        .order_by(CourseSeatCounter.shard)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalars().all()
+    if total is None:
+        total = sum(c.enrolled_count for c in existing) if live.counter_shards > 1 else live.enrolled_count
+
+    course.enrolled_count = total
+    course.counter_shards = shards
+    if shards == 1:
+        db.execute(delete(CourseSeatCounter).where(CourseSeatCounter.course_id == course.id))
+        return
+
+    # floor/ceil split of both totals keeps every shard's count within its quota
+    layout = [
+        (total // shards + (i < total % shards), course.capacity // shards + (i < course.capacity % shards))
+        for i in range(shards)
+    ]
+    if len(existing) == shards:
+        for counter, (shard_count, shard_capacity) in zip(existing, layout):
+            counter.enrolled_count = shard_count
+            counter.capacity = shard_capacity
+        return
+
+    db.execute(delete(CourseSeatCounter).where(CourseSeatCounter.course_id == course.id))
+    db.add_all(
+        CourseSeatCounter(course_id=course.id, shard=i, enrolled_count=shard_count, capacity=shard_capacity)
+        for i, (shard_count, shard_capacity) in enumerate(layout)
+    )
+
+
+def reconcile_seat_counters(db: Session) -> int:
+    """Repair counter drift against the enrollments table; returns the number of courses fixed.
+
+    Sharded courses are done one at a time, each in its own transaction:
+    the course and its counter rows are locked before the enrollments are
+    counted, so claims in flight finish first and later ones wait.
+    """
+    actual = (
+        select(func.count(Enrollment.id))
+        .where(Enrollment.course_id == Course.id)
+        .correlate(Course)
+        .scalar_subquery()
+    )
+    fixed = db.execute(
+        update(Course)
+        .where(Course.counter_shards == 1, Course.enrolled_count != actual)
+        .values(enrolled_count=actual)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+
+    sharded = db.execute(select(Course.id).where(Course.counter_shards > 1)).scalars().all()
+    for course_id in sharded:
+        course = db.execute(
+            select(Course).where(Course.id == course_id).with_for_update().execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        if course is None or course.counter_shards == 1:
+            db.commit()
+            continue
+        counted = db.execute(
+            update(CourseSeatCounter)
+            .where(CourseSeatCounter.course_id == course_id)
+            .values(enrolled_count=CourseSeatCounter.enrolled_count)
+            .returning(CourseSeatCounter.enrolled_count)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        enrolled = db.execute(select(func.count(Enrollment.id)).where(Enrollment.course_id == course_id)).scalar()
+        if sum(counted) != enrolled or course.enrolled_count != enrolled:
+            fixed += 1
+        layout_shards(db, course, course.counter_shards, total=enrolled)
+        db.commit()
+    return fixed
@@ -0,0 +1,91 @@
+from collections import Counter
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+from app.core.pagination import PageParams, paginate
+from app.core.revocation import revocations
+from app.crud.change_feed import record_changes
+from app.crud.outbox import record_events
+from app.crud.seats import release_seats_many
+from app.crud.waitlist import promote_waitlisted
+from app.models.user import User
+from app.models.enrollment import Enrollment
+from app.models.waitlist import WaitlistEntry
+from app.models.auth_revocation import AuthRevocation
+
+
+def get_user_by_email(db: Session, email: str):
+    # Case-insensitive, served by ix_users_email_lower
+    return db.query(User).filter(func.lower(User.email) == func.lower(email)).first()
+
+def get_user(db: Session, user_id: int):
+    return db.query(User).filter(User.id == user_id).first()
+
+def get_users(db: Session, page: PageParams):
+    return paginate(db.query(User), [User.id], page)
+
+def create_user(db: Session, name: str, email: str, hashed_password: str, role: str):
+    new_user = User(
+        name=name,
+        email=email,
+        hashed_password=hashed_password,
+        role=role,
+        is_active=True
+    )
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+def update_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+    return user
+
+def _revoke_tokens(db: Session, user: User) -> int:
+    """Bump the user's auth epoch so every token issued so far stops working (caller commits)."""
+    user.auth_epoch = (user.auth_epoch or 0) + 1
+    db.add(AuthRevocation(user_id=user.id, epoch=user.auth_epoch))
+    return user.auth_epoch
+
+def activate_user(db: Session, user: User):
+    epoch = _revoke_tokens(db, user)
+    user.is_active = True
+    db.commit()
+    revocations.record(user.id, epoch)
+    return user
+
+def deactivate_user(db: Session, user: User):
+    epoch = _revoke_tokens(db, user)
+    user.is_active = False
+    db.commit()
+    revocations.record(user.id, epoch)
+    return user
+
+def delete_user(db: Session, user: User):
+    user_id = user.id
+    epoch = _revoke_tokens(db, user)
+
+    # Delete enrollments first, give their seats back in one UPDATE and let
+    # each course's waitlist take them
+    db.execute(delete(WaitlistEntry).where(WaitlistEntry.user_id == user.id))
+    dropped = db.execute(
+        delete(Enrollment)
+        .where(Enrollment.user_id == user.id)
+        .returning(Enrollment.id, Enrollment.course_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    freed = Counter(row.course_id for row in dropped)
+    release_seats_many(db, freed)
+    record_events(db, "enrollment.deleted", [
+        {"enrollment_id": row.id, "user_id": user_id, "course_id": row.course_id, "reason": "user_deleted"} for row in dropped
+    ])
+    record_changes(db, "delete", [
+        {"enrollment_id": row.id, "user_id": user_id, "course_id": row.course_id} for row in dropped
+    ])
+    record_events(db, "user.deleted", [{"user_id": user_id}])
+    for course_id in sorted(freed):
+        promote_waitlisted(db, course_id, freed[course_id])
+
+    db.delete(user)
+    db.commit()
+    revocations.record(user_id, epoch)
@@ -0,0 +1,109 @@
+from sqlalchemy import delete, select, func
+from sqlalchemy.orm import Session
+from app.core.database import insert_for
+from app.crud.change_feed import record_changes
+from app.crud.outbox import record_events
+from app.crud.seats import claim_seats, release_seats
+from app.models.enrollment import Enrollment
+from app.models.waitlist import WaitlistEntry
+
+
+def queue_student(db: Session, user_id: int, course_id: int) -> bool:
+    """Append a student to a course's waitlist (caller commits); False if already queued."""
+    row = db.execute(
+        insert_for(db)(WaitlistEntry)
+        .values(user_id=user_id, course_id=course_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+        .returning(WaitlistEntry.id)
+    ).first()
+    return row is not None
+
+
+def leave_waitlist(db: Session, user_id: int, course_id: int) -> bool:
+    """Take a student off a course's waitlist; returns False when they were not on it."""
+    left = db.execute(
+        delete(WaitlistEntry)
+        .where(WaitlistEntry.user_id == user_id, WaitlistEntry.course_id == course_id)
+        .returning(WaitlistEntry.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if left is None:
+        return False
+    db.commit()
+    return True
+
+
+def waitlist_position(db: Session, user_id: int, course_id: int) -> int | None:
+    """1-based place in the queue, or None when the student is not waitlisted.
+
+    Counts the entries at or ahead of the student's own through
+    ix_waitlist_entries_course_id_id: one statement, but it visits every
+    index entry ahead of the student, so the cost grows with the position
+    (benchmarks/waitlist.py times it at the head, middle and tail of a
+    10,000-deep queue). A stored rank would make it O(1) but need
+    renumbering on every leave and promotion.
+    """
+    own_id = (
+        select(WaitlistEntry.id)
+        .where(WaitlistEntry.user_id == user_id, WaitlistEntry.course_id == course_id)
+        .scalar_subquery()
+    )
+    position = db.execute(
+        select(func.count()).select_from(WaitlistEntry)
+        .where(WaitlistEntry.course_id == course_id, WaitlistEntry.id <= own_id)
+    ).scalar()
+    return position or None
+
+
+def promote_waitlisted(db: Session, course_id: int, seats: int) -> list[int]:
+    """Move up to `seats` students from the head of the waitlist into the course (caller commits).
+
+    Called by whatever just freed the seats, in its transaction and after
+    it has updated the seat counter, so the counter lock is already held: a
+    freed seat is never visible to a racing enrollment before the queue gets
+    it, and join_waitlist (which takes the same lock before queueing) cannot
+    slip an entry past the check. Only the head entries are read, through
+    ix_waitlist_entries_course_id_id, so the cost does not depend on the
+    queue's length; with nobody waiting it is one indexed SELECT. Returns
+    the promoted user ids.
+    """
+    promoted = []
+    while seats > 0:
+        heads = db.execute(
+            select(WaitlistEntry.id, WaitlistEntry.user_id)
+            .where(WaitlistEntry.course_id == course_id)
+            .order_by(WaitlistEntry.id)
+            .limit(seats)
+            .with_for_update()
+        ).all()
+        if not heads:
+            break
+        granted = claim_seats(db, course_id, len(heads))
+        if not granted:
+            break
+        heads = heads[:granted]
+
+        db.execute(
+            delete(WaitlistEntry)
+            .where(WaitlistEntry.id.in_([entry.id for entry in heads]))
+            .execution_options(synchronize_session=False)
+        )
+        rows = db.execute(
+            insert_for(db)(Enrollment)
+            .values([{"user_id": entry.user_id, "course_id": course_id} for entry in heads])
+            .on_conflict_do_nothing(index_elements=["user_id", "course_id"])
+            .returning(Enrollment.id, Enrollment.user_id, Enrollment.created_at)
+        ).all()
+        inserted = {row.user_id for row in rows}
+        # Students who enrolled directly in the meantime just leave the queue;
+        # their seats go back and the next pass offers them further down
+        release_seats(db, course_id, granted - len(inserted))
+        record_events(db, "enrollment.created", [
+            {"enrollment_id": row.id, "user_id": row.user_id, "course_id": course_id, "source": "waitlist"} for row in rows
+        ])
+        record_changes(db, "insert", [
+            {"enrollment_id": row.id, "user_id": row.user_id, "course_id": course_id, "enrolled_at": row.created_at} for row in rows
+        ])
+        promoted.extend(entry.user_id for entry in heads if entry.user_id in inserted)
+        seats -= len(inserted)
+    return promoted
@@ -1,53 +1,101 @@
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+import functools
+import inspect
+import math
 
-from app.core.database import SessionLocal
-from app.models.user import User
-from app.core.security import SECRET_KEY, ALGORITHM
-import logging
-import sqlalchemy
+from app.core.database import get_async_sessionmaker, get_sessionmaker
+from app.core import ratelimit
+from app.core.replicas import read_replica, replica_set
+from app.core.revocation import revocations
+from app.core.security import TokenUser, decode_access_token
 
 # --- Database dependency ---
+# Sessions connect on their first query, so a request rejected by the token
+# check never touches the pool. Request sessions don't expire objects on
+# commit (as in async mode) so routes can return them after an early release.
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()(expire_on_commit=False)
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+# --- Early session release ---
+# FastAPI runs a dependency's cleanup after the response has been validated
+# and serialized (or, by default, sent). Routes built with ReleaseSessionRoute
+# close the endpoint's sessions as soon as it returns instead, so the
+# connection is back in the pool while Pydantic works. Returned ORM objects
+# keep their loaded attributes but can no longer lazy-load.
+def _close_sessions(values):
+    for value in values:
+        if isinstance(value, Session):
+            value.close()
+
+async def _close_async_sessions(values):
+    for value in values:
+        if isinstance(value, AsyncSession):
+            await value.close()
+        elif isinstance(value, Session):
+            value.close()
+
+def _release_sessions_after(endpoint):
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def release_after(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                await _close_async_sessions(kwargs.values())
+    else:
+        @functools.wraps(endpoint)
+        def release_after(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _close_sessions(kwargs.values())
+    return release_after
+
+class ReleaseSessionRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _release_sessions_after(endpoint), **kwargs)
+
 # --- OAuth2 token URL ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-# --- Get current user dependency ---
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+def _token_user(token: str, refresh: bool = True) -> TokenUser:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        user = decode_access_token(token)
     except JWTError:
-        raise credentials_exception
-
-    try:
-        user = db.query(User).filter(User.email == email).first()
-    except (sqlalchemy.exc.ProgrammingError, sqlalchemy.exc.OperationalError):
-        logging.exception("Database error in get_current_user")
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                            detail="Database error. Ensure migrations have been applied.")
-
-    if user is None or not user.is_active:
-        raise credentials_exception
+        raise _credentials_exception()
+    # Deactivated and deleted users have had their auth epoch bumped
+    if revocations.is_revoked(user.id, user.epoch, refresh=refresh):
+        raise _credentials_exception()
     return user
 
-def get_current_admin(current_user: User = Depends(get_current_user)):
+# --- Get current user dependency ---
+# Authenticates from the token alone (id, role, auth epoch); endpoints that
+# need the full users row load it themselves.
+def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenUser:
+    return _token_user(token)
+
+def get_current_admin(current_user: TokenUser = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -55,4 +103,60 @@ def get_current_admin(current_user: User = Depends(get_current_user)):
         )
     return current_user
 
+# --- Async variants (DB_MODE=async) ---
+async def get_current_user_async(token: str = Depends(oauth2_scheme)) -> TokenUser:
+    if revocations.refresh_due():
+        # The refresh reads the log through the sync engine; keep it off the event loop
+        await run_in_threadpool(revocations.maybe_refresh)
+    return _token_user(token, refresh=False)
+
+async def get_current_admin_async(current_user: TokenUser = Depends(get_current_user_async)):
+    return get_current_admin(current_user)
+
+# --- Read-only routes ---
+# A replica session when DATABASE_REPLICA_URLS is set, a healthy replica is
+# available and the user has not just written; otherwise the primary.
+def get_read_db(request: Request, current_user: TokenUser = Depends(get_current_user)):
+    replica_set.maybe_check()
+    replica = read_replica(request, current_user.id)
+    db = (replica.sessionmaker if replica else get_sessionmaker())(expire_on_commit=False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request, current_user: TokenUser = Depends(get_current_user_async)):
+    if replica_set.check_due():
+        # The health check uses the replicas' sync engines; keep it off the event loop
+        await run_in_threadpool(replica_set.maybe_check)
+    replica = read_replica(request, current_user.id)
+    maker = replica.async_sessionmaker() if replica else get_async_sessionmaker()
+    async with maker() as db:
+        yield db
+
+# --- Login throttling ---
+# Shares the parsed form with the login endpoint (FastAPI caches it per request).
+# async so it runs inline: a hit is a few microseconds, less than a threadpool hop.
+async def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    limiter = ratelimit.get_login_limiter()
+    client_ip = ratelimit.client_address(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+        ratelimit.LOGIN_TRUSTED_PROXY_HOPS,
+    )
+    for key, spec in (
+        (f"ip:{client_ip}", ratelimit.LOGIN_RATE_LIMIT_IP),
+        (f"email:{form_data.username.lower()}", ratelimit.LOGIN_RATE_LIMIT_EMAIL),
+    ):
+        capacity, per_second = ratelimit.parse_limit(spec)
+        if capacity <= 0:
+            continue
+        wait = limiter.hit(key, capacity, per_second)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, please retry later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
 # I will come bac here later
@@ -0,0 +1,31 @@
+"""Compact the enrollment change log behind GET /enrollment/changes.
+
+Drops the insert of every enrollment that has since been deleted, then
+tombstones older than CHANGE_LOG_TOMBSTONE_RETENTION_DAYS (default 7).
+Feed readers that fall further behind than that get 410 and resync from
+the start. Run it periodically (cron / Render cron job):
+
+    python -m app.jobs.compact_changes
+"""
+import logging
+from datetime import timedelta
+from os import getenv
+
+from app.core.database import get_sessionmaker
+from app.crud.change_feed import compact_change_log
+
+CHANGE_LOG_TOMBSTONE_RETENTION_DAYS = float(getenv("CHANGE_LOG_TOMBSTONE_RETENTION_DAYS", "7"))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    db = get_sessionmaker()()
+    try:
+        superseded, expired = compact_change_log(db, timedelta(days=CHANGE_LOG_TOMBSTONE_RETENTION_DAYS))
+        logging.info("Change log compaction done: %s superseded insert(s), %s expired tombstone(s) removed", superseded, expired)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Deliver outbox events to OUTBOX_SINK from a dedicated process.
+
+For deployments that set OUTBOX_IN_PROCESS=false, so API workers only write
+events. Safe to run alongside in-process dispatchers or more copies of
+itself: claims are leased, and on Postgres taken with SKIP LOCKED.
+
+    python -m app.jobs.dispatch_outbox          # run until interrupted
+    python -m app.jobs.dispatch_outbox --once   # deliver what is due and exit
+"""
+import argparse
+import logging
+
+from app.core.outbox import OUTBOX_SINK, dispatcher_from_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="drain the due events and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    dispatcher = dispatcher_from_env()
+    if dispatcher is None:
+        parser.error("OUTBOX_SINK is not set")
+
+    if args.once:
+        claimed = dispatcher.drain()
+        dispatcher.stop()
+        logging.info("Outbox drained: %s claimed, %s delivered, %s rescheduled", claimed, dispatcher.delivered, dispatcher.failed)
+        return
+
+    logging.info("Dispatching outbox events to %s", OUTBOX_SINK)
+    try:
+        dispatcher.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dispatcher.stop()
+
+
+if __name__ == "__main__":
+    main()
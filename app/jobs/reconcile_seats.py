@@ -0,0 +1,25 @@
+"""Repair drift between the seat counters and the enrollments table.
+
+Also folds sharded counters back into Course.enrolled_count. Run it
+periodically (cron / Render cron job):
+
+    python -m app.jobs.reconcile_seats
+"""
+import logging
+
+from app.core.database import get_sessionmaker
+from app.crud.seats import reconcile_seat_counters
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    db = get_sessionmaker()()
+    try:
+        fixed = reconcile_seat_counters(db)
+        logging.info("Seat counter reconciliation done: %s course(s) repaired", fixed)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
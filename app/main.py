@@ -1,48 +1,90 @@
 from fastapi import FastAPI
 from dotenv import load_dotenv
-from app.api import enrollment, users, courses, auth, admin
 import os
 import logging
 
-# Alembic imports for programmatic migrations
-from alembic.config import Config
-from alembic import command
-
-# Load environment variables from .env file
+# Load environment variables from .env file (settings below read them at import)
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
+from app.core.database import DB_MODE, get_engine
+from app.core.pagination import InvalidCursorError, invalid_cursor_handler
+from app.core.hashing import PasswordHasherBusyError, hasher_busy_handler, password_hasher
+from app.core.metrics import METRICS_ENABLED, MetricsMiddleware, metrics_endpoint
+from app.core.pooling import POOL_SETTINGS, check_connectivity
 
-app = FastAPI(title="Course Enrollment Platform", version="1.0.0")
+logging.basicConfig(level=logging.INFO)
 
 
 def run_alembic_migrations():
-    """Run Alembic migrations programmatically using alembic.ini at repo root."""
+    """Upgrade to the latest Alembic revision (alembic.ini at repo root), if not there already."""
+    from app.core.migrations import migration_engine, upgrade_to_head
+
+    # A misconfiguration stops startup rather than risking concurrent migrations
+    engine = migration_engine(get_engine())
     try:
-        cfg = Config("alembic.ini")
-        command.upgrade(cfg, "head")
-        logging.info("Alembic migrations applied successfully.")
+        if upgrade_to_head(engine):
+            logging.info("Alembic migrations applied successfully.")
+        else:
+            logging.info("Database schema is up to date.")
     except Exception:
         logging.exception("Failed to run alembic migrations")
+    finally:
+        if engine is not get_engine():
+            engine.dispose()
 
 
-@app.on_event("startup")
 def on_startup():
     # Optionally auto-run migrations in deployed environments when enabled
     auto = os.getenv("AUTO_MIGRATE", "false").lower()
     if auto in ("1", "true", "yes"):
         logging.info("AUTO_MIGRATE enabled — running alembic migrations on startup")
         run_alembic_migrations()
+    # Fail the deploy now rather than on the first request
+    check_connectivity(get_engine())
+    logging.info("Database pool profile: %s", POOL_SETTINGS.profile)
 
 
-# Include routers with /api/v1 structure
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(courses.router)
-app.include_router(enrollment.router)
-app.include_router(admin.router)
-
-
-@app.get("/")
 def read_root():
     return {"message": "Hello, Course Enrollment API is running!"}
+
+
+def create_app(db_mode: str = DB_MODE) -> FastAPI:
+    """Build the API; db_mode "async" mounts the async routers from app.api.aio."""
+    if db_mode == "async":
+        from app.api.aio import enrollment, users, courses, auth
+    elif db_mode == "sync":
+        from app.api import enrollment, users, courses, auth
+    else:
+        raise ValueError(f"Unknown DB_MODE '{db_mode}' (expected 'sync' or 'async')")
+    from app.api import admin
+    from app.core.outbox import start_dispatcher, stop_dispatcher
+
+    app = FastAPI(title="Course Enrollment Platform", version="1.0.0")
+    app.add_event_handler("startup", on_startup)
+    app.add_event_handler("startup", start_dispatcher)
+    app.add_event_handler("shutdown", stop_dispatcher)
+    app.add_event_handler("shutdown", password_hasher.shutdown)
+    app.add_exception_handler(InvalidCursorError, invalid_cursor_handler)
+    app.add_exception_handler(PasswordHasherBusyError, hasher_busy_handler)
+
+    # Include routers with /api/v1 structure
+    app.include_router(auth.router)
+    app.include_router(users.router)
+    app.include_router(courses.router)
+    app.include_router(enrollment.router)
+    app.include_router(admin.router)
+
+    app.get("/")(read_root)
+    if METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+        app.get("/metrics", include_in_schema=False)(metrics_endpoint)
+    return app
+
+
+def __getattr__(name):
+    # `uvicorn app.main:app` and `from app.main import app` build the app on
+    # first access; importing this module for create_app() builds nothing.
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
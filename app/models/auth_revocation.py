@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, func
+from app.core.database import Base
+
+class AuthRevocation(Base):
+    """Append-only log of auth epoch bumps.
+
+    Tokens for `user_id` carrying an epoch below `epoch` are revoked. Every
+    process tails this table (app.core.revocation) instead of looking the user
+    up on each request. No foreign key: deleted users keep their entry.
+    """
+    __tablename__ = "auth_revocations"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    epoch = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
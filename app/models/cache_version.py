@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, BigInteger
+from app.core.database import Base
+
+class CacheVersion(Base):
+    """Named version counters for response caches, shared by every worker.
+
+    Writers bump a counter in the same transaction as the change; readers
+    key their cached bodies by it (see app.core.cache).
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
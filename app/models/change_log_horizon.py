@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, BigInteger
+from app.core.database import Base
+
+class ChangeLogHorizon(Base):
+    """How far compaction has removed tombstones from a change log.
+
+    Every tombstone compacted away sat at or below (txid, seq), so a feed
+    cursor below it may have missed a delete and must resync from the start.
+    """
+    __tablename__ = "change_log_horizons"
+
+    name = Column(String, primary_key=True)
+    txid = Column(BigInteger, nullable=False, server_default="0")
+    seq = Column(BigInteger, nullable=False, server_default="0")
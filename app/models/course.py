@@ -1,11 +1,36 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, case, func, select, text
+from sqlalchemy.orm import column_property
 from app.core.database import Base
+from app.models.seat_counter import CourseSeatCounter
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # The catalog only ever lists active courses
+        Index("ix_courses_active", "id", postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     code = Column(String, unique=True, nullable=False, index=True)
     capacity = Column(Integer, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Maintained by app.crud.seats on every enroll/removal. For courses whose
+    # counter is sharded (counter_shards > 1) seats are claimed on
+    # CourseSeatCounter rows and this total is folded in by reconciliation.
+    enrolled_count = Column(Integer, nullable=False, default=0, server_default="0")
+    counter_shards = Column(Integer, nullable=False, default=1, server_default="1")
+    # Live total for reads: the shard rows' sum while sharded, since
+    # enrolled_count only catches up on reconciliation
+    enrolled_total = column_property(
+        case(
+            (counter_shards == 1, enrolled_count),
+            else_=select(func.coalesce(func.sum(CourseSeatCounter.enrolled_count), 0))
+            .where(CourseSeatCounter.course_id == id)
+            .scalar_subquery(),
+        )
+    )
+
+    @property
+    def seats_left(self) -> int:
+        return max(self.capacity - (self.enrolled_total or 0), 0)
@@ -1,16 +1,30 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint, func
+from sqlalchemy.orm import relationship, backref
 from app.core.database import Base
 from app.models.user import User
 from app.models.course import Course
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # Drives ON CONFLICT DO NOTHING in crud.enrollment.enroll_student and
+        # doubles as the user_id index (my-enrollments, user deletion).
+        UniqueConstraint("user_id", "course_id", name="uq_enrollments_user_course"),
+        # Course rosters / course enrollment lists, ordered by enrollment date
+        Index("ix_enrollments_course_id_created_at", "course_id", "created_at"),
+        Index("ix_enrollments_created_at", "created_at", "id"),
+        # Ids are never reused, so (count, max id) versions a user's enrollments
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     course_id = Column(Integer, ForeignKey("courses.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    user = relationship("User", backref="enrollments")
-    course = relationship("Course", backref="enrollments")
+    # Nothing may lazy load across these: queries that need the other side
+    # join it explicitly (joinedload/contains_eager or plain column selects).
+    # passive_deletes keeps db.delete(user/course) from loading the collection;
+    # crud deletes the enrollment rows itself first.
+    user = relationship("User", lazy="raise", backref=backref("enrollments", lazy="raise", passive_deletes=True))
+    course = relationship("Course", lazy="raise", backref=backref("enrollments", lazy="raise", passive_deletes=True))
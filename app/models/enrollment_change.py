@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index, func
+from app.core.database import Base
+
+class EnrollmentChange(Base):
+    """Append-only change log of the enrollments table, read by the change feed.
+
+    One "insert" row per enrollment created and one "delete" row (a
+    tombstone) per enrollment removed, written in the same transaction.
+    Readers page through it in (txid, seq) order: seq is a plain sequence,
+    and txid is the writing transaction's id on Postgres (0 elsewhere), so a
+    reader can hold back every row of a transaction still in flight rather
+    than skip past a low seq that commits late (app.crud.change_feed).
+    Compaction drops inserts once their enrollment is deleted and tombstones
+    after a retention period, so the log stays about the size of the
+    enrollments table plus recent churn. No foreign keys: tombstones outlive
+    their enrollment, user and course.
+    """
+    __tablename__ = "enrollment_changes"
+    __table_args__ = (
+        Index("ix_enrollment_changes_txid_seq", "txid", "seq"),
+        Index("ix_enrollment_changes_enrollment_id", "enrollment_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    # INTEGER PRIMARY KEY on SQLite, so it autoincrements there too
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    txid = Column(BigInteger, nullable=False, server_default="0")
+    op = Column(String, nullable=False)
+    enrollment_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    course_id = Column(Integer, nullable=False)
+    # The enrollment's own created_at; null on tombstones
+    enrolled_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
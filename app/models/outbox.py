@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, func
+from app.core.database import Base
+
+class OutboxEvent(Base):
+    """A domain event waiting to be delivered downstream (transactional outbox).
+
+    Written in the same transaction as the change it describes, so an event
+    exists exactly when its change committed. app.core.outbox claims due
+    rows (available_at <= now) in batches, delivers them and deletes them;
+    a failed delivery pushes available_at out by an exponential backoff.
+    No foreign keys: events outlive the rows they describe.
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_available_at_id", "available_at", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    attempts = Column(Integer, server_default="0", nullable=False)
+    last_error = Column(String, nullable=True)
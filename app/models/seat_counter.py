@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.core.database import Base
+
+class CourseSeatCounter(Base):
+    """One slice of a hot course's seat counter.
+
+    Each shard owns `capacity` seats out of the course's total, so enrollments
+    lock a random shard row instead of all queueing on the course row.
+    """
+    __tablename__ = "course_seat_counters"
+
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    capacity = Column(Integer, nullable=False)
+    enrolled_count = Column(Integer, nullable=False, default=0, server_default="0")
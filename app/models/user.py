@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index, func
 from app.core.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    # Never hand a deleted user's id (and its revoked auth epoch) to a new account
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -10,3 +12,8 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     role = Column(String, nullable=False)  # 'student' or 'admin'
     is_active = Column(Boolean, default=True)
+    # Carried in access tokens; bumping it revokes every token issued before
+    auth_epoch = Column(Integer, nullable=False, default=0, server_default="0")
+
+# Case-insensitive lookups in login / get_current_user
+Index("ix_users_email_lower", func.lower(User.email))
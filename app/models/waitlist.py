@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint, func
+from app.core.database import Base
+
+class WaitlistEntry(Base):
+    """A student queued for a full course.
+
+    Ids are never reused, so they order the queue: the head of a course's
+    waitlist is its lowest id, found (and promoted) through
+    ix_waitlist_entries_course_id_id without a sort or scan. Promotion
+    deletes the entry and inserts the enrollment in the transaction that
+    freed the seat (app.crud.waitlist).
+    """
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "course_id", name="uq_waitlist_entries_user_course"),
+        Index("ix_waitlist_entries_course_id_id", "course_id", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
+from datetime import datetime
+from pydantic import AliasChoices, BaseModel, Field
 from pydantic import ConfigDict
+from app.schemas.user import UserOut
 
 class CourseBase(BaseModel):
     title: str
@@ -13,8 +15,39 @@ class CourseUpdate(BaseModel):
     title: str | None = None
     capacity: int | None = Field(default=None, gt=0)
     is_active: bool | None = None
+    # Split the seat counter over N rows for very hot courses (1 = unsharded)
+    counter_shards: int | None = Field(default=None, ge=1, le=64)
 
 class CourseOut(CourseBase):
     id: int
     is_active: bool
+    # Course.enrolled_total when read from the ORM (sharded courses included)
+    enrolled_count: int = Field(validation_alias=AliasChoices("enrolled_total", "enrolled_count"))
+    seats_left: int
     model_config = ConfigDict(from_attributes=True)
+
+
+class RosterStudentOut(UserOut):
+    enrolled_at: datetime
+
+
+class CourseWithStudentsOut(BaseModel):
+    id: int
+    title: str
+    code: str
+    capacity: int
+    is_active: bool
+    students: list[RosterStudentOut]
+    next_cursor: str | None = None
+
+
+class RejectedRow(BaseModel):
+    line: int
+    error: str
+
+class CourseImportResult(BaseModel):
+    inserted: int
+    updated: int
+    rejected: int
+    # Capped at IMPORT_MAX_REJECTS entries; `rejected` is the full count
+    rejected_rows: list[RejectedRow]
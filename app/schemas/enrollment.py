@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
 from datetime import datetime
+from typing import List, Literal
 
 class EnrollmentCreate(BaseModel):
     course_id: int
@@ -11,3 +12,51 @@ class EnrollmentOut(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class BulkDeregisterRequest(BaseModel):
+    user_ids: List[int]
+
+class BulkDeregisterResult(BaseModel):
+    message: str
+    removed_user_ids: List[int]
+    not_found_user_ids: List[int]
+
+class BulkEnrollRequest(BaseModel):
+    user_ids: List[int] = Field(default_factory=list)
+    emails: List[EmailStr] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _not_empty(self):
+        if not self.user_ids and not self.emails:
+            raise ValueError("Provide at least one user id or email")
+        return self
+
+class BulkEnrollOutcome(BaseModel):
+    user_id: int | None = None
+    email: str | None = None
+    status: Literal["enrolled", "duplicate", "not_found", "ineligible", "over_capacity"]
+
+class BulkEnrollResult(BaseModel):
+    message: str
+    enrolled: int
+    results: List[BulkEnrollOutcome]
+
+class WaitlistStatus(BaseModel):
+    course_id: int
+    status: Literal["enrolled", "waitlisted"]
+    position: int | None = None
+    enrollment_id: int | None = None
+
+class EnrollmentChangeOut(BaseModel):
+    seq: int
+    op: Literal["insert", "delete"]
+    enrollment_id: int
+    user_id: int
+    course_id: int
+    enrolled_at: datetime | None = None
+    changed_at: datetime
+
+class ChangeFeedPage(BaseModel):
+    changes: List[EnrollmentChangeOut]
+    next_cursor: str
+    has_more: bool
@@ -0,0 +1,78 @@
+"""Throughput of the sync (threadpool) routers vs the DB_MODE=async routers.
+
+Drives an authenticated `GET /api/v1/course/` from many concurrent clients
+against both app variants in-process (httpx ASGITransport) and prints req/s
+and latency percentiles. Point DATABASE_URL at Postgres for meaningful
+numbers; SQLite works for a smoke run.
+
+At 200+ clients the sync path typically exhausts the threadpool while every
+worker thread waits on the 15-connection QueuePool; those requests fail with
+a pool TimeoutError after 30s and are reported under `errors`.
+
+    python -m benchmarks.async_vs_sync --clients 200 --requests 4000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+from app.main import create_app
+
+
+async def _token(client: httpx.AsyncClient) -> str:
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    await client.post("/api/v1/auth/signup", json={"name": "Bench", "email": email, "password": "pass123", "role": "student"})
+    resp = await client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return resp.json()["access_token"]
+
+
+async def run(db_mode: str, clients: int, total_requests: int, path: str):
+    app = create_app(db_mode)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {"Authorization": f"Bearer {await _token(client)}"}
+        latencies = []
+        errors = 0
+        remaining = total_requests
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(path, headers=headers)
+                    ok = resp.status_code == 200
+                except Exception:
+                    # e.g. QueuePool TimeoutError once the threadpool starves the pool
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{db_mode:>5}: {len(latencies) / elapsed:8.1f} req/s  "
+          f"p50={p(0.50):.1f}ms p99={p(0.99):.1f}ms mean={statistics.mean(latencies) * 1000:.1f}ms "
+          f"errors={errors} ({clients} clients, {len(latencies)} requests)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--path", default="/api/v1/course/")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    args = parser.parse_args()
+    for db_mode in args.modes:
+        asyncio.run(run(db_mode, args.clients, args.requests, args.path))
+
+
+if __name__ == "__main__":
+    main()
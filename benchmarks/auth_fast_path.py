@@ -0,0 +1,76 @@
+"""Requests/sec for an authenticated GET with token-only auth vs a users lookup per request.
+
+`before` overrides get_current_user with the previous behaviour (decode the
+JWT, then SELECT the user by email on every request); `after` is the current
+dependency (LRU-cached signature check plus the in-process revocation list).
+Both run against the same in-process app through httpx ASGITransport.
+
+    python -m benchmarks.auth_fast_path --clients 50 --requests 5000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, HTTPException
+from jose import jwt
+
+from app.core.security import ALGORITHM, SECRET_KEY
+from app.crud.user import get_user_by_email
+from app.deps import get_current_user, get_db, oauth2_scheme
+from app.main import create_app
+
+
+def _lookup_per_request(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+    email = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["sub"]
+    user = get_user_by_email(db, email)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401)
+    return user
+
+
+async def run(label: str, clients: int, total_requests: int, path: str):
+    app = create_app("sync")
+    if label == "before":
+        app.dependency_overrides[get_current_user] = _lookup_per_request
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+        await client.post("/api/v1/auth/signup", json={"name": "Bench", "email": email, "password": "pass123", "role": "admin"})
+        token = (await client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        latencies = []
+        remaining = total_requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                resp = await client.get(path, headers=headers)
+                assert resp.status_code == 200, resp.text
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{label:>6}: {len(latencies) / elapsed:8.1f} req/s  p50={p(0.50):.1f}ms p99={p(0.99):.1f}ms "
+          f"({clients} clients, {len(latencies)} requests of {path})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--path", default="/api/v1/course/?limit=10")
+    args = parser.parse_args()
+    for label in ("before", "after"):
+        asyncio.run(run(label, args.clients, args.requests, args.path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""EXPLAIN ANALYZE the hot lookups with and without the e8b2f4c6d1a9 indexes.
+
+Seeds a throwaway Postgres database with millions of enrollments using
+generate_series, then times each query plan before and after creating its
+index. Requires DATABASE_URL to point at a scratch Postgres database that has
+been migrated to head.
+
+    python -m benchmarks.index_explain --enrollments 5000000
+"""
+import argparse
+import time
+
+from sqlalchemy import func, select, text
+
+from app.core.database import engine
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+
+INDEXES = {
+    index.name: index
+    for table in (User.__table__, Course.__table__, Enrollment.__table__)
+    for index in table.indexes
+}
+
+
+def seed(conn, enrollments: int):
+    students = max(enrollments // 10, 1)
+    courses = max(enrollments // 500, 1)
+    conn.execute(text(
+        "INSERT INTO users (name, email, hashed_password, role, is_active) "
+        "SELECT 'Seed', 'seed_' || g || '@example.com', 'x', 'student', true FROM generate_series(1, :n) g"
+    ), {"n": students})
+    conn.execute(text(
+        "INSERT INTO courses (title, code, capacity, is_active, enrolled_count, counter_shards) "
+        "SELECT 'Seed', 'SEED_' || g, 100000, g % 4 <> 0, 0, 1 FROM generate_series(1, :n) g"
+    ), {"n": courses})
+    conn.execute(text(
+        "INSERT INTO enrollments (user_id, course_id, created_at) "
+        "SELECT u.id, c.id, now() - g * interval '1 second' "
+        "FROM generate_series(0, :n - 1) g "
+        "JOIN users u ON u.email = 'seed_' || (g % :students + 1) || '@example.com' "
+        "JOIN courses c ON c.code = 'SEED_' || (g / :students % :courses + 1) "
+        "ON CONFLICT DO NOTHING"
+    ), {"n": enrollments, "students": students, "courses": courses})
+    conn.execute(text("ANALYZE"))
+
+
+def explain(conn, stmt):
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}")).scalars().all()
+    return plan[0], next(line for line in reversed(plan) if "Execution Time" in line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--enrollments", type=int, default=2_000_000)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            seed(conn, args.enrollments)
+        print(f"seeded {args.enrollments} enrollments in {time.perf_counter() - start:.1f}s")
+
+    with engine.connect() as conn:
+        course_id = conn.execute(select(Course.id).where(Course.code == "SEED_2")).scalar()
+        user_id = conn.execute(select(User.id).where(User.email == "seed_1@example.com")).scalar()
+        cases = {
+            "ix_enrollments_course_id_created_at": select(Enrollment).where(Enrollment.course_id == course_id).order_by(Enrollment.created_at),
+            "ix_enrollments_created_at": select(Enrollment).order_by(Enrollment.created_at, Enrollment.id).limit(100),
+            "ix_users_email_lower": select(User).where(func.lower(User.email) == "seed_1@example.com"),
+            "ix_courses_active": select(Course).where(Course.is_active == True).order_by(Course.id).limit(100),
+            "uq_enrollments_user_course": select(Enrollment).where(Enrollment.user_id == user_id),
+        }
+        for name, stmt in cases.items():
+            index = INDEXES.get(name)
+            if index is not None:
+                with conn.begin() as tx:
+                    index.drop(conn)
+                    before = explain(conn, stmt)
+                    tx.rollback()
+            else:
+                before = ("(constraint index, always present)", "")
+            with conn.begin():
+                after = explain(conn, stmt)
+            print(f"\n{name}\n  before: {before[0]}  {before[1]}\n  after:  {after[0]}  {after[1]}")
+
+
+if __name__ == "__main__":
+    main()
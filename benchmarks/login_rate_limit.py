@@ -0,0 +1,60 @@
+"""Per-request cost of the shared-memory login limiter.
+
+Each simulated login does what the `limit_login` dependency does: one hit on
+the IP bucket and one on the email bucket. Runs `--procs` processes against
+the same table at once so the cross-process stripe locks are contended, and
+reports the mean and p99 cost per login (target: under 20µs).
+
+    python -m benchmarks.login_rate_limit --procs 4 --logins 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+from multiprocessing import get_context
+
+from app.core.ratelimit import SharedRateLimiter, parse_limit
+
+
+def worker(path: str, logins: int, keys: int, seed: int, results):
+    limiter = SharedRateLimiter(path)
+    ip_limit, email_limit = parse_limit("300/60"), parse_limit("10/60")
+    samples = []
+    for i in range(logins):
+        n = (i * 7919 + seed) % keys
+        start = time.perf_counter_ns()
+        limiter.hit(f"ip:10.0.{n % 256}.{n // 256 % 256}", *ip_limit)
+        limiter.hit(f"email:user{n}@example.com", *email_limit)
+        samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+    results.put((sum(samples) / len(samples), samples[int(len(samples) * 0.99)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--logins", type=int, default=200_000, help="Per process")
+    parser.add_argument("--keys", type=int, default=50_000, help="Distinct emails (and IPs) in rotation")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "limits")
+    SharedRateLimiter(path).close()
+    ctx = get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(path, args.logins, args.keys, seed, results)) for seed in range(args.procs)]
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    stats = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - start
+
+    mean = sum(s[0] for s in stats) / len(stats) / 1000
+    p99 = max(s[1] for s in stats) / 1000
+    print(f"{args.procs} processes x {args.logins} logins: mean {mean:.1f}µs, worst p99 {p99:.1f}µs per login "
+          f"(2 bucket hits), {args.procs * args.logins / elapsed:,.0f} logins/s overall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Cost of leaving request and SQL metrics on.
+
+Measures the two hooks separately, against uninstrumented baselines so the
+numbers are the bookkeeping alone (best of --rounds, interleaved):
+
+  request:   a trivial ASGI app called directly, bare vs wrapped in
+             MetricsMiddleware
+  statement: `SELECT 1` on an in-memory SQLite engine, bare vs instrumented
+             (the call runs inside a request context, so it is charged)
+
+DATABASE_URL only needs to be set because importing the app requires it.
+
+    python -m benchmarks.metrics_overhead --requests 100000 --statements 100000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import MetricsMiddleware, MetricsRegistry, _RequestSQL, _request_sql
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def time_requests(app, n: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/"}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / n
+
+
+def time_statements(engine, n: int) -> float:
+    token = _request_sql.set(_RequestSQL())
+    try:
+        with engine.connect() as conn:
+            stmt = text("SELECT 1")
+            start = time.perf_counter()
+            for _ in range(n):
+                conn.execute(stmt)
+            return (time.perf_counter() - start) / n
+    finally:
+        _request_sql.reset(token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--statements", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    middleware = MetricsMiddleware(bare_app, registry)
+    bare = min(asyncio.run(time_requests(bare_app, args.requests)) for _ in range(args.rounds))
+    wrapped = min(asyncio.run(time_requests(middleware, args.requests)) for _ in range(args.rounds))
+    print(f"request:   bare {bare * 1e6:6.2f}µs, with metrics {wrapped * 1e6:6.2f}µs "
+          f"(+{(wrapped - bare) * 1e6:.2f}µs per request)")
+
+    plain = create_engine("sqlite://")
+    instrumented = create_engine("sqlite://")
+    registry.instrument_engine(instrumented, "bench")
+    bare, wrapped = float("inf"), float("inf")
+    for _ in range(args.rounds):
+        bare = min(bare, time_statements(plain, args.statements))
+        wrapped = min(wrapped, time_statements(instrumented, args.statements))
+    print(f"statement: bare {bare * 1e6:6.2f}µs, with metrics {wrapped * 1e6:6.2f}µs "
+          f"(+{(wrapped - bare) * 1e6:.2f}µs per statement)")
+    registry.render()
+
+
+if __name__ == "__main__":
+    main()
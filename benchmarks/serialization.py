@@ -0,0 +1,79 @@
+"""Per-item cost of the ORM + Pydantic response path vs Core rows + orjson.
+
+Builds a 10k-row response the way each path does it:
+
+  orm:  Query(Enrollment).all() -> validate each instance through
+        EnrollmentOut (from_attributes) -> json.dumps, which is what FastAPI
+        does for a returned list with a response_model
+  fast: select(columns) -> dicts -> orjson (FastJSONResponse.render)
+
+The rows live in a private in-memory SQLite database; DATABASE_URL only
+needs to be set because importing the app requires it.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 20
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.responses import FastJSONResponse
+from app.crud.enrollment import ENROLLMENT_OUT_COLUMNS
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.schemas.enrollment import EnrollmentOut
+
+
+def seed(engine, rows: int):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Course), [{"title": f"C{i}", "code": f"C{i}", "capacity": 10**6, "is_active": True} for i in range(10)])
+        conn.execute(insert(User), [
+            {"name": "U", "email": f"u{i}@example.com", "hashed_password": "x", "role": "student", "is_active": True}
+            for i in range(rows // 10)
+        ])
+        conn.execute(insert(Enrollment), [{"user_id": i // 10 + 1, "course_id": i % 10 + 1} for i in range(rows)])
+
+
+def orm_path(session: Session, adapter: TypeAdapter) -> bytes:
+    items = session.query(Enrollment).all()
+    data = adapter.dump_python(adapter.validate_python(items, from_attributes=True), mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(session: Session) -> bytes:
+    items = [dict(row) for row in session.execute(select(*ENROLLMENT_OUT_COLUMNS)).mappings()]
+    return FastJSONResponse(items).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    seed(engine, args.rows)
+    adapter = TypeAdapter(List[EnrollmentOut])
+
+    for label, run in (("orm", lambda s: orm_path(s, adapter)), ("fast", fast_path)):
+        timings = []
+        for _ in range(args.repeat):
+            with Session(engine) as session:
+                start = time.perf_counter()
+                body = run(session)
+                timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{label:>4}: {best * 1000:7.1f}ms per {args.rows}-row response, "
+              f"{best / args.rows * 1e6:5.2f}µs per item, {len(body) / 2**10:.0f} KiB")
+    assert json.loads(orm_path(Session(engine), adapter)) == json.loads(fast_path(Session(engine)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Pool occupancy and latency with early session release on vs off.
+
+Drives a mixed workload through the sync app in-process (httpx
+ASGITransport): an admin paging a 200-student roster (the response is
+serialized from ORM objects), students fetching a single enrollment, and
+requests with a bad token. "late" patches the release out, so sessions close
+after the response is sent as they did before ReleaseSessionRoute.
+
+Occupancy is the mean number of connections checked out over the run (from
+pool checkout/checkin events). A small pool makes the difference visible:
+
+    DB_POOL_SIZE=4 DB_MAX_OVERFLOW=0 python -m benchmarks.session_release --clients 64 --requests 4000
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+from sqlalchemy import event, insert, select
+
+from app import deps
+from app.core.database import SessionLocal, engine
+from app.crud.enrollment import bulk_enroll_students
+from app.main import create_app
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+
+
+class Occupancy:
+    def __init__(self, engine):
+        self.engine = engine
+        self.held = 0.0
+        self._since = {}
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+
+    def close(self):
+        event.remove(self.engine, "checkout", self._checkout)
+        event.remove(self.engine, "checkin", self._checkin)
+
+    def _checkout(self, dbapi_connection, record, proxy):
+        self._since[id(record)] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, record):
+        start = self._since.pop(id(record), None)
+        if start is not None:
+            self.held += time.perf_counter() - start
+
+
+def seed(students: int):
+    tag = uuid.uuid4().hex[:6]
+    db = SessionLocal()
+    try:
+        course = Course(title="Bench", code=f"REL_{tag}", capacity=students)
+        db.add(course)
+        db.commit()
+        rows = [{"name": "Bench", "email": f"rel_{tag}_{i}@example.com", "hashed_password": "x", "role": "student"} for i in range(students)]
+        ids = list(db.scalars(insert(User).returning(User.id), rows))
+        db.commit()
+        bulk_enroll_students(db, course.id, ids, [])
+        return course.id, list(db.scalars(select(Enrollment.id).where(Enrollment.course_id == course.id).limit(3)))
+    finally:
+        db.close()
+
+
+async def _token(client, role: str) -> str:
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    await client.post("/api/v1/auth/signup", json={"name": "Bench", "email": email, "password": "pass123", "role": role})
+    resp = await client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return resp.json()["access_token"]
+
+
+async def run(label: str, clients: int, total_requests: int, course_id: int, enrollment_ids: list[int]):
+    app = create_app("sync")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        admin = {"Authorization": f"Bearer {await _token(client, 'admin')}"}
+        bad = {"Authorization": "Bearer not-a-token"}
+        workload = [
+            (f"/api/v1/enrollment/course/{course_id}?limit=200", admin),
+            *((f"/api/v1/enrollment/{enrollment_id}", admin) for enrollment_id in enrollment_ids),
+            ("/api/v1/enrollment/all", bad),
+        ]
+        latencies = []
+        errors = 0
+        sent = 0
+
+        async def worker():
+            nonlocal sent, errors
+            while sent < total_requests:
+                path, headers = workload[sent % len(workload)]
+                sent += 1
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(path, headers=headers)
+                    ok = resp.status_code in (200, 401)
+                except Exception:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        occupancy = Occupancy(engine)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        occupancy.close()
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{label:>5}: {len(latencies) / elapsed:8.1f} req/s  p50={p(0.50):.1f}ms p99={p(0.99):.1f}ms  "
+          f"connections busy (mean)={occupancy.held / elapsed:.2f}  errors={errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--students", type=int, default=200)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    course_id, enrollment_ids = seed(args.students)
+    close_sessions = deps._close_sessions
+    for label, release in (("early", close_sessions), ("late", lambda values: None), ("early", close_sessions)):
+        deps._close_sessions = release
+        asyncio.run(run(label, args.clients, args.requests, course_id, enrollment_ids))
+    deps._close_sessions = close_sessions
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Startup cost: importing app.main, and time until the first 200.
+
+Each run is a fresh interpreter: it imports app.main, then opens a
+TestClient (which runs the startup handlers: AUTO_MIGRATE if set, and the
+connectivity check) and requests `/`. Reports the best of --rounds, and
+what the bare import loaded: neither Alembic nor the engine should be.
+tests/test_startup.py runs one round against a budget.
+
+    python -m benchmarks.startup --rounds 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+result = {
+    "import_seconds": time.perf_counter() - start,
+    "alembic_loaded": "alembic" in sys.modules,
+    "engine_created": sys.modules["app.core.database"]._engine is not None,
+}
+if "--first-request" in sys.argv:
+    from fastapi.testclient import TestClient
+    with TestClient(app.main.app) as client:
+        result["status"] = client.get("/").status_code
+    result["first_200_seconds"] = time.perf_counter() - start
+print(json.dumps(result))
+"""
+
+
+def measure(first_request: bool = True, env: dict | None = None) -> dict:
+    """One cold start in a subprocess; `env` replaces os.environ for it."""
+    args = [sys.executable, "-c", _PROBE] + (["--first-request"] if first_request else [])
+    completed = subprocess.run(
+        args, cwd=ROOT, env=os.environ.copy() if env is None else env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.rounds)]
+    print(f"import app.main: {min(r['import_seconds'] for r in runs) * 1000:7.1f}ms  "
+          f"first 200: {min(r['first_200_seconds'] for r in runs) * 1000:7.1f}ms  (best of {args.rounds})")
+    print(f"loaded by import: alembic={runs[0]['alembic_loaded']} engine={runs[0]['engine_created']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Waitlist position lookups and promotions against shallow and deep queues.
+
+Seeds one full course per depth with that many waitlisted students, then
+times position lookups for the students at the head, middle and tail of
+the line and a run of drops, each of which promotes the head of the queue
+in its own transaction. Drops should cost the same at depth 100 and depth
+10,000 (the statement count per drop is printed alongside the timings);
+a lookup counts the index entries ahead of the student, so it grows with
+the position. Works against SQLite or Postgres (DATABASE_URL).
+
+    python -m benchmarks.waitlist --depth 10000 --promotions 200
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from sqlalchemy import insert, select
+
+from app.core.database import SessionLocal, engine
+from app.core.metrics import count_statements
+from app.crud.course import create_course
+from app.crud.enrollment import enroll_student, remove_enrollment
+from app.crud.waitlist import waitlist_position
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.schemas.course import CourseCreate
+
+
+def seed(db, depth: int):
+    """A course of capacity 1 with one enrolled student and `depth` queued; returns (course_id, [user ids in queue order])."""
+    course_id = create_course(db, CourseCreate(title="Waitlist bench", code=f"WLB_{uuid.uuid4().hex[:8]}", capacity=1)).id
+    tag = uuid.uuid4().hex[:8]
+    db.execute(insert(User), [
+        {"name": "Bench", "email": f"wlb_{tag}_{i}@example.com", "hashed_password": "x", "role": "student", "is_active": True}
+        for i in range(depth + 1)
+    ])
+    user_ids = db.execute(select(User.id).where(User.email.like(f"wlb_{tag}_%")).order_by(User.id)).scalars().all()
+    db.execute(insert(WaitlistEntry), [{"user_id": user_id, "course_id": course_id} for user_id in user_ids[1:]])
+    db.commit()
+    enroll_student(db, user_ids[0], course_id)
+    return course_id, user_ids
+
+
+def ms(samples):
+    return f"p50={statistics.median(samples) * 1000:6.2f}ms max={max(samples) * 1000:6.2f}ms"
+
+
+def run(depth: int, promotions: int, lookups: int):
+    db = SessionLocal()
+    try:
+        course_id, user_ids = seed(db, depth)
+
+        queued = user_ids[1:]
+        lookup_times = {}
+        for label, user_id in (("head", queued[0]), ("middle", queued[len(queued) // 2]), ("tail", queued[-1])):
+            lookup_times[label] = []
+            for _ in range(lookups):
+                start = time.perf_counter()
+                waitlist_position(db, user_id, course_id)
+                lookup_times[label].append(time.perf_counter() - start)
+                db.rollback()
+
+        # Each drop frees the seat the previous one promoted into
+        drop_times, statements = [], []
+        for holder in user_ids[:promotions]:
+            with count_statements(engine) as executed:
+                start = time.perf_counter()
+                remove_enrollment(db, holder, course_id)
+                drop_times.append(time.perf_counter() - start)
+            statements.append(len(executed))
+
+        remaining = waitlist_position(db, user_ids[-1], course_id)
+        print(f"depth {depth:>6}: drop+promote {ms(drop_times)} ({max(statements)} statements) | last in line now #{remaining}")
+        for label, samples in lookup_times.items():
+            print(f"              position lookup at {label:<6} {ms(samples)}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=10_000)
+    parser.add_argument("--promotions", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    for depth in (100, args.depth):
+        run(depth, min(args.promotions, depth), args.lookups)
+
+
+if __name__ == "__main__":
+    main()
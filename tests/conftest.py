@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.database import engine
+from app.core.metrics import count_statements
+from app.crud import outbox as outbox_crud
+
+
+@pytest.fixture
+def query_budget():
+    """`with query_budget(n): ...` fails the test if the block runs more than n SQL statements."""
+    @contextmanager
+    def budget(limit: int):
+        with count_statements(engine) as statements:
+            yield statements
+        assert len(statements) <= limit, (
+            f"{len(statements)} SQL statements, budget is {limit}:\n" + "\n".join(statements)
+        )
+    return budget
+
+
+@pytest.fixture(autouse=True)
+def record_outbox_events(monkeypatch):
+    """Record events as a deployment with OUTBOX_SINK does, so query budgets cover the outbox INSERT."""
+    monkeypatch.setattr(outbox_crud, "RECORD_EVENTS", True)
@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+import uuid
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _course_with_students(admin_token: str, students: int):
+    course_data = {"title": "Export", "code": f"EXP_{uuid.uuid4().hex[:6]}", "capacity": 30}
+    course = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"}).json()
+    for _ in range(students):
+        _, token = _create_token("student")
+        client.post("/api/v1/enrollment/", json={"course_id": course["id"]}, headers={"Authorization": f"Bearer {token}"})
+    return course
+
+
+# ========== EXPORT TESTS (Admin only) ==========
+
+def test_admin_export_roster_ndjson_with_details():
+    """Test streaming one course's roster as NDJSON with joined email and course code"""
+    _, admin_token = _create_token("admin")
+    course = _course_with_students(admin_token, 3)
+
+    response = client.get(
+        "/api/v1/admin/export/enrollments",
+        params={"course_id": course["id"], "details": True},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3
+    assert all(r["course_id"] == course["id"] and r["course_code"] == course["code"] for r in rows)
+    assert all(r["user_email"].endswith("@example.com") for r in rows)
+
+
+def test_admin_export_csv():
+    """Test streaming enrollments as CSV with a header row"""
+    _, admin_token = _create_token("admin")
+    course = _course_with_students(admin_token, 2)
+
+    response = client.get(
+        "/api/v1/admin/export/enrollments",
+        params={"format": "csv", "course_id": course["id"]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "user_id", "course_id", "created_at"]
+    assert len(rows) == 3
+
+
+def test_student_cannot_export():
+    """Test that students cannot export enrollments"""
+    _, student_token = _create_token("student")
+    response = client.get("/api/v1/admin/export/enrollments", headers={"Authorization": f"Bearer {student_token}"})
+    assert response.status_code == 403
+
+
+# ========== IMPORT TESTS (Admin only) ==========
+
+def test_admin_import_courses_csv_upserts_and_reports_rejects():
+    """Test CSV import inserting new codes, updating existing ones and rejecting bad rows by line"""
+    _, admin_token = _create_token("admin")
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    tag = uuid.uuid4().hex[:6]
+    existing = client.post("/api/v1/course/", json={"title": "Old", "code": f"IMP_{tag}_0", "capacity": 10}, headers=headers).json()
+
+    upload = "\n".join([
+        "title,code,capacity",
+        f"Renamed,IMP_{tag}_0,40",
+        f"New course,IMP_{tag}_1,25",
+        f"Bad capacity,IMP_{tag}_2,0",
+        f"Not a number,IMP_{tag}_3,many",
+        f"Renamed again,IMP_{tag}_1,30",
+    ])
+    response = client.post(
+        "/api/v1/admin/import/courses",
+        files={"file": ("catalog.csv", upload, "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["inserted"], summary["updated"], summary["rejected"]) == (1, 2, 2)
+    assert [row["line"] for row in summary["rejected_rows"]] == [4, 5]
+
+    updated = client.get(f"/api/v1/course/{existing['id']}", headers=headers).json()
+    assert (updated["title"], updated["capacity"]) == ("Renamed", 40)
+
+
+def test_admin_import_courses_ndjson_in_batches(monkeypatch):
+    """Test NDJSON import across several upsert batches, skipping lines that are not JSON objects"""
+    monkeypatch.setattr("app.api.admin.IMPORT_BATCH_SIZE", 7)
+    _, admin_token = _create_token("admin")
+    tag = uuid.uuid4().hex[:6]
+    lines = [json.dumps({"title": f"Course {i}", "code": f"IMPN_{tag}_{i}", "capacity": 5}) for i in range(50)]
+    lines[10] = "{not json"
+    lines[20] = "[1, 2]"
+
+    response = client.post(
+        "/api/v1/admin/import/courses",
+        files={"file": ("catalog.ndjson", "\n".join(lines) + "\n", "application/x-ndjson")},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["inserted"], summary["updated"], summary["rejected"]) == (48, 0, 2)
+    assert [row["line"] for row in summary["rejected_rows"]] == [11, 21]
+
+
+def test_student_cannot_import_courses():
+    """Test that students cannot import courses"""
+    _, student_token = _create_token("student")
+    response = client.post(
+        "/api/v1/admin/import/courses",
+        files={"file": ("catalog.csv", "title,code,capacity\n", "text/csv")},
+        headers={"Authorization": f"Bearer {student_token}"},
+    )
+    assert response.status_code == 403
@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event, func, insert, select
+
+from app.main import app
+from app.core.database import SessionLocal, engine
+from app.core.revocation import RevocationList
+from app.core.security import ALGORITHM, SECRET_KEY, create_access_token
+from app.models.auth_revocation import AuthRevocation
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _auth(token: str):
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ========== TOKEN-ONLY AUTH TESTS ==========
+
+def test_token_carries_id_role_and_epoch():
+    """Test that login issues a token with the user id, role and auth epoch"""
+    user_id, token = _create_token("student")
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert (claims["uid"], claims["role"], claims["epoch"]) == (user_id, "student", 0)
+
+
+def test_authenticated_requests_do_not_query_users():
+    """Test that authenticating (including the admin check) issues no users query"""
+    _, admin_token = _create_token("admin")
+    client.get("/api/v1/course/", headers=_auth(admin_token))
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert client.get("/api/v1/course/", headers=_auth(admin_token)).status_code == 200
+        assert client.get("/api/v1/enrollment/all", headers=_auth(admin_token)).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert not [s for s in statements if "FROM users" in s]
+
+
+def test_deactivation_and_deletion_revoke_tokens():
+    """Test that deactivating or deleting a user revokes their existing tokens"""
+    _, admin_token = _create_token("admin")
+    student_id, student_token = _create_token("student")
+    assert client.get("/api/v1/user/me", headers=_auth(student_token)).status_code == 200
+
+    assert client.patch(f"/api/v1/user/{student_id}/deactivate", headers=_auth(admin_token)).status_code == 200
+    assert client.get("/api/v1/user/me", headers=_auth(student_token)).status_code == 401
+
+    # Reactivation bumps the epoch again; the old token stays dead
+    assert client.patch(f"/api/v1/user/{student_id}/activate", headers=_auth(admin_token)).status_code == 200
+    assert client.get("/api/v1/user/me", headers=_auth(student_token)).status_code == 401
+
+    other_id, other_token = _create_token("student")
+    assert client.delete(f"/api/v1/user/{other_id}", headers=_auth(admin_token)).status_code == 200
+    assert client.get("/api/v1/course/", headers=_auth(other_token)).status_code == 401
+
+
+def test_other_processes_pick_up_revocations_from_the_log():
+    """Test that a fresh revocation list (another worker) sees bumps made elsewhere"""
+    _, admin_token = _create_token("admin")
+    student_id, _ = _create_token("student")
+    client.patch(f"/api/v1/user/{student_id}/deactivate", headers=_auth(admin_token))
+
+    other_worker = RevocationList(refresh_seconds=60)
+    assert other_worker.is_revoked(student_id, 0)
+    assert not other_worker.is_revoked(student_id, 1)
+
+
+def test_late_commit_with_old_timestamp_still_revokes():
+    """Test that an entry committed after later ids were read, stamped long before, is still picked up"""
+    worker = RevocationList(refresh_seconds=60)
+    worker.refresh()
+    db = SessionLocal()
+    try:
+        last_id = db.execute(select(func.max(AuthRevocation.id))).scalar() or 0
+        # Its id was handed out first, but the transaction commits after the next one is read
+        db.execute(insert(AuthRevocation).values(id=last_id + 2, user_id=-1, epoch=1))
+        db.commit()
+        worker.refresh()
+        db.execute(insert(AuthRevocation).values(
+            id=last_id + 1, user_id=-2, epoch=3, created_at=datetime.now(timezone.utc) - timedelta(minutes=5),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    worker.refresh()
+    assert worker.is_revoked(-1, 0)
+    assert worker.is_revoked(-2, 2)
+    assert worker._gaps == {}
+
+
+def test_expired_and_incomplete_tokens_rejected():
+    """Test that expired tokens and tokens without the new claims get a 401"""
+    user_id, _ = _create_token("student")
+    claims = {"sub": "x@example.com", "uid": user_id, "role": "student", "epoch": 0}
+    expired = jwt.encode({**claims, "exp": datetime.now(timezone.utc) - timedelta(minutes=1)}, SECRET_KEY, algorithm=ALGORITHM)
+    legacy = create_access_token(data={"sub": "x@example.com"})
+
+    for token in (expired, legacy, "not-a-token"):
+        assert client.get("/api/v1/course/", headers=_auth(token)).status_code == 401
@@ -0,0 +1,128 @@
+import time
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.main import app
+from app.core.database import SessionLocal
+from app.crud.course import create_course, get_course, update_course
+from app.crud.enrollment import bulk_enroll_students, enroll_student
+from app.crud.seats import seats_taken
+from app.crud.user import create_user
+from app.models.user import User
+from app.schemas.course import CourseCreate, CourseUpdate
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _course(db, capacity: int):
+    return create_course(db, CourseCreate(title="Cohort", code=f"BULK_{uuid.uuid4().hex[:6]}", capacity=capacity))
+
+
+def _students(db, n: int):
+    return [create_user(db, "Student", _random_email("bulk"), "x", "student") for _ in range(n)]
+
+
+# ========== BULK ENROLLMENT TESTS ==========
+
+def test_bulk_enroll_reports_each_outcome():
+    """Test enrolled, duplicate, not_found, ineligible and over_capacity outcomes in request order"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 3)
+        a, b, c, d = _students(db, 4)
+        admin = create_user(db, "Admin", _random_email("bulk_admin"), "x", "admin")
+        enroll_student(db, a.id, course.id)
+
+        results = bulk_enroll_students(
+            db, course.id, [a.id, b.id, 999999, admin.id, c.id], [b.email.upper(), d.email, "ghost@example.com"],
+        )
+        assert [(r["user_id"], r["status"]) for r in results[:5]] == [
+            (a.id, "duplicate"), (b.id, "enrolled"), (999999, "not_found"), (admin.id, "ineligible"), (c.id, "enrolled"),
+        ]
+        assert [r["status"] for r in results[5:]] == ["duplicate", "over_capacity", "not_found"]
+        assert results[7]["email"] == "ghost@example.com"
+        assert get_course(db, course.id).enrolled_count == 3
+    finally:
+        db.close()
+
+
+def test_bulk_enroll_fills_sharded_course_to_capacity():
+    """Test that a batch claims seats across counter shards without overbooking"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 10)
+        update_course(db, course, CourseUpdate(counter_shards=4))
+        students = _students(db, 12)
+
+        results = bulk_enroll_students(db, course.id, [s.id for s in students], [])
+        assert sum(r["status"] == "enrolled" for r in results) == 10
+        assert sum(r["status"] == "over_capacity" for r in results) == 2
+        assert seats_taken(db, get_course(db, course.id)) == 10
+    finally:
+        db.close()
+
+
+def test_bulk_enroll_large_cohort():
+    """Test onboarding a 1,500-student cohort in one call"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 1500)
+        tag = uuid.uuid4().hex[:8]
+        db.execute(insert(User), [
+            {"name": "Student", "email": f"cohort_{tag}_{i}@example.com", "hashed_password": "x", "role": "student", "is_active": True}
+            for i in range(1500)
+        ])
+        db.commit()
+
+        start = time.perf_counter()
+        results = bulk_enroll_students(db, course.id, [], [f"cohort_{tag}_{i}@example.com" for i in range(1500)])
+        elapsed = time.perf_counter() - start
+
+        assert all(r["status"] == "enrolled" for r in results)
+        assert get_course(db, course.id).enrolled_count == 1500
+        print(f"bulk enrolled 1500 students in {elapsed * 1000:.0f} ms")
+    finally:
+        db.close()
+
+
+def test_bulk_enroll_endpoint_requires_admin():
+    """Test the admin bulk enrollment endpoint and its permission check"""
+    _, admin_token = _create_token("admin")
+    student_id, student_token = _create_token("student")
+    course_data = {"title": "Cohort", "code": f"BULK_{uuid.uuid4().hex[:6]}", "capacity": 5}
+    course = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"}).json()
+
+    response = client.post(
+        f"/api/v1/enrollment/admin/{course['id']}",
+        json={"user_ids": [student_id]},
+        headers={"Authorization": f"Bearer {student_token}"},
+    )
+    assert response.status_code == 403
+
+    response = client.post(
+        f"/api/v1/enrollment/admin/{course['id']}",
+        json={"user_ids": [student_id]},
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["enrolled"] == 1
+    assert response.json()["results"] == [{"user_id": student_id, "email": response.json()["results"][0]["email"], "status": "enrolled"}]
+
+    response = client.post("/api/v1/enrollment/admin/999999", json={"user_ids": [student_id]}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+    response = client.post(f"/api/v1/enrollment/admin/{course['id']}", json={}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 422
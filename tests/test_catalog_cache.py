@@ -0,0 +1,134 @@
+import threading
+import time
+import uuid
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.cache import ResponseCache, make_etag
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _create_course(admin_token: str, capacity: int = 5):
+    course_data = {"title": "Cached", "code": f"CACHE_{uuid.uuid4().hex[:6]}", "capacity": capacity}
+    return client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"}).json()
+
+
+# ========== CONDITIONAL GET TESTS ==========
+
+def test_course_etag_and_not_modified():
+    """Test that a repeated course GET with If-None-Match gets an empty 304"""
+    _, admin_token = _create_token("admin")
+    course = _create_course(admin_token)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    first = client.get(f"/api/v1/course/{course['id']}", headers=headers)
+    assert first.status_code == 200
+    assert first.json()["code"] == course["code"]
+    etag = first.headers["etag"]
+    assert etag == make_etag(first.content)
+
+    again = client.get(f"/api/v1/course/{course['id']}", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    other = client.get(f"/api/v1/course/{course['id']}", headers={**headers, "If-None-Match": '"stale"'})
+    assert other.status_code == 200
+
+
+def test_admin_update_invalidates_catalog():
+    """Test that an admin write changes the cached course and catalog page right away"""
+    _, admin_token = _create_token("admin")
+    course = _create_course(admin_token)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    before = client.get(f"/api/v1/course/{course['id']}", headers=headers)
+    page_before = client.get("/api/v1/course/", params={"limit": 500}, headers=headers)
+
+    client.put(f"/api/v1/course/{course['id']}", json={"title": "Renamed"}, headers=headers)
+
+    after = client.get(f"/api/v1/course/{course['id']}", headers={**headers, "If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["title"] == "Renamed"
+    page_after = client.get("/api/v1/course/", params={"limit": 500}, headers={**headers, "If-None-Match": page_before.headers["etag"]})
+    assert page_after.status_code == 200
+
+    client.put(f"/api/v1/course/{course['id']}", json={"is_active": False}, headers=headers)
+    assert client.get(f"/api/v1/course/{course['id']}", headers=headers).status_code == 404
+
+
+def test_my_enrollments_etag_changes_on_enroll():
+    """Test that /my-enrollments revalidates to 304 until the student enrolls again"""
+    _, admin_token = _create_token("admin")
+    _, student_token = _create_token("student")
+    headers = {"Authorization": f"Bearer {student_token}"}
+    first_course, second_course = _create_course(admin_token), _create_course(admin_token)
+    client.post("/api/v1/enrollment/", json={"course_id": first_course["id"]}, headers=headers)
+
+    first = client.get("/api/v1/enrollment/my-enrollments", headers=headers)
+    etag = first.headers["etag"]
+    assert client.get("/api/v1/enrollment/my-enrollments", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.post("/api/v1/enrollment/", json={"course_id": second_course["id"]}, headers=headers)
+    after = client.get("/api/v1/enrollment/my-enrollments", headers={**headers, "If-None-Match": etag})
+    assert after.status_code == 200
+    assert len(after.json()) == 2
+    assert after.headers["etag"] != etag
+
+
+# ========== RESPONSE CACHE TESTS ==========
+
+def test_concurrent_misses_load_once():
+    """Test that concurrent misses for one key share a single loader call"""
+    cache = ResponseCache(ttl=60, max_entries=10)
+    calls, gate = [], threading.Event()
+
+    def loader():
+        calls.append(1)
+        gate.wait(5)
+        return b"[]"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.load("k", 1, loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and len({r.etag for r in results}) == 1
+
+
+def test_entries_expire_by_version_ttl_and_size():
+    """Test that entries are dropped on a version change, after the TTL, and past max_entries"""
+    cache = ResponseCache(ttl=0.2, max_entries=2)
+    cache.load("a", 1, lambda: b"a")
+    assert cache.get("a", 1) is not None
+    assert cache.get("a", 2) is None
+
+    cache.load("a", 1, lambda: b"a")
+    time.sleep(0.3)
+    assert cache.get("a", 1) is None
+
+    cache.ttl = 60
+    for key in ("a", "b", "c"):
+        cache.load(key, 1, lambda: b"x")
+    assert cache.get("a", 1) is None
+    assert cache.get("c", 1) is not None
+
+    assert cache.load("missing", 1, lambda: None) is None
+    assert cache.get("missing", 1) is None
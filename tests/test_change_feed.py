@@ -0,0 +1,205 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.main import app
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.crud.change_feed import changes_since, compact_change_log, decode_change_cursor
+from app.crud.course import create_course
+from app.crud.enrollment import bulk_enroll_students, enroll_student, join_waitlist, remove_enrollment
+from app.crud.user import create_user, delete_user
+from app.models.enrollment_change import EnrollmentChange
+from app.models.user import User
+from app.schemas.course import CourseCreate
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _course(db, capacity: int = 10):
+    return create_course(db, CourseCreate(title="Synced", code=f"SYNC_{uuid.uuid4().hex[:6]}", capacity=capacity))
+
+
+def _students(db, n: int):
+    return [create_user(db, "Student", _random_email("sync"), "x", "student").id for _ in range(n)]
+
+
+def _tail_cursor(db) -> str:
+    """A cursor positioned after every change logged so far."""
+    last = db.execute(
+        select(EnrollmentChange.txid, EnrollmentChange.seq)
+        .order_by(EnrollmentChange.txid.desc(), EnrollmentChange.seq.desc())
+        .limit(1)
+    ).first()
+    return encode_cursor([*(last or (0, 0)), 0, 0])
+
+
+def _changes(token: str, **params):
+    return client.get("/api/v1/enrollment/changes", params=params, headers={"Authorization": f"Bearer {token}"})
+
+
+def _replay(token: str, **params):
+    """Follow next_cursor until has_more is false; returns every change read."""
+    changes = []
+    while True:
+        body = _changes(token, **params).json()
+        changes.extend(body["changes"])
+        if not body["has_more"]:
+            return changes
+        params["since"] = body["next_cursor"]
+
+
+# ========== CHANGE FEED TESTS ==========
+
+def test_feed_returns_only_changes_after_cursor():
+    """Test that the feed lists inserts and delete tombstones made after the cursor, then nothing"""
+    _, admin_token = _create_token("admin")
+    db = SessionLocal()
+    try:
+        since = _tail_cursor(db)
+        course_id = _course(db).id
+        first, second = _students(db, 2)
+        enrollment_id = enroll_student(db, first, course_id).id
+        enroll_student(db, second, course_id)
+        remove_enrollment(db, first, course_id)
+    finally:
+        db.close()
+
+    resp = _changes(admin_token, since=since)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [(c["op"], c["user_id"], c["course_id"]) for c in body["changes"]] == [
+        ("insert", first, course_id), ("insert", second, course_id), ("delete", first, course_id),
+    ]
+    assert body["changes"][0]["enrollment_id"] == body["changes"][2]["enrollment_id"] == enrollment_id
+    assert body["changes"][0]["enrolled_at"] is not None
+    assert body["changes"][2]["enrolled_at"] is None
+    assert body["has_more"] is False
+
+    caught_up = _changes(admin_token, since=body["next_cursor"]).json()
+    assert caught_up == {"changes": [], "next_cursor": body["next_cursor"], "has_more": False}
+
+
+def test_every_write_path_is_logged():
+    """Test that bulk enrollment, waitlist promotion and user deletion all reach the change log"""
+    db = SessionLocal()
+    try:
+        since = decode_change_cursor(_tail_cursor(db))
+        course_id = _course(db, capacity=2).id
+        holder, seated, queued = _students(db, 3)
+        bulk_enroll_students(db, course_id, [holder, seated], [])
+        join_waitlist(db, queued, course_id)
+        delete_user(db, db.get(User, holder))
+
+        page = changes_since(db, since, 100)
+        assert [(c["op"], c["user_id"]) for c in page["changes"]] == [
+            ("insert", holder), ("insert", seated), ("delete", holder), ("insert", queued),
+        ]
+    finally:
+        db.close()
+
+
+def test_feed_cost_scales_with_churn_not_table_size(query_budget):
+    """Test that reading a page of changes is two statements however long the log is"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db).id
+        for user_id in _students(db, 5):
+            enroll_student(db, user_id, course_id)
+        since = decode_change_cursor(_tail_cursor(db))
+        enroll_student(db, _students(db, 1)[0], course_id)
+
+        with query_budget(2):
+            page = changes_since(db, since, 100)
+        assert len(page["changes"]) == 1
+    finally:
+        db.close()
+
+
+def test_cursor_paging():
+    """Test that limit pages through the changes with has_more set until the last page"""
+    _, admin_token = _create_token("admin")
+    db = SessionLocal()
+    try:
+        since = _tail_cursor(db)
+        course_id = _course(db).id
+        students = _students(db, 5)
+        for user_id in students:
+            enroll_student(db, user_id, course_id)
+    finally:
+        db.close()
+
+    pages = []
+    while True:
+        body = _changes(admin_token, since=since, limit=2).json()
+        pages.append(([c["user_id"] for c in body["changes"]], body["has_more"]))
+        if not body["has_more"]:
+            break
+        since = body["next_cursor"]
+    assert pages == [(students[:2], True), (students[2:4], True), (students[4:], False)]
+
+
+def test_invalid_cursor_and_limit_rejected():
+    """Test that a malformed cursor is a 400 and an out-of-range limit a 422"""
+    _, admin_token = _create_token("admin")
+    assert _changes(admin_token, since="not-a-cursor").status_code == 400
+    assert _changes(admin_token, since=encode_cursor([0, 1])).status_code == 400
+    assert _changes(admin_token, limit=0).status_code == 422
+    assert _changes(admin_token, limit=100_000).status_code == 422
+
+
+def test_compaction_expires_old_cursors_but_full_replay_stays_complete():
+    """Test that compaction drops superseded inserts and old tombstones, 410s older cursors and keeps live rows"""
+    _, admin_token = _create_token("admin")
+    db = SessionLocal()
+    try:
+        stale = _tail_cursor(db)
+        course_id = _course(db).id
+        dropped, kept = _students(db, 2)
+        dropped_enrollment = enroll_student(db, dropped, course_id).id
+        kept_enrollment = enroll_student(db, kept, course_id).id
+        remove_enrollment(db, dropped, course_id)
+        # A reader that has already seen the tombstone
+        fresh = _tail_cursor(db)
+        db.execute(
+            update(EnrollmentChange)
+            .where(EnrollmentChange.enrollment_id == dropped_enrollment, EnrollmentChange.op == "delete")
+            .values(created_at=datetime.now(timezone.utc) - timedelta(days=30))
+        )
+        db.commit()
+
+        superseded, expired = compact_change_log(db, timedelta(days=7))
+        assert superseded >= 1 and expired >= 1
+        assert db.execute(
+            select(EnrollmentChange.op).where(EnrollmentChange.enrollment_id == dropped_enrollment)
+        ).all() == []
+    finally:
+        db.close()
+
+    resp = _changes(admin_token, since=stale)
+    assert resp.status_code == 410
+    assert _changes(admin_token, since=fresh).status_code == 200
+
+    replayed = _replay(admin_token)
+    assert any(c["enrollment_id"] == kept_enrollment and c["op"] == "insert" for c in replayed)
+    assert not any(c["enrollment_id"] == dropped_enrollment for c in replayed)
+
+
+def test_feed_is_admin_only():
+    """Test that students cannot read the change feed"""
+    _, student_token = _create_token("student")
+    assert _changes(student_token).status_code == 403
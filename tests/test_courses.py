@@ -14,8 +14,8 @@ def _create_admin_token():
     """Helper to create admin and return token"""
     email = _random_email("admin")
     user_data = {"name": "Admin", "email": email, "password": "pass123", "role": "admin"}
-    client.post("/users/register", json=user_data)
-    login_resp = client.post("/users/login", data={"username": email, "password": "pass123"})
+    client.post("/api/v1/auth/signup", json=user_data)
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
     return login_resp.json()["access_token"]
 
 
@@ -23,51 +23,55 @@ def _create_student_token():
     """Helper to create student and return token"""
     email = _random_email("student")
     user_data = {"name": "Student", "email": email, "password": "pass123", "role": "student"}
-    client.post("/users/register", json=user_data)
-    login_resp = client.post("/users/login", data={"username": email, "password": "pass123"})
+    client.post("/api/v1/auth/signup", json=user_data)
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
     return login_resp.json()["access_token"]
 
 
 # ========== COURSE VIEWING TESTS (Both student & admin) ==========
 
-def test_authenticated_user_view_all_courses():
+def test_authenticated_user_view_all_courses(query_budget):
     """Test that authenticated users can view all courses"""
     token = _create_student_token()
-    response = client.get("/courses/", headers={"Authorization": f"Bearer {token}"})
+    with query_budget(1):
+        response = client.get("/api/v1/course/", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
+    assert isinstance(response.json()["items"], list)
 
 
-def test_authenticated_user_view_course_by_id():
+def test_authenticated_user_view_course_by_id(query_budget):
     """Test that authenticated users can view course by ID"""
     admin_token = _create_admin_token()
     
     # Create a course
     course_data = {"title": "Test Course", "code": f"TC_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    create_resp = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    create_resp = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     course_id = create_resp.json()["id"]
     
     # View as student
     student_token = _create_student_token()
-    response = client.get(f"/courses/{course_id}", headers={"Authorization": f"Bearer {student_token}"})
+    with query_budget(1):
+        response = client.get(f"/api/v1/course/{course_id}", headers={"Authorization": f"Bearer {student_token}"})
     assert response.status_code == 200
     assert response.json()["id"] == course_id
 
 
-def test_unauthenticated_user_cannot_view_courses():
+def test_unauthenticated_user_cannot_view_courses(query_budget):
     """Test that unauthenticated users cannot view courses"""
-    response = client.get("/courses/")
+    with query_budget(0):
+        response = client.get("/api/v1/course/")
     assert response.status_code == 401
 
 
 # ========== COURSE CREATION TESTS (Admin only) ==========
 
-def test_admin_create_course():
+def test_admin_create_course(query_budget):
     """Test admin can create course"""
     admin_token = _create_admin_token()
     
     course_data = {"title": "Python 101", "code": f"PY_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    response = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(4):
+        response = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     
     assert response.status_code == 200
     data = response.json()
@@ -77,43 +81,46 @@ def test_admin_create_course():
     assert data["is_active"] is True
 
 
-def test_student_cannot_create_course():
+def test_student_cannot_create_course(query_budget):
     """Test student cannot create course"""
     student_token = _create_student_token()
     
     course_data = {"title": "Python 101", "code": f"PY_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    response = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {student_token}"})
+    with query_budget(0):
+        response = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {student_token}"})
     
     assert response.status_code == 403
 
 
-def test_duplicate_course_code_rejected():
+def test_duplicate_course_code_rejected(query_budget):
     """Test that duplicate course code is rejected"""
     admin_token = _create_admin_token()
     code = f"DUP_{uuid.uuid4().hex[:6]}"
     
     course_data = {"title": "Course 1", "code": code, "capacity": 30}
-    client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     
     course_data["title"] = "Course 2"
-    response = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(1):
+        response = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     assert response.status_code == 400
 
 
 # ========== COURSE UPDATE TESTS (Admin only) ==========
 
-def test_admin_update_course():
+def test_admin_update_course(query_budget):
     """Test admin can update course"""
     admin_token = _create_admin_token()
     
     # Create course
     course_data = {"title": "Original Title", "code": f"UPD_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    create_resp = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    create_resp = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     course_id = create_resp.json()["id"]
     
     # Update course
     update_data = {"title": "Updated Title", "capacity": 50, "is_active": True}
-    response = client.put(f"/courses/{course_id}", json=update_data, headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(6):
+        response = client.put(f"/api/v1/course/{course_id}", json=update_data, headers={"Authorization": f"Bearer {admin_token}"})
     
     assert response.status_code == 200
     data = response.json()
@@ -121,97 +128,102 @@ def test_admin_update_course():
     assert data["capacity"] == update_data["capacity"]
 
 
-def test_student_cannot_update_course():
+def test_student_cannot_update_course(query_budget):
     """Test student cannot update course"""
     admin_token = _create_admin_token()
     
     # Create course
     course_data = {"title": "Test", "code": f"TST_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    create_resp = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    create_resp = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     course_id = create_resp.json()["id"]
     
     # Try to update as student
     student_token = _create_student_token()
     update_data = {"title": "Hacked", "capacity": 999, "is_active": True}
-    response = client.put(f"/courses/{course_id}", json=update_data, headers={"Authorization": f"Bearer {student_token}"})
+    with query_budget(0):
+        response = client.put(f"/api/v1/course/{course_id}", json=update_data, headers={"Authorization": f"Bearer {student_token}"})
     
     assert response.status_code == 403
 
 
 # ========== COURSE DELETION TESTS (Admin only) ==========
 
-def test_admin_delete_empty_course():
+def test_admin_delete_empty_course(query_budget):
     """Test admin can delete course with no enrollments"""
     admin_token = _create_admin_token()
     
     # Create course
     course_data = {"title": "To Delete", "code": f"DEL_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    create_resp = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    create_resp = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     course_id = create_resp.json()["id"]
     
     # Delete
-    response = client.delete(f"/courses/{course_id}", headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(4):
+        response = client.delete(f"/api/v1/course/{course_id}", headers={"Authorization": f"Bearer {admin_token}"})
     assert response.status_code == 200
     
     # Verify deleted
-    get_resp = client.get(f"/courses/{course_id}", headers={"Authorization": f"Bearer {admin_token}"})
+    get_resp = client.get(f"/api/v1/course/{course_id}", headers={"Authorization": f"Bearer {admin_token}"})
     assert get_resp.status_code == 404
 
 
-def test_student_cannot_delete_course():
+def test_student_cannot_delete_course(query_budget):
     """Test student cannot delete course"""
     admin_token = _create_admin_token()
     
     # Create course
     course_data = {"title": "Protected", "code": f"PRO_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    create_resp = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    create_resp = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     course_id = create_resp.json()["id"]
     
     # Try to delete as student
     student_token = _create_student_token()
-    response = client.delete(f"/courses/{course_id}", headers={"Authorization": f"Bearer {student_token}"})
+    with query_budget(0):
+        response = client.delete(f"/api/v1/course/{course_id}", headers={"Authorization": f"Bearer {student_token}"})
     assert response.status_code == 403
 
 
-def test_cannot_delete_course_with_enrollments():
+def test_cannot_delete_course_with_enrollments(query_budget):
     """Test that courses with enrollments cannot be deleted"""
     admin_token = _create_admin_token()
     student_token = _create_student_token()
     
     # Create course
     course_data = {"title": "Enrolled", "code": f"ENR_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    create_resp = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    create_resp = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     course_id = create_resp.json()["id"]
     
     # Enroll student
-    client.post("/enrollments/", json={"course_id": course_id}, headers={"Authorization": f"Bearer {student_token}"})
+    client.post("/api/v1/enrollment/", json={"course_id": course_id}, headers={"Authorization": f"Bearer {student_token}"})
     
     # Try to delete
-    response = client.delete(f"/courses/{course_id}", headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(1):
+        response = client.delete(f"/api/v1/course/{course_id}", headers={"Authorization": f"Bearer {admin_token}"})
     assert response.status_code == 400
     assert "active enrollments" in response.json()["detail"].lower()
 
 
 # ========== COURSE STUDENTS VIEW TEST (Admin only) ==========
 
-def test_admin_view_course_students():
+def test_admin_view_course_students(query_budget):
     """Test admin can view students in course"""
     admin_token = _create_admin_token()
     
     # Create course
     course_data = {"title": "Course", "code": f"STU_{uuid.uuid4().hex[:6]}", "capacity": 30}
-    create_resp = client.post("/courses/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
+    create_resp = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"})
     course_id = create_resp.json()["id"]
     
-    # Enroll students
-    for _ in range(2):
+    # Enroll students; the roster must not cost a query per student
+    for _ in range(5):
         student_token = _create_student_token()
-        client.post("/enrollments/", json={"course_id": course_id}, headers={"Authorization": f"Bearer {student_token}"})
+        client.post("/api/v1/enrollment/", json={"course_id": course_id}, headers={"Authorization": f"Bearer {student_token}"})
     
     # View students
-    response = client.get(f"/courses/{course_id}/students", headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(2):
+        response = client.get(f"/api/v1/course/{course_id}/students", headers={"Authorization": f"Bearer {admin_token}"})
     assert response.status_code == 200
     data = response.json()
     assert data["id"] == course_id
-    assert len(data["students"]) >= 2
+    assert len(data["students"]) >= 5
 
@@ -0,0 +1,79 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.database import SessionLocal
+from app.crud.course import create_course
+from app.crud.enrollment import enroll_student, CourseFullError, AlreadyEnrolledError
+from app.crud.user import create_user
+from app.models.enrollment import Enrollment
+from app.schemas.course import CourseCreate
+
+CAPACITY = 5
+STUDENTS = 300
+WORKERS = 32
+
+
+def _seed(capacity: int, students: int):
+    db = SessionLocal()
+    try:
+        course = create_course(db, CourseCreate(title="Stress", code=f"STR_{uuid.uuid4().hex[:6]}", capacity=capacity))
+        user_ids = [
+            create_user(db, "Student", f"stress_{uuid.uuid4().hex[:10]}@example.com", "x", "student").id
+            for _ in range(students)
+        ]
+        return course.id, user_ids
+    finally:
+        db.close()
+
+
+def _enroll(user_id: int, course_id: int):
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        enroll_student(db, user_id, course_id)
+        outcome = "enrolled"
+    except CourseFullError:
+        outcome = "full"
+    except AlreadyEnrolledError:
+        outcome = "duplicate"
+    finally:
+        db.close()
+    return outcome, time.perf_counter() - start
+
+
+def test_parallel_enrollments_never_overbook():
+    """Fire hundreds of parallel enrollments at a small course and assert zero overbooking"""
+    course_id, user_ids = _seed(CAPACITY, STUDENTS)
+
+    # Every student tries twice so duplicates race each other as well
+    attempts = user_ids + user_ids[:50]
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(lambda uid: _enroll(uid, course_id), attempts))
+
+    outcomes = [o for o, _ in results]
+    latencies = sorted(l for _, l in results)
+    print(
+        f"\n{len(attempts)} enroll calls / {WORKERS} threads: "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms "
+        f"max={latencies[-1] * 1000:.1f}ms"
+    )
+
+    db = SessionLocal()
+    try:
+        enrolled_rows = db.query(Enrollment).filter(Enrollment.course_id == course_id).count()
+    finally:
+        db.close()
+
+    assert outcomes.count("enrolled") == CAPACITY
+    assert enrolled_rows == CAPACITY
+    assert set(outcomes) <= {"enrolled", "full", "duplicate"}
+
+
+def test_duplicate_enrollment_raises_typed_error():
+    """Test that the unique constraint surfaces as AlreadyEnrolledError, not a bare Exception"""
+    course_id, (user_id,) = _seed(CAPACITY, 1)
+    assert _enroll(user_id, course_id)[0] == "enrolled"
+    assert _enroll(user_id, course_id)[0] == "duplicate"
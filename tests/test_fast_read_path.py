@@ -0,0 +1,83 @@
+import uuid
+from typing import List
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.main import app
+from app.core.database import SessionLocal
+from app.crud.course import get_course
+from app.models.enrollment import Enrollment
+from app.schemas.course import CourseOut
+from app.schemas.enrollment import EnrollmentOut
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+# ========== ORJSON FAST PATH TESTS ==========
+
+def test_my_enrollments_match_pydantic_serialization():
+    """Test that the Core + orjson path emits exactly what EnrollmentOut would"""
+    _, admin_token = _create_token("admin")
+    student_id, student_token = _create_token("student")
+    for _ in range(2):
+        course_data = {"title": "Fast", "code": f"FAST_{uuid.uuid4().hex[:6]}", "capacity": 5}
+        course = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"}).json()
+        client.post("/api/v1/enrollment/", json={"course_id": course["id"]}, headers={"Authorization": f"Bearer {student_token}"})
+
+    response = client.get("/api/v1/enrollment/my-enrollments", headers={"Authorization": f"Bearer {student_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+    db = SessionLocal()
+    try:
+        orm_items = db.query(Enrollment).filter(Enrollment.user_id == student_id).all()
+        adapter = TypeAdapter(List[EnrollmentOut])
+        expected = adapter.dump_python(adapter.validate_python(orm_items, from_attributes=True), mode="json")
+    finally:
+        db.close()
+    assert sorted(response.json(), key=lambda e: e["id"]) == sorted(expected, key=lambda e: e["id"])
+
+
+def test_catalog_items_match_course_out():
+    """Test that catalog rows carry every CourseOut field with the same values"""
+    _, admin_token = _create_token("admin")
+    course_data = {"title": "Fast", "code": f"FAST_{uuid.uuid4().hex[:6]}", "capacity": 3}
+    course = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"}).json()
+
+    items, cursor = [], None
+    while True:
+        params = {"limit": 500, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/v1/course/", params=params, headers={"Authorization": f"Bearer {admin_token}"}).json()
+        items.extend(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    item = next(i for i in items if i["id"] == course["id"])
+
+    db = SessionLocal()
+    try:
+        expected = CourseOut.model_validate(get_course(db, course["id"])).model_dump(mode="json")
+    finally:
+        db.close()
+    assert item == expected
+
+
+def test_openapi_still_documents_response_models():
+    """Test that the fast endpoints keep their response_model in the OpenAPI schema"""
+    paths = app.openapi()["paths"]
+    ok = lambda path: paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert ok("/api/v1/course/") == {"$ref": "#/components/schemas/Page_CourseOut_"}
+    assert ok("/api/v1/enrollment/all") == {"$ref": "#/components/schemas/Page_EnrollmentOut_"}
+    assert ok("/api/v1/enrollment/my-enrollments")["items"] == {"$ref": "#/components/schemas/EnrollmentOut"}
@@ -0,0 +1,102 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import engine
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User
+
+# Keep CI fast; benchmarks/index_explain.py runs the same plans against millions of rows.
+SEED_ENROLLMENTS = int(os.getenv("INDEX_TEST_ROWS", "20000"))
+STUDENTS = max(SEED_ENROLLMENTS // 10, 1)
+COURSES = max(SEED_ENROLLMENTS // STUDENTS, 1) * 4
+
+
+def _explain(conn, stmt) -> str:
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "postgresql":
+        # Small test tables would otherwise win a seq scan on cost alone
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        rows = conn.execute(text(f"EXPLAIN {compiled}")).all()
+    else:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return "\n".join(str(r[-1]) for r in rows)
+
+
+def _index(name: str):
+    for table in (User.__table__, Course.__table__, Enrollment.__table__):
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise LookupError(name)
+
+
+def _uses_index(plan: str, index_name: str) -> bool:
+    return index_name in plan
+
+
+@pytest.fixture(scope="module")
+def conn():
+    """One connection whose transaction is rolled back after the module, seed rows and index DDL included."""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+
+
+@pytest.fixture(scope="module")
+def seeded(conn):
+    tag = uuid.uuid4().hex[:6]
+    now = datetime.now(timezone.utc)
+    conn.execute(insert(User), [
+        {"name": "Seed", "email": f"seed_{tag}_{i}@example.com", "hashed_password": "x", "role": "student", "is_active": True}
+        for i in range(STUDENTS)
+    ])
+    conn.execute(insert(Course), [
+        {"title": "Seed", "code": f"SEED_{tag}_{i}", "capacity": 10_000, "is_active": i % 4 != 0}
+        for i in range(COURSES)
+    ])
+    user_ids = conn.execute(select(User.id).where(User.email.like(f"seed_{tag}_%"))).scalars().all()
+    course_ids = conn.execute(select(Course.id).where(Course.code.like(f"SEED_{tag}_%"))).scalars().all()
+    conn.execute(insert(Enrollment), [
+        {"user_id": user_ids[i % len(user_ids)], "course_id": course_ids[(i // len(user_ids)) % len(course_ids)],
+         "created_at": now - timedelta(seconds=i)}
+        for i in range(SEED_ENROLLMENTS)
+    ])
+    return user_ids[0], course_ids[1], f"SEED_{tag}_1@EXAMPLE.COM"
+
+
+CASES = [
+    ("ix_enrollments_course_id_created_at", lambda ids: select(Enrollment).where(Enrollment.course_id == ids[1]).order_by(Enrollment.created_at)),
+    ("ix_users_email_lower", lambda ids: select(User).where(func.lower(User.email) == func.lower(ids[2]))),
+    ("ix_courses_active", lambda ids: select(Course).where(Course.is_active == True).order_by(Course.id)),
+]
+
+
+@pytest.mark.parametrize("index_name,build", CASES, ids=[c[0] for c in CASES])
+def test_query_plan_before_and_after_index(conn, seeded, index_name, build):
+    """Test that each hot query only avoids a full scan once its index exists"""
+    stmt = build(seeded)
+    index = _index(index_name)
+    # Dropped and recreated inside the module's transaction, which is rolled back
+    index.drop(conn)
+    try:
+        before = _explain(conn, stmt)
+    finally:
+        index.create(conn)
+    after = _explain(conn, stmt)
+
+    assert not _uses_index(before, index_name)
+    assert _uses_index(after, index_name), after
+
+
+def test_enrollments_by_user_use_unique_constraint_index(conn, seeded):
+    """Test that my-enrollments lookups by user_id are served by the (user_id, course_id) index"""
+    plan = _explain(conn, select(Enrollment).where(Enrollment.user_id == seeded[0]))
+    assert "uq_enrollments_user_course" in plan or "sqlite_autoindex_enrollments" in plan, plan
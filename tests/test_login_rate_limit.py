@@ -0,0 +1,96 @@
+import uuid
+from multiprocessing import get_context
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import ratelimit
+from app.core.ratelimit import SharedRateLimiter, client_address, parse_limit
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _hit_in_other_process(path: str, key: str, results):
+    results.put(SharedRateLimiter(path, buckets=64).hit(key, 3, 0.001))
+
+
+# ========== LOGIN RATE LIMIT TESTS ==========
+
+def test_bucket_allows_burst_then_reports_wait(tmp_path):
+    """Test that a key gets `capacity` attempts, then a wait, without affecting other keys"""
+    limiter = SharedRateLimiter(str(tmp_path / "limits"), buckets=64)
+    assert [limiter.hit("email:a", 3, 0.5) for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = limiter.hit("email:a", 3, 0.5)
+    assert 0 < wait <= 2
+    assert limiter.hit("email:b", 3, 0.5) == 0.0
+
+
+def test_workers_share_counts_through_the_file(tmp_path):
+    """Test that another process and another limiter instance see the same buckets"""
+    path = str(tmp_path / "limits")
+    limiter = SharedRateLimiter(path, buckets=64)
+    limiter.hit("ip:1.2.3.4", 3, 0.001)
+    limiter.hit("ip:1.2.3.4", 3, 0.001)
+
+    ctx = get_context("spawn")
+    results = ctx.Queue()
+    worker = ctx.Process(target=_hit_in_other_process, args=(path, "ip:1.2.3.4", results))
+    worker.start()
+    worker.join(30)
+    assert results.get(timeout=5) == 0.0
+
+    assert SharedRateLimiter(path, buckets=64).hit("ip:1.2.3.4", 3, 0.001) > 0
+
+
+def test_login_returns_429_with_retry_after(tmp_path, monkeypatch):
+    """Test that repeated logins for one email are throttled with 429 and Retry-After"""
+    monkeypatch.setattr(ratelimit, "_login_limiter", SharedRateLimiter(str(tmp_path / "limits"), buckets=64))
+    monkeypatch.setattr(ratelimit, "LOGIN_RATE_LIMIT_EMAIL", "3/60")
+    email = _random_email("throttled")
+    client.post("/api/v1/auth/signup", json={"name": "T", "email": email, "password": "pass123", "role": "student"})
+
+    statuses = [client.post("/api/v1/auth/login", data={"username": email, "password": "wrong"}).status_code for _ in range(3)]
+    assert statuses == [401, 401, 401]
+
+    response = client.post("/api/v1/auth/login", data={"username": email.upper(), "password": "pass123"})
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["retry-after"]) <= 20
+
+    other = _random_email("other")
+    client.post("/api/v1/auth/signup", json={"name": "O", "email": other, "password": "pass123", "role": "student"})
+    assert client.post("/api/v1/auth/login", data={"username": other, "password": "pass123"}).status_code == 200
+
+
+def test_ip_limit_uses_trusted_forwarded_hop(tmp_path, monkeypatch):
+    """Test that behind a trusted proxy each client gets its own bucket, and a spoofed header does not help"""
+    monkeypatch.setattr(ratelimit, "_login_limiter", SharedRateLimiter(str(tmp_path / "limits"), buckets=64))
+    monkeypatch.setattr(ratelimit, "LOGIN_RATE_LIMIT_IP", "2/60")
+    monkeypatch.setattr(ratelimit, "LOGIN_TRUSTED_PROXY_HOPS", 1)
+
+    def login(forwarded_for: str):
+        return client.post(
+            "/api/v1/auth/login", data={"username": _random_email("ip"), "password": "x"},
+            headers={"X-Forwarded-For": forwarded_for},
+        ).status_code
+
+    assert [login("203.0.113.7") for _ in range(2)] == [401, 401]
+    assert login("198.51.100.1, 203.0.113.7") == 429
+    assert login("198.51.100.2") == 401
+
+
+def test_client_address():
+    """Test picking the client out of X-Forwarded-For by trusted hop count"""
+    assert client_address("10.0.0.1", "1.1.1.1, 2.2.2.2", 0) == "10.0.0.1"
+    assert client_address("10.0.0.1", "1.1.1.1, 2.2.2.2", 1) == "2.2.2.2"
+    assert client_address("10.0.0.1", "1.1.1.1, 2.2.2.2", 2) == "1.1.1.1"
+    assert client_address("10.0.0.1", "2.2.2.2", 2) == "10.0.0.1"
+    assert client_address(None, None, 1) == "unknown"
+
+
+def test_parse_limit():
+    """Test the attempts/seconds limit format"""
+    assert parse_limit("10/60") == (10.0, 10 / 60)
+    assert parse_limit("0") == (0.0, 0.0)
@@ -0,0 +1,91 @@
+import re
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.core.database import engine
+from app.core.metrics import SHARED_REFRESH, count_statements
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    """Value of the first sample of `name` whose labels include `labels`"""
+    for line in text.splitlines():
+        match = re.match(rf"^{name}\{{(.*)\}} (\S+)$", line)
+        if match and all(f'{k}="{v}"' in match.group(1) for k, v in labels.items()):
+            return float(match.group(2))
+    raise AssertionError(f"no {name} sample with {labels}")
+
+
+# ========== METRICS TESTS ==========
+
+def test_requests_labelled_by_route_template():
+    """Test that requests are counted per route template and status, not per raw path"""
+    _, admin_token = _create_token("admin")
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    before = client.get("/metrics").text
+    try:
+        seen = _sample(before, "http_requests_total", route="/api/v1/course/{course_id}", status="404")
+    except AssertionError:
+        seen = 0
+    client.get("/api/v1/course/999999991", headers=headers)
+    client.get("/api/v1/course/999999992", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert _sample(text, "http_requests_total", method="GET", route="/api/v1/course/{course_id}", status="404") == seen + 2
+    assert "999999991" not in text
+    assert _sample(text, "http_request_duration_seconds_count", route="/api/v1/course/{course_id}") >= 2
+    assert _sample(text, "http_request_duration_seconds_bucket", route="/api/v1/course/{course_id}", le="+Inf") >= 2
+
+
+def test_sql_statements_charged_to_route():
+    """Test that statements run by a handler are counted against its route"""
+    _, admin_token = _create_token("admin")
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    for _ in range(3):
+        client.get("/api/v1/enrollment/all", headers=headers)
+
+    text = client.get("/metrics").text
+    assert _sample(text, "db_statements_total", route="/api/v1/enrollment/all") >= 3
+    assert _sample(text, "db_statement_seconds_total", route="/api/v1/enrollment/all") > 0
+    assert _sample(text, "db_statements_per_request_count", route="/api/v1/enrollment/all") >= 3
+    # The token alone authenticates, so the root page never touches the database
+    client.get("/")
+    text = client.get("/metrics").text
+    assert _sample(text, "db_statements_total", route="/") == 0
+
+
+def test_pool_stats_exposed():
+    """Test that connection pool gauges and checkout counters are reported"""
+    client.get("/")
+    text = client.get("/metrics").text
+    assert _sample(text, "db_pool_checkouts_total", engine="sync") > 0
+    assert _sample(text, "db_pool_checked_out", engine="sync") >= 0
+    assert "# TYPE db_pool_overflow gauge" in text
+    assert "/metrics" not in app.openapi()["paths"]
+
+
+def test_count_statements_skips_shared_refreshes():
+    """Test that the query counter sees the block's statements but not periodic shared refreshes"""
+    with count_statements(engine) as statements:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2").execution_options(**SHARED_REFRESH))
+    assert statements == ["SELECT 1"]
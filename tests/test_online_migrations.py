@@ -0,0 +1,102 @@
+import io
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.metrics import count_statements
+from app.core.migrations import migration_lock
+from app.core.online_migrations import (
+    add_foreign_key_not_valid, add_unique_constraint_concurrently, backfill_in_batches, create_index_concurrently,
+    drop_index_concurrently, execute_in_batches, validate_constraint,
+)
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'online.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, flag INTEGER)"))
+        conn.execute(text("INSERT INTO items (id, flag) VALUES (:id, NULL)"), [{"id": i} for i in range(1, 1001)])
+    return engine
+
+
+# ========== ONLINE MIGRATION TESTS ==========
+
+def test_backfill_runs_in_key_ranges(tmp_path):
+    """Test that a backfill updates every row in separately committed batches"""
+    engine = _engine(tmp_path)
+    with engine.connect() as conn, Operations.context(MigrationContext.configure(conn)):
+        with count_statements(engine) as statements:
+            updated = backfill_in_batches("items", "flag = 1", where="flag IS NULL", batch_size=300, pause=0)
+    assert updated == 1000
+    assert sum(s.startswith("UPDATE items") for s in statements) == 4
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM items WHERE flag IS NULL")).scalar() == 0
+    engine.dispose()
+
+
+def test_batched_dedupe_then_unique_constraint(tmp_path):
+    """Test that a batched DELETE removes later duplicates so the unique constraint can be added"""
+    engine = _engine(tmp_path)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE items SET flag = id % 100"))
+    with engine.connect() as conn, Operations.context(MigrationContext.configure(conn)):
+        deleted = execute_in_batches(
+            "items",
+            "DELETE FROM items AS a WHERE {batch} AND EXISTS (SELECT 1 FROM items b WHERE b.flag = a.flag AND b.id < a.id)",
+            range_key="a.id", batch_size=300, pause=0,
+        )
+        add_unique_constraint_concurrently("uq_items_flag", "items", ["flag"])
+    assert deleted == 900
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT min(id), max(id), count(*) FROM items")).one() == (1, 100, 100)
+    assert {"name": "uq_items_flag", "column_names": ["flag"], "unique": 1} in [
+        {key: ix[key] for key in ("name", "column_names", "unique")} for ix in inspect(engine).get_indexes("items")
+    ]
+    engine.dispose()
+
+
+def test_create_index_concurrently_falls_back(tmp_path):
+    """Test that the concurrent index helper builds a plain index off Postgres"""
+    engine = _engine(tmp_path)
+    with engine.connect() as conn, Operations.context(MigrationContext.configure(conn)):
+        create_index_concurrently("ix_items_flag", "items", ["flag"])
+    assert "ix_items_flag" in {ix["name"] for ix in inspect(engine).get_indexes("items")}
+    with migration_lock(engine) as locked:
+        assert locked is True
+    engine.dispose()
+
+
+def test_postgres_constraints_added_not_valid():
+    """Test the SQL for a NOT VALID foreign key validated outside the migration transaction"""
+    buffer = io.StringIO()
+    ctx = MigrationContext.configure(dialect_name="postgresql", opts={"as_sql": True, "output_buffer": buffer})
+    with Operations.context(ctx):
+        add_foreign_key_not_valid("fk_items_course", "items", "courses", ["course_id"], ["id"], ondelete="CASCADE")
+        validate_constraint("fk_items_course", "items")
+        backfill_in_batches("items", "flag = 0")
+        add_unique_constraint_concurrently("uq_items_flag", "items", ["flag"])
+    sql = buffer.getvalue()
+    assert "ADD CONSTRAINT fk_items_course FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE CASCADE NOT VALID" in sql
+    assert "COMMIT;\n\nALTER TABLE items VALIDATE CONSTRAINT fk_items_course" in sql
+    assert "UPDATE items SET flag = 0;" in sql
+    assert "CREATE UNIQUE INDEX CONCURRENTLY uq_items_flag ON items (flag)" in sql
+    assert "ALTER TABLE items ADD CONSTRAINT uq_items_flag UNIQUE USING INDEX uq_items_flag" in sql
+
+
+def test_postgres_concurrent_builds_lift_the_lock_timeout():
+    """Test that concurrent index builds drop any leftover and run without the migration lock_timeout, then restore it"""
+    buffer = io.StringIO()
+    ctx = MigrationContext.configure(dialect_name="postgresql", opts={"as_sql": True, "output_buffer": buffer})
+    with Operations.context(ctx):
+        create_index_concurrently("ix_items_flag", "items", ["flag"])
+        drop_index_concurrently("ix_items_flag", "items")
+    statements = [s.strip() for s in buffer.getvalue().split(";") if s.strip() and s.strip() not in ("BEGIN", "COMMIT")]
+    assert statements == [
+        "SET lock_timeout = 0",
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_items_flag",
+        "CREATE INDEX CONCURRENTLY ix_items_flag ON items (flag)",
+        "SET lock_timeout = 5000",
+        "SET lock_timeout = 0",
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_items_flag",
+        "SET lock_timeout = 5000",
+    ]
@@ -0,0 +1,389 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.main import app
+from app.core.database import SessionLocal
+from app.core import outbox as outbox_core
+from app.core.outbox import FileSink, HttpSink, OutboxDispatcher, Sink, sink_from_url
+from app.crud import outbox as outbox_crud
+from app.crud.course import create_course, update_course, upsert_courses
+from app.crud.enrollment import CourseFullError, enroll_student, remove_enrollment
+from app.crud.user import create_user, delete_user
+from app.models.outbox import OutboxEvent
+from app.schemas.course import CourseCreate, CourseUpdate
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _course(db, capacity: int = 5):
+    return create_course(db, CourseCreate(title="Events", code=f"EVT_{uuid.uuid4().hex[:6]}", capacity=capacity))
+
+
+def _last_event_id(db) -> int:
+    return db.execute(select(func.max(OutboxEvent.id))).scalar() or 0
+
+
+def _events_after(db, event_id: int):
+    return [
+        (row.event_type, row.payload)
+        for row in db.execute(select(OutboxEvent).where(OutboxEvent.id > event_id).order_by(OutboxEvent.id)).scalars()
+    ]
+
+
+def _drain_backlog():
+    """Deliver whatever earlier tests left in the outbox, so a test sees only its own events."""
+    dispatcher = OutboxDispatcher(RecordingSink(), batch_size=1000)
+    try:
+        dispatcher.drain()
+    finally:
+        dispatcher.stop()
+
+
+class RecordingSink(Sink):
+    """Collects delivered events, optionally taking `delay` seconds per call."""
+
+    def __init__(self, delay: float = 0.0):
+        self.events = []
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def deliver(self, events):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            with self._lock:
+                self.events.extend(events)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+# ========== EVENT RECORDING TESTS ==========
+
+def test_changes_write_events_in_their_transaction():
+    """Test that enroll, removals, course updates and user deletion each leave their event, and failures none"""
+    db = SessionLocal()
+    try:
+        course = _course(db, capacity=1)
+        course_id = course.id
+        student = create_user(db, "Student", _random_email("evt"), "x", "student")
+        student_id = student.id
+        other = create_user(db, "Student", _random_email("evt"), "x", "student").id
+        start = _last_event_id(db)
+
+        enrollment = enroll_student(db, student_id, course_id)
+        with pytest.raises(CourseFullError):
+            enroll_student(db, other, course_id)
+        remove_enrollment(db, student_id, course_id, "removed_by_admin")
+        enroll_student(db, student_id, course_id)
+        update_course(db, course, CourseUpdate(title="Renamed"))
+        delete_user(db, student)
+
+        events = _events_after(db, start)
+        assert [event_type for event_type, _ in events] == [
+            "enrollment.created", "enrollment.deleted", "enrollment.created", "course.updated",
+            "enrollment.deleted", "user.deleted",
+        ]
+        assert events[0][1] == {"enrollment_id": enrollment.id, "user_id": student_id, "course_id": course_id, "source": "student"}
+        assert events[1][1]["reason"] == "removed_by_admin"
+        assert events[3][1] == {"course_id": course_id, "changes": {"title": "Renamed"}}
+        assert events[4][1]["reason"] == "user_deleted"
+        assert events[5][1] == {"user_id": student_id}
+    finally:
+        db.close()
+
+
+def test_nothing_recorded_without_a_sink(monkeypatch):
+    """Test that with OUTBOX_SINK unset, the default, writes leave no events behind to pile up"""
+    env = {k: v for k, v in os.environ.items() if k != "OUTBOX_SINK"}
+    default = subprocess.run(
+        [sys.executable, "-c", "from app.crud.outbox import RECORD_EVENTS; print(RECORD_EVENTS)"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    assert default.stdout.strip() == "False"
+
+    monkeypatch.setattr(outbox_crud, "RECORD_EVENTS", False)
+    db = SessionLocal()
+    try:
+        course = _course(db)
+        student_id = create_user(db, "Student", _random_email("evt"), "x", "student").id
+        start = _last_event_id(db)
+        enroll_student(db, student_id, course.id)
+        remove_enrollment(db, student_id, course.id)
+        update_course(db, course, CourseUpdate(title="Renamed"))
+        assert _events_after(db, start) == []
+    finally:
+        db.close()
+
+
+def test_course_import_records_updates():
+    """Test that an import records course.updated for changed courses only, with just the changed fields"""
+    db = SessionLocal()
+    try:
+        renamed, resized, same = (_course(db, capacity=5) for _ in range(3))
+        ids = {c.code: c.id for c in (renamed, resized, same)}
+        new_code = f"EVT_{uuid.uuid4().hex[:6]}"
+        start = _last_event_id(db)
+        upsert_courses(db, [
+            {"title": "Imported", "code": renamed.code, "capacity": 5},
+            {"title": "Events", "code": resized.code, "capacity": 8},
+            {"title": "Events", "code": same.code, "capacity": 5},
+            {"title": "Brand new", "code": new_code, "capacity": 5},
+        ])
+        assert sorted(_events_after(db, start), key=lambda e: e[1]["course_id"]) == [
+            ("course.updated", {"course_id": ids[renamed.code], "changes": {"title": "Imported"}}),
+            ("course.updated", {"course_id": ids[resized.code], "changes": {"capacity": 8}}),
+        ]
+    finally:
+        db.close()
+
+
+def test_deregister_endpoint_records_reason():
+    """Test that a student's own drop is recorded as deregistered"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db).id
+        start = _last_event_id(db)
+    finally:
+        db.close()
+    _, token = _create_token("student")
+    client.post("/api/v1/enrollment/", json={"course_id": course_id}, headers={"Authorization": f"Bearer {token}"})
+    client.delete(f"/api/v1/enrollment/{course_id}", headers={"Authorization": f"Bearer {token}"})
+
+    db = SessionLocal()
+    try:
+        events = [e for e in _events_after(db, start) if e[1].get("course_id") == course_id]
+        assert [(t, p.get("source"), p.get("reason")) for t, p in events] == [
+            ("enrollment.created", "student", None), ("enrollment.deleted", None, "deregistered"),
+        ]
+    finally:
+        db.close()
+
+
+# ========== DISPATCHER TESTS ==========
+
+def test_dispatcher_drains_to_file_sink(tmp_path):
+    """Test that a drain writes every due event as a JSON line and empties the outbox"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db).id
+        enroll_student(db, create_user(db, "Student", _random_email("evt"), "x", "student").id, course_id)
+    finally:
+        db.close()
+
+    path = tmp_path / "events.jsonl"
+    dispatcher = OutboxDispatcher(sink_from_url(f"file://{path}"), batch_size=50)
+    try:
+        assert dispatcher.drain() > 0
+    finally:
+        dispatcher.stop()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert any(e["type"] == "enrollment.created" and e["payload"]["course_id"] == course_id for e in lines)
+    assert len({e["id"] for e in lines}) == len(lines)
+    db = SessionLocal()
+    try:
+        assert db.execute(select(func.count()).select_from(OutboxEvent)).scalar() == 0
+    finally:
+        db.close()
+
+
+def test_failed_delivery_is_retried_with_backoff():
+    """Test that an HTTP sink failure reschedules the batch, which a later run delivers again"""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            received.append(body["events"])
+            self.send_response(503 if len(received) == 1 else 204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    _drain_backlog()
+    db = SessionLocal()
+    try:
+        course_id = _course(db).id
+        enroll_student(db, create_user(db, "Student", _random_email("evt"), "x", "student").id, course_id)
+    finally:
+        db.close()
+
+    sink = sink_from_url(f"http://127.0.0.1:{server.server_port}/events")
+    assert isinstance(sink, HttpSink)
+    dispatcher = OutboxDispatcher(sink, batch_size=1000, concurrency=1, retry_base_seconds=0.2)
+    try:
+        claimed = dispatcher.run_once()
+        assert claimed == 1 and dispatcher.failed == 1
+        db = SessionLocal()
+        try:
+            pending = db.execute(select(OutboxEvent)).scalars().all()
+            assert all(e.attempts == 1 and "503" in e.last_error for e in pending)
+        finally:
+            db.close()
+
+        # Still backing off
+        assert dispatcher.run_once() == 0
+        time.sleep(0.25)
+        assert dispatcher.run_once() == claimed
+        assert dispatcher.delivered == claimed
+    finally:
+        dispatcher.stop()
+        server.shutdown()
+
+    first, second = received
+    assert [e["id"] for e in first] == [e["id"] for e in second]
+    assert {e["attempt"] for e in second} == {2}
+
+
+def test_expired_claim_is_delivered_again():
+    """Test at-least-once delivery: events claimed by a dispatcher that died go out once the lease ends"""
+    _drain_backlog()
+    db = SessionLocal()
+    try:
+        enroll_student(db, create_user(db, "Student", _random_email("evt"), "x", "student").id, _course(db).id)
+        crashed = OutboxDispatcher(RecordingSink(), lease_seconds=0.1)
+        claimed = {row.id for row in crashed.claim(db)}
+        crashed.stop()
+    finally:
+        db.close()
+
+    sink = RecordingSink()
+    survivor = OutboxDispatcher(sink)
+    try:
+        assert survivor.run_once() == 0
+        time.sleep(0.15)
+        survivor.drain()
+    finally:
+        survivor.stop()
+    assert claimed <= {e["id"] for e in sink.events}
+
+
+def test_delivery_concurrency_is_bounded_and_per_course_order_kept():
+    """Test that at most `concurrency` sink calls run at once and each course's events arrive in order"""
+    db = SessionLocal()
+    try:
+        course_ids = [_course(db, capacity=10).id for _ in range(6)]
+        students = [create_user(db, "Student", _random_email("evt"), "x", "student").id for _ in range(3)]
+        for student_id in students:
+            for course_id in course_ids:
+                enroll_student(db, student_id, course_id)
+    finally:
+        db.close()
+
+    sink = RecordingSink(delay=0.05)
+    dispatcher = OutboxDispatcher(sink, batch_size=1000, concurrency=2)
+    try:
+        dispatcher.drain()
+    finally:
+        dispatcher.stop()
+
+    assert sink.max_active <= 2
+    for course_id in course_ids:
+        ids = [e["id"] for e in sink.events if e["payload"].get("course_id") == course_id]
+        assert len(ids) == 3 and ids == sorted(ids)
+
+
+def test_request_latency_excludes_delivery():
+    """Test that enrolling returns before a slow sink has seen the event"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db).id
+    finally:
+        db.close()
+    _, token = _create_token("student")
+
+    sink = RecordingSink(delay=1.0)
+    dispatcher = OutboxDispatcher(sink, poll_seconds=0.05)
+    dispatcher.start()
+    try:
+        start = time.perf_counter()
+        resp = client.post("/api/v1/enrollment/", json={"course_id": course_id}, headers={"Authorization": f"Bearer {token}"})
+        elapsed = time.perf_counter() - start
+        assert resp.status_code == 200
+        assert elapsed < 1.0
+
+        deadline = time.monotonic() + 10
+        while not any(e["payload"].get("course_id") == course_id for e in sink.events) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert any(e["payload"].get("course_id") == course_id for e in sink.events)
+    finally:
+        dispatcher.stop()
+
+
+def test_dispatcher_survives_non_database_errors(monkeypatch):
+    """Test that a sink or serialization error outside SQLAlchemy does not end the dispatcher thread"""
+    _drain_backlog()
+    db = SessionLocal()
+    try:
+        course_id = _course(db).id
+        enroll_student(db, create_user(db, "Student", _random_email("evt"), "x", "student").id, course_id)
+    finally:
+        db.close()
+
+    serialize = outbox_core._event_body
+    calls = []
+
+    def flaky_body(row):
+        calls.append(row.id)
+        if len(calls) == 1:
+            raise TypeError("payload is not serializable")
+        return serialize(row)
+
+    class FlakySink(RecordingSink):
+        def deliver(self, events):
+            if not self.failed:
+                self.failed = True
+                raise OSError("connection reset by peer")
+            super().deliver(events)
+
+    monkeypatch.setattr(outbox_core, "_event_body", flaky_body)
+    sink = FlakySink()
+    sink.failed = False
+    dispatcher = OutboxDispatcher(sink, poll_seconds=0.05, lease_seconds=0.1, retry_base_seconds=0.05)
+    dispatcher.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not any(e["payload"].get("course_id") == course_id for e in sink.events) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert any(e["payload"].get("course_id") == course_id for e in sink.events)
+        assert dispatcher._thread.is_alive()
+    finally:
+        dispatcher.stop()
+
+
+def test_unknown_sink_scheme_rejected(tmp_path):
+    """Test that OUTBOX_SINK must be a file or http(s) URL"""
+    assert isinstance(sink_from_url(f"file://{tmp_path}/e.jsonl"), FileSink)
+    with pytest.raises(ValueError):
+        sink_from_url("kafka://broker/topic")
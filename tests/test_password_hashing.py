@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import uuid
+from fastapi.testclient import TestClient
+from passlib.hash import pbkdf2_sha256
+
+from app.main import app
+from app.core import hashing
+from app.core.database import SessionLocal
+from app.core.hashing import PasswordHasher
+from app.core.security import PASSWORD_HASH_ROUNDS
+from app.crud.user import create_user, get_user
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+# ========== PASSWORD HASHING POOL TESTS ==========
+
+def test_full_queue_returns_503_with_retry_after(monkeypatch):
+    """Test that signup and login fail fast with 503 and Retry-After when the hashing queue is full"""
+    email = _random_email("busy")
+    client.post("/api/v1/auth/signup", json={"name": "Busy", "email": email, "password": "pass123", "role": "student"})
+    monkeypatch.setattr("app.api.auth.password_hasher", PasswordHasher(workers=1, max_pending=0))
+
+    for response in (
+        client.post("/api/v1/auth/signup", json={"name": "Busy", "email": _random_email("busy"), "password": "pass123", "role": "student"}),
+        client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"}),
+    ):
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(hashing.PASSWORD_HASH_RETRY_AFTER)
+
+
+def test_login_rehashes_with_current_parameters():
+    """Test that a hash made with other rounds is transparently replaced on login"""
+    email = _random_email("rehash")
+    db = SessionLocal()
+    try:
+        user = create_user(db, "Old", email, pbkdf2_sha256.using(rounds=1000).hash("pass123"), "student")
+        user_id = user.id
+    finally:
+        db.close()
+
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    assert response.status_code == 200
+
+    db = SessionLocal()
+    try:
+        stored = get_user(db, user_id).hashed_password
+    finally:
+        db.close()
+    assert stored.startswith(f"$pbkdf2-sha256${PASSWORD_HASH_ROUNDS}$")
+    assert pbkdf2_sha256.verify("pass123", stored)
+    assert client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"}).status_code == 200
+
+
+def test_wrong_password_still_rejected():
+    """Test that verification in the pool still rejects a bad password"""
+    email = _random_email("wrong")
+    client.post("/api/v1/auth/signup", json={"name": "Wrong", "email": email, "password": "pass123", "role": "student"})
+    assert client.post("/api/v1/auth/login", data={"username": email, "password": "nope"}).status_code == 401
+
+
+def test_hashing_stats_record_latency():
+    """Test that per-call hash latency is recorded and visible to admins"""
+    _, admin_token = _create_token("admin")
+    response = client.get("/api/v1/admin/password-hashing", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["calls"] >= 2
+    assert stats["compute_ms"]["p50"] > 0
+    assert stats["rounds"] == PASSWORD_HASH_ROUNDS
+
+
+def test_hasher_settings_rejected_at_startup():
+    """Test that PASSWORD_HASH_MAX_PENDING below 1, which would 503 every login, stops the process"""
+    env = {**os.environ, "PASSWORD_HASH_MAX_PENDING": "0"}
+    result = subprocess.run([sys.executable, "-c", "import app.core.hashing"], env=env, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "PASSWORD_HASH_MAX_PENDING=0 must be at least 1" in result.stderr
@@ -0,0 +1,73 @@
+import re
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.main import app
+from app.core.pooling import TimedNullPool, TimedQueuePool, configure_engine, engine_options, pool_settings_from_env
+
+client = TestClient(app)
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    """Value of the first sample of `name` whose labels include `labels`"""
+    for line in text.splitlines():
+        match = re.match(rf"^{name}\{{(.*)\}} (\S+)$", line)
+        if match and all(f'{k}="{v}"' in match.group(1) for k, v in labels.items()):
+            return float(match.group(2))
+    raise AssertionError(f"no {name} sample with {labels}")
+
+
+# ========== POOL SETTINGS TESTS ==========
+
+@pytest.mark.parametrize("env", [
+    {"DB_POOL_PROFILE": "roundrobin"},
+    {"DB_POOL_SIZE": "five"},
+    {"DB_POOL_SIZE": "0"},
+    {"DB_POOL_PROFILE": "lifo", "DB_POOL_RECYCLE": "-1"},
+])
+def test_invalid_pool_settings_rejected(monkeypatch, env):
+    """Test that malformed or inconsistent pool settings fail at startup"""
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError):
+        pool_settings_from_env()
+
+
+def test_pool_profiles(monkeypatch):
+    """Test the engine options each profile produces"""
+    monkeypatch.setenv("DB_POOL_PROFILE", "lifo")
+    lifo = engine_options("postgresql://u:p@db/app", settings=pool_settings_from_env())
+    assert lifo["poolclass"] is TimedQueuePool
+    assert lifo["pool_use_lifo"] is True
+    assert lifo["pool_recycle"] == 300
+    assert lifo["pool_pre_ping"] is False
+
+    monkeypatch.setenv("DB_POOL_PROFILE", "pgbouncer")
+    bouncer = engine_options("postgresql+asyncpg://u:p@db/app", {"ssl": "require"}, is_async=True, settings=pool_settings_from_env())
+    assert bouncer["poolclass"] is TimedNullPool
+    assert bouncer["connect_args"] == {"ssl": "require", "statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+
+def test_pool_wait_and_timeouts_exposed(tmp_path, monkeypatch):
+    """Test that checkout waits and pool timeouts show up on /metrics"""
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0.05")
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    small = create_engine(url, **engine_options(url, settings=pool_settings_from_env()))
+    configure_engine(small, "pool-test")
+    try:
+        with small.connect():
+            with pytest.raises(PoolTimeoutError):
+                small.connect()
+        with small.connect():
+            pass
+    finally:
+        small.dispose()
+
+    text = client.get("/metrics").text
+    assert _sample(text, "db_pool_timeouts_total", engine="pool-test") == 1
+    assert _sample(text, "db_pool_wait_seconds_count", engine="pool-test") == 2
+    assert _sample(text, "db_pool_size", engine="pool-test") == 1
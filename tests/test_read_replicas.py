@@ -0,0 +1,84 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.main import app
+from app.core.database import Base
+from app.core.replicas import PIN_COOKIE, Replica, primary_pins, replica_set
+from app.models.enrollment import Enrollment
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second SQLite database standing in for a replica that has diverged from the primary"""
+    standby = Replica("test", f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(standby.engine)
+    monkeypatch.setattr(replica_set, "replicas", [standby])
+    monkeypatch.setattr(replica_set, "_checked_at", None)
+    client.cookies.clear()
+    yield standby
+    client.cookies.clear()
+    standby.engine.dispose()
+
+
+# ========== READ REPLICA TESTS ==========
+
+def test_reads_served_from_replica(replica):
+    """Test that read-only routes query the replica, not the primary"""
+    student_id, token = _create_token("student")
+    with replica.engine.begin() as conn:
+        conn.execute(insert(Enrollment).values(id=424242, user_id=student_id, course_id=1))
+
+    response = client.get("/api/v1/enrollment/my-enrollments", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert [e["id"] for e in response.json()] == [424242]
+
+
+def test_enroll_pins_reads_to_primary(replica, monkeypatch):
+    """Test that a student reads their own enrollment right after enrolling"""
+    _, admin_token = _create_token("admin")
+    student_id, token = _create_token("student")
+    course_data = {"title": "Replica", "code": f"REP_{uuid.uuid4().hex[:6]}", "capacity": 5}
+    course = client.post("/api/v1/course/", json=course_data, headers={"Authorization": f"Bearer {admin_token}"}).json()
+
+    enroll = client.post("/api/v1/enrollment/", json={"course_id": course["id"]}, headers={"Authorization": f"Bearer {token}"})
+    assert enroll.status_code == 200
+    assert PIN_COOKIE in enroll.cookies
+
+    mine = client.get("/api/v1/enrollment/my-enrollments", headers={"Authorization": f"Bearer {token}"})
+    assert [e["course_id"] for e in mine.json()] == [course["id"]]
+
+    # Once the window has passed the replica (which never saw the write) serves again
+    monkeypatch.setattr(primary_pins, "_until", {})
+    client.cookies.clear()
+    mine = client.get("/api/v1/enrollment/my-enrollments", headers={"Authorization": f"Bearer {token}"})
+    assert mine.json() == []
+
+
+def test_unhealthy_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    """Test that a replica failing its health check is skipped"""
+    broken = Replica("broken", f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(replica_set, "replicas", [broken])
+    monkeypatch.setattr(replica_set, "_checked_at", None)
+    _, admin_token = _create_token("admin")
+
+    response = client.get("/api/v1/enrollment/all", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert broken.healthy is False
+    health = client.get("/api/v1/admin/replicas", headers={"Authorization": f"Bearer {admin_token}"}).json()
+    assert health == [{"name": "broken", "healthy": False, "lag_seconds": None}]
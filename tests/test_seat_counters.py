@@ -0,0 +1,211 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.database import SessionLocal
+from app.crud.course import create_course, get_active_course_row, get_course, update_course
+from app.crud.enrollment import enroll_student, remove_enrollment, bulk_remove_enrollments, CourseFullError
+from app.crud.seats import claim_seat, reconcile_seat_counters, seats_taken
+from app.crud.user import create_user, delete_user, get_user
+from app.models.enrollment import Enrollment
+from app.models.seat_counter import CourseSeatCounter
+from app.schemas.course import CourseCreate, CourseOut, CourseUpdate
+
+
+def _course(db, capacity: int):
+    return create_course(db, CourseCreate(title="Seats", code=f"SEAT_{uuid.uuid4().hex[:6]}", capacity=capacity))
+
+
+def _students(db, n: int):
+    return [create_user(db, "Student", f"seats_{uuid.uuid4().hex[:10]}@example.com", "x", "student").id for _ in range(n)]
+
+
+def _enrolled_count(course_id: int):
+    db = SessionLocal()
+    try:
+        return get_course(db, course_id).enrolled_count
+    finally:
+        db.close()
+
+
+def test_counter_follows_enroll_and_every_removal_path():
+    """Test enrolled_count on enroll, deregister, bulk removal and user deletion"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 10)
+        a, b, c, d = _students(db, 4)
+        for user_id in (a, b, c, d):
+            enroll_student(db, user_id, course.id)
+        assert _enrolled_count(course.id) == 4
+
+        remove_enrollment(db, a, course.id)
+        assert _enrolled_count(course.id) == 3
+
+        bulk_remove_enrollments(db, course.id, [b, c, 999999])
+        assert _enrolled_count(course.id) == 1
+
+        delete_user(db, get_user(db, d))
+        assert _enrolled_count(course.id) == 0
+    finally:
+        db.close()
+
+
+def test_course_out_exposes_seats_left():
+    """Test that CourseOut carries enrolled_count and seats_left"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 3)
+        enroll_student(db, _students(db, 1)[0], course.id)
+        out = CourseOut.model_validate(get_course(db, course.id))
+        assert out.enrolled_count == 1
+        assert out.seats_left == 2
+    finally:
+        db.close()
+
+
+def test_sharded_course_reports_live_seats_before_reconciliation():
+    """Test that the catalog row and CourseOut count shard claims before reconciliation folds them in"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 10)
+        update_course(db, course, CourseUpdate(counter_shards=4))
+        for user_id in _students(db, 3):
+            enroll_student(db, user_id, course.id)
+
+        row = get_active_course_row(db, course.id)
+        assert (row["enrolled_count"], row["seats_left"]) == (3, 7)
+        out = CourseOut.model_validate(get_course(db, course.id))
+        assert (out.enrolled_count, out.seats_left) == (3, 7)
+    finally:
+        db.close()
+
+
+def _enroll(user_id: int, course_id: int):
+    db = SessionLocal()
+    try:
+        enroll_student(db, user_id, course_id)
+        return True
+    except CourseFullError:
+        return False
+    finally:
+        db.close()
+
+
+def test_sharded_counter_never_overbooks():
+    """Test that a course split over 4 counter shards still fills exactly to capacity"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 7)
+        update_course(db, course, CourseUpdate(counter_shards=4))
+        shards = db.query(CourseSeatCounter).filter(CourseSeatCounter.course_id == course.id).all()
+        assert sorted(s.capacity for s in shards) == [1, 2, 2, 2]
+        user_ids = _students(db, 60)
+        course_id = course.id
+    finally:
+        db.close()
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda uid: _enroll(uid, course_id), user_ids))
+    assert results.count(True) == 7
+
+    db = SessionLocal()
+    try:
+        course = get_course(db, course_id)
+        assert seats_taken(db, course) == 7
+        # The course row only learns the total when counters are folded
+        reconcile_seat_counters(db)
+        assert _enrolled_count(course_id) == 7
+    finally:
+        db.close()
+
+
+def _reshard(course_id: int, shards: int):
+    db = SessionLocal()
+    try:
+        update_course(db, get_course(db, course_id), CourseUpdate(counter_shards=shards))
+    finally:
+        db.close()
+
+
+def test_claims_during_a_reshard_are_kept():
+    """Test that seats claimed while a course is resharded are neither lost nor overbooked"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 20)
+        # Claimed after this session loaded the course, before it reshards
+        other = SessionLocal()
+        try:
+            assert claim_seat(other, course.id)
+            other.commit()
+        finally:
+            other.close()
+        update_course(db, course, CourseUpdate(counter_shards=4))
+        assert seats_taken(db, course) == 1
+        course_id = course.id
+        user_ids = _students(db, 40)
+    finally:
+        db.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        enrolls = [pool.submit(_enroll, user_id, course_id) for user_id in user_ids]
+        reshards = [pool.submit(_reshard, course_id, shards) for shards in (1, 3, 1, 4, 2) * 2]
+        results = [f.result() for f in enrolls]
+        for f in reshards:
+            f.result()
+    assert results.count(True) == 19
+
+    db = SessionLocal()
+    try:
+        course = get_course(db, course_id)
+        enrolled = db.query(Enrollment).filter(Enrollment.course_id == course_id).count()
+        assert seats_taken(db, course) == enrolled + 1 == 20
+        assert reconcile_seat_counters(db) >= 1
+        assert seats_taken(db, get_course(db, course_id)) == 19
+    finally:
+        db.close()
+
+
+def test_reconcile_repairs_drift():
+    """Test that the reconciliation job rewrites a drifted counter"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 5)
+        enroll_student(db, _students(db, 1)[0], course.id)
+        course = get_course(db, course.id)
+        course.enrolled_count = 4
+        db.commit()
+
+        assert reconcile_seat_counters(db) >= 1
+        assert _enrolled_count(course.id) == 1
+    finally:
+        db.close()
+
+
+def test_bulk_removal_reports_removed_and_not_found():
+    """Test that set-based bulk removal reports exactly which users were removed"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 10)
+        a, b, c = _students(db, 3)
+        enroll_student(db, a, course.id)
+        enroll_student(db, b, course.id)
+
+        removed, not_found = bulk_remove_enrollments(db, course.id, [b, c, a, b])
+        assert removed == [b, a]
+        assert not_found == [c]
+        assert _enrolled_count(course.id) == 0
+    finally:
+        db.close()
+
+
+def test_user_deletion_releases_seats_in_every_course():
+    """Test that deleting a student frees their seat in all of their courses"""
+    db = SessionLocal()
+    try:
+        courses = [_course(db, 2) for _ in range(3)]
+        (student,) = _students(db, 1)
+        for course in courses:
+            enroll_student(db, student, course.id)
+        delete_user(db, get_user(db, student))
+        assert [_enrolled_count(course.id) for course in courses] == [0, 0, 0]
+    finally:
+        db.close()
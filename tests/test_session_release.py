@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, field_validator
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.core.database import engine
+from app.core.metrics import metrics
+from app.deps import ReleaseSessionRoute, get_db
+
+client = TestClient(app)
+
+
+# ========== SESSION RELEASE TESTS ==========
+
+def test_connection_returned_before_serialization():
+    """Test that the endpoint's connection is back in the pool while the response is serialized"""
+    held = {}
+
+    class Probe(BaseModel):
+        value: int
+
+        @field_validator("value")
+        @classmethod
+        def record(cls, value):
+            held["serializing"] = engine.pool.checkedout()
+            return value
+
+    router = APIRouter(route_class=ReleaseSessionRoute)
+
+    @router.get("/probe", response_model=Probe)
+    def probe(db: Session = Depends(get_db)):
+        value = db.execute(text("SELECT 1")).scalar()
+        held["handler"] = engine.pool.checkedout()
+        return {"value": value}
+
+    probe_app = FastAPI()
+    probe_app.include_router(router)
+    assert TestClient(probe_app).get("/probe").json() == {"value": 1}
+    assert held["serializing"] == held["handler"] - 1
+
+
+def test_rejected_token_never_checks_out_a_connection():
+    """Test that a bad token is refused before any pool checkout"""
+    client.get("/")
+    before = metrics._pools["sync"].checkouts
+    response = client.get("/api/v1/enrollment/all", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+    response = client.post("/api/v1/enrollment/", json={"course_id": 1}, headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+    assert metrics._pools["sync"].checkouts == before
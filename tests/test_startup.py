@@ -0,0 +1,65 @@
+import os
+import pytest
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+from benchmarks.startup import measure
+from app.core.metrics import count_statements
+from app.core.migrations import ALEMBIC_INI, current_revisions, head_revisions, migration_engine, upgrade_to_head
+from app.core.pooling import pool_settings_from_env
+
+# Generous ceilings for a cold interpreter on a slow CI box; the usual
+# numbers are well under half of these (python -m benchmarks.startup)
+IMPORT_BUDGET_SECONDS = 4.0
+FIRST_200_BUDGET_SECONDS = 8.0
+
+
+# ========== STARTUP TESTS ==========
+
+def test_cold_start_within_budget():
+    """Test that importing app.main loads neither Alembic nor the engine, and the first request succeeds"""
+    result = measure()
+    assert result["alembic_loaded"] is False
+    assert result["engine_created"] is False
+    assert result["status"] == 200
+    assert result["import_seconds"] < IMPORT_BUDGET_SECONDS
+    assert result["first_200_seconds"] < FIRST_200_BUDGET_SECONDS
+
+
+def test_import_without_database_url():
+    """Test that the app module imports without DATABASE_URL; only database use needs it"""
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    result = measure(first_request=False, env=env)
+    assert result["engine_created"] is False
+
+
+def test_upgrade_skipped_at_head(tmp_path):
+    """Test that an up-to-date database costs one query and never runs the migration environment"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    assert current_revisions(engine) == set()
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) PRIMARY KEY)"))
+        for head in head_revisions(Config(ALEMBIC_INI)):
+            conn.execute(text("INSERT INTO alembic_version VALUES (:head)"), {"head": head})
+
+    with count_statements(engine) as statements:
+        assert upgrade_to_head(engine) is False
+    assert statements == ["SELECT version_num FROM alembic_version"]
+    engine.dispose()
+
+
+def test_migration_needs_direct_connection_behind_pgbouncer(monkeypatch, tmp_path):
+    """Test that AUTO_MIGRATE refuses PgBouncer without MIGRATION_DATABASE_URL, and uses that URL when set"""
+    monkeypatch.setenv("DB_POOL_PROFILE", "pgbouncer")
+    bouncer = pool_settings_from_env()
+    app_engine = create_engine("postgresql://u:p@pgbouncer:6432/app")
+    with pytest.raises(ValueError, match="MIGRATION_DATABASE_URL"):
+        migration_engine(app_engine, url="", settings=bouncer)
+
+    direct = migration_engine(app_engine, url="postgres://u:p@db:5432/app", settings=bouncer)
+    assert direct is not app_engine
+    assert (direct.url.drivername, direct.url.host, direct.url.port) == ("postgresql", "db", 5432)
+    direct.dispose()
+
+    monkeypatch.setenv("DB_POOL_PROFILE", "queue")
+    assert migration_engine(app_engine, url="", settings=pool_settings_from_env()) is app_engine
@@ -14,7 +14,7 @@ def _random_email(prefix: str):
 
 # ========== USER REGISTRATION & LOGIN TESTS ==========
 
-def test_register_student_success():
+def test_register_student_success(query_budget):
     """Test successful student registration"""
     user_data = {
         "name": "Test Student",
@@ -22,7 +22,8 @@ def test_register_student_success():
         "password": "testpassword123",
         "role": "student"
     }
-    response = client.post("/users/register", json=user_data)
+    with query_budget(3):
+        response = client.post("/api/v1/auth/signup", json=user_data)
     assert response.status_code == 200
     data = response.json()
     assert data["email"] == user_data["email"]
@@ -31,7 +32,7 @@ def test_register_student_success():
     assert "id" in data
 
 
-def test_register_admin_success():
+def test_register_admin_success(query_budget):
     """Test successful admin registration"""
     user_data = {
         "name": "Test Admin",
@@ -39,12 +40,13 @@ def test_register_admin_success():
         "password": "adminpassword123",
         "role": "admin"
     }
-    response = client.post("/users/register", json=user_data)
+    with query_budget(3):
+        response = client.post("/api/v1/auth/signup", json=user_data)
     assert response.status_code == 200
     assert response.json()["role"] == "admin"
 
 
-def test_register_duplicate_email():
+def test_register_duplicate_email(query_budget):
     """Test that duplicate email registration fails"""
     email = _random_email("duplicate")
     user_data = {
@@ -54,12 +56,13 @@ def test_register_duplicate_email():
         "role": "student"
     }
     
-    client.post("/users/register", json=user_data)
-    response = client.post("/users/register", json=user_data)
+    client.post("/api/v1/auth/signup", json=user_data)
+    with query_budget(1):
+        response = client.post("/api/v1/auth/signup", json=user_data)
     assert response.status_code == 400
 
 
-def test_register_invalid_role():
+def test_register_invalid_role(query_budget):
     """Test that invalid role is rejected"""
     user_data = {
         "name": "Invalid User",
@@ -67,11 +70,12 @@ def test_register_invalid_role():
         "password": "password123",
         "role": "superuser"
     }
-    response = client.post("/users/register", json=user_data)
+    with query_budget(0):
+        response = client.post("/api/v1/auth/signup", json=user_data)
     assert response.status_code == 400
 
 
-def test_login_success():
+def test_login_success(query_budget):
     """Test successful login"""
     email = _random_email("login_test")
     password = "correctpassword123"
@@ -82,16 +86,17 @@ def test_login_success():
         "role": "student"
     }
     
-    client.post("/users/register", json=user_data)
+    client.post("/api/v1/auth/signup", json=user_data)
     
-    response = client.post("/users/login", data={"username": email, "password": password})
+    with query_budget(1):
+        response = client.post("/api/v1/auth/login", data={"username": email, "password": password})
     assert response.status_code == 200
     data = response.json()
     assert "access_token" in data
     assert data["token_type"] == "bearer"
 
 
-def test_login_wrong_password():
+def test_login_wrong_password(query_budget):
     """Test login with wrong password fails"""
     email = _random_email("wrong_pwd")
     user_data = {
@@ -101,15 +106,16 @@ def test_login_wrong_password():
         "role": "student"
     }
     
-    client.post("/users/register", json=user_data)
+    client.post("/api/v1/auth/signup", json=user_data)
     
-    response = client.post("/users/login", data={"username": email, "password": "wrongpassword"})
-    assert response.status_code == 400
+    with query_budget(1):
+        response = client.post("/api/v1/auth/login", data={"username": email, "password": "wrongpassword"})
+    assert response.status_code == 401
 
 
 # ========== USER PROFILE TESTS ==========
 
-def test_get_current_user_success():
+def test_get_current_user_success(query_budget):
     """Test getting current user profile"""
     email = _random_email("profile_test")
     user_data = {
@@ -119,60 +125,65 @@ def test_get_current_user_success():
         "role": "student"
     }
     
-    client.post("/users/register", json=user_data)
-    login_resp = client.post("/users/login", data={"username": email, "password": "password123"})
+    client.post("/api/v1/auth/signup", json=user_data)
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "password123"})
     token = login_resp.json()["access_token"]
     
-    response = client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+    with query_budget(1):
+        response = client.get("/api/v1/user/me", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 200
     data = response.json()
     assert data["email"] == email
 
 
-def test_get_current_user_unauthorized():
+def test_get_current_user_unauthorized(query_budget):
     """Test that unauthorized request fails"""
-    response = client.get("/users/me")
+    with query_budget(0):
+        response = client.get("/api/v1/user/me")
     assert response.status_code == 401
 
 
 # ========== ADMIN TESTS ==========
 
-def test_admin_get_all_students():
+def test_admin_get_all_students(query_budget):
     """Test admin can get all students"""
     admin_email = _random_email("admin")
     admin_data = {"name": "Admin", "email": admin_email, "password": "pass123", "role": "admin"}
-    client.post("/users/register", json=admin_data)
-    admin_login = client.post("/users/login", data={"username": admin_email, "password": "pass123"})
+    client.post("/api/v1/auth/signup", json=admin_data)
+    admin_login = client.post("/api/v1/auth/login", data={"username": admin_email, "password": "pass123"})
     admin_token = admin_login.json()["access_token"]
     
-    response = client.get("/users/students", headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(1):
+        response = client.get("/api/v1/user", headers={"Authorization": f"Bearer {admin_token}"})
     assert response.status_code == 200
 
 
-def test_student_cannot_get_all_students():
+def test_student_cannot_get_all_students(query_budget):
     """Test that student cannot get all students"""
     student_email = _random_email("student")
     student_data = {"name": "Student", "email": student_email, "password": "pass123", "role": "student"}
-    client.post("/users/register", json=student_data)
-    student_login = client.post("/users/login", data={"username": student_email, "password": "pass123"})
+    client.post("/api/v1/auth/signup", json=student_data)
+    student_login = client.post("/api/v1/auth/login", data={"username": student_email, "password": "pass123"})
     student_token = student_login.json()["access_token"]
     
-    response = client.get("/users/students", headers={"Authorization": f"Bearer {student_token}"})
+    with query_budget(0):
+        response = client.get("/api/v1/user", headers={"Authorization": f"Bearer {student_token}"})
     assert response.status_code == 403
 
 
-def test_admin_delete_student():
+def test_admin_delete_student(query_budget):
     """Test admin can delete student"""
     admin_email = _random_email("admin")
     admin_data = {"name": "Admin", "email": admin_email, "password": "pass123", "role": "admin"}
-    client.post("/users/register", json=admin_data)
-    admin_login = client.post("/users/login", data={"username": admin_email, "password": "pass123"})
+    client.post("/api/v1/auth/signup", json=admin_data)
+    admin_login = client.post("/api/v1/auth/login", data={"username": admin_email, "password": "pass123"})
     admin_token = admin_login.json()["access_token"]
     
     student_email = _random_email("student")
     student_data = {"name": "Student", "email": student_email, "password": "pass123", "role": "student"}
-    student_resp = client.post("/users/register", json=student_data)
+    student_resp = client.post("/api/v1/auth/signup", json=student_data)
     student_id = student_resp.json()["id"]
     
-    delete_resp = client.delete(f"/users/{student_id}", headers={"Authorization": f"Bearer {admin_token}"})
+    with query_budget(6):
+        delete_resp = client.delete(f"/api/v1/user/{student_id}", headers={"Authorization": f"Bearer {admin_token}"})
     assert delete_resp.status_code == 200
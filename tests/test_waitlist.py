@@ -0,0 +1,307 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from app.main import app
+from app.core.database import SessionLocal
+from app.crud.course import create_course, get_course, update_course, upsert_courses
+from app.crud.enrollment import (
+    AlreadyEnrolledError, AlreadyWaitlistedError, bulk_remove_enrollments, enroll_student, join_waitlist, remove_enrollment,
+)
+from app.crud.seats import seats_taken
+from app.crud.user import create_user
+from app.crud.waitlist import waitlist_position
+from app.models.enrollment import Enrollment
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.schemas.course import CourseCreate, CourseUpdate
+
+client = TestClient(app)
+
+
+def _random_email(prefix: str):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}@example.com"
+
+
+def _create_token(role: str):
+    """Helper to sign up a user and return (user_id, token)"""
+    email = _random_email(role)
+    signup_resp = client.post("/api/v1/auth/signup", json={"name": role.title(), "email": email, "password": "pass123", "role": role})
+    login_resp = client.post("/api/v1/auth/login", data={"username": email, "password": "pass123"})
+    return signup_resp.json()["id"], login_resp.json()["access_token"]
+
+
+def _course(db, capacity: int):
+    return create_course(db, CourseCreate(title="Waitlisted", code=f"WAIT_{uuid.uuid4().hex[:6]}", capacity=capacity))
+
+
+def _students(db, n: int):
+    return [create_user(db, "Student", _random_email("wait"), "x", "student").id for _ in range(n)]
+
+
+def _enrolled(db, course_id: int):
+    return set(db.execute(select(Enrollment.user_id).where(Enrollment.course_id == course_id)).scalars())
+
+
+def _queue(db, course_id: int):
+    return list(db.execute(
+        select(WaitlistEntry.user_id).where(WaitlistEntry.course_id == course_id).order_by(WaitlistEntry.id)
+    ).scalars())
+
+
+# ========== WAITLIST TESTS ==========
+
+def test_join_enrolls_while_seats_remain_then_queues():
+    """Test that joining enrolls into a free seat, then queues students in order with their positions"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db, 1).id
+    finally:
+        db.close()
+    tokens = [_create_token("student")[1] for _ in range(3)]
+
+    first = client.post(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {tokens[0]}"})
+    assert first.status_code == 200
+    assert first.json()["status"] == "enrolled"
+    assert first.json()["enrollment_id"] is not None
+
+    for expected, token in enumerate(tokens[1:], start=1):
+        resp = client.post(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200
+        assert resp.json() == {"course_id": course_id, "status": "waitlisted", "position": expected, "enrollment_id": None}
+
+    resp = client.get(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {tokens[2]}"})
+    assert resp.json()["position"] == 2
+
+    again = client.post(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {tokens[2]}"})
+    assert again.status_code == 400
+    assert again.json()["detail"] == AlreadyWaitlistedError.message
+
+    enrolled = client.post(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {tokens[0]}"})
+    assert enrolled.status_code == 400
+    assert enrolled.json()["detail"] == AlreadyEnrolledError.message
+
+
+def test_deregister_promotes_head_of_waitlist():
+    """Test that a student dropping the course hands their seat to the first waitlisted student"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db, 1).id
+    finally:
+        db.close()
+    (_, holder), (head_id, head), (_, second) = (_create_token("student") for _ in range(3))
+    for token in (holder, head, second):
+        client.post(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {token}"})
+
+    resp = client.delete(f"/api/v1/enrollment/{course_id}", headers={"Authorization": f"Bearer {holder}"})
+    assert resp.status_code == 200
+
+    mine = client.get("/api/v1/enrollment/my-enrollments", headers={"Authorization": f"Bearer {head}"})
+    assert [e["course_id"] for e in mine.json()] == [course_id]
+    resp = client.get(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {head}"})
+    assert resp.status_code == 404
+    resp = client.get(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {second}"})
+    assert resp.json()["position"] == 1
+
+    db = SessionLocal()
+    try:
+        assert _enrolled(db, course_id) == {head_id}
+        assert get_course(db, course_id).enrolled_count == 1
+    finally:
+        db.close()
+
+
+def test_leave_waitlist():
+    """Test that leaving removes the entry and moves later students up"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db, 1).id
+    finally:
+        db.close()
+    tokens = [_create_token("student")[1] for _ in range(3)]
+    for token in tokens:
+        client.post(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {token}"})
+
+    resp = client.delete(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {tokens[1]}"})
+    assert resp.status_code == 200
+    resp = client.delete(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {tokens[1]}"})
+    assert resp.status_code == 404
+    resp = client.get(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {tokens[2]}"})
+    assert resp.json()["position"] == 1
+
+
+def test_admin_cannot_join_waitlist():
+    """Test that only students may join a waitlist"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db, 1).id
+    finally:
+        db.close()
+    _, admin_token = _create_token("admin")
+    resp = client.post(f"/api/v1/enrollment/waitlist/{course_id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert resp.status_code == 403
+
+
+def test_capacity_increase_promotes_in_order():
+    """Test that raising capacity in update_course seats the head of the queue, sharded or not"""
+    db = SessionLocal()
+    try:
+        for shards in (1, 4):
+            course = _course(db, 1)
+            update_course(db, course, CourseUpdate(counter_shards=shards))
+            holder, *queued = _students(db, 5)
+            for user_id in [holder, *queued]:
+                join_waitlist(db, user_id, course.id)
+
+            update_course(db, course, CourseUpdate(capacity=3))
+            assert _enrolled(db, course.id) == {holder, *queued[:2]}
+            assert _queue(db, course.id) == queued[2:]
+            assert seats_taken(db, get_course(db, course.id)) == 3
+    finally:
+        db.close()
+
+
+def test_import_capacity_increase_promotes():
+    """Test that a course import raising capacity seats the head of the queue, sharded or not"""
+    db = SessionLocal()
+    try:
+        for shards in (1, 4):
+            course = _course(db, 1)
+            update_course(db, course, CourseUpdate(counter_shards=shards))
+            course_id, code = course.id, course.code
+            holder, *queued = _students(db, 4)
+            for user_id in [holder, *queued]:
+                join_waitlist(db, user_id, course_id)
+
+            inserted, updated = upsert_courses(db, [{"title": "Waitlisted", "code": code, "capacity": 3}])
+            assert (inserted, updated) == ([], [code])
+            assert _enrolled(db, course_id) == {holder, *queued[:2]}
+            assert _queue(db, course_id) == queued[2:]
+            assert seats_taken(db, get_course(db, course_id)) == 3
+    finally:
+        db.close()
+
+
+def test_admin_removals_promote():
+    """Test that admin single and bulk removals both hand their seats to the queue"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 3)
+        holders = _students(db, 3)
+        queued = _students(db, 4)
+        for user_id in holders + queued:
+            join_waitlist(db, user_id, course.id)
+
+        assert remove_enrollment(db, holders[0], course.id)
+        assert _enrolled(db, course.id) == {*holders[1:], queued[0]}
+
+        removed, _ = bulk_remove_enrollments(db, course.id, holders[1:])
+        assert len(removed) == 2
+        assert _enrolled(db, course.id) == set(queued[:3])
+        assert _queue(db, course.id) == queued[3:]
+        assert get_course(db, course.id).enrolled_count == 3
+    finally:
+        db.close()
+
+
+def test_promotion_skips_students_already_enrolled():
+    """Test that a queued student who is already enrolled leaves the queue without taking a second seat"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 1)
+        holder, early, later = _students(db, 3)
+        for user_id in (holder, early, later):
+            join_waitlist(db, user_id, course.id)
+        # As if `early` had got in through another path while queued
+        db.execute(insert(Enrollment).values(user_id=early, course_id=course.id))
+        db.commit()
+
+        remove_enrollment(db, holder, course.id)
+        assert _enrolled(db, course.id) == {early, later}
+        assert _queue(db, course.id) == []
+    finally:
+        db.close()
+
+
+def test_position_lookup_reads_only_the_index(query_budget):
+    """Test that a position lookup is a single statement"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db, 1).id
+        students = _students(db, 4)
+        for user_id in students:
+            join_waitlist(db, user_id, course_id)
+        with query_budget(1):
+            assert waitlist_position(db, students[3], course_id) == 3
+        assert waitlist_position(db, _students(db, 1)[0], course_id) is None
+    finally:
+        db.close()
+
+
+def test_promotion_cost_independent_of_queue_depth(query_budget):
+    """Test that a drop from a course with a deep waitlist runs a fixed handful of statements"""
+    db = SessionLocal()
+    try:
+        course = _course(db, 1)
+        holder = _students(db, 1)[0]
+        enroll_student(db, holder, course.id)
+        tag = uuid.uuid4().hex[:8]
+        db.execute(insert(User), [
+            {"name": "Student", "email": f"queue_{tag}_{i}@example.com", "hashed_password": "x", "role": "student", "is_active": True}
+            for i in range(2000)
+        ])
+        queued = db.execute(select(User.id).where(User.email.like(f"queue_{tag}_%")).order_by(User.id)).scalars().all()
+        db.execute(insert(WaitlistEntry), [{"user_id": user_id, "course_id": course.id} for user_id in queued])
+        db.commit()
+
+        with query_budget(13):
+            remove_enrollment(db, holder, course.id)
+        assert _enrolled(db, course.id) == {queued[0]}
+        assert db.execute(select(func.count()).select_from(WaitlistEntry).where(WaitlistEntry.course_id == course.id)).scalar() == 1999
+    finally:
+        db.close()
+
+
+def test_parallel_drops_and_joins_never_overbook():
+    """Test that concurrent drops and joins keep the course at capacity with no student both seated and queued"""
+    db = SessionLocal()
+    try:
+        course_id = _course(db, 5).id
+        holders = _students(db, 5)
+        for user_id in holders:
+            enroll_student(db, user_id, course_id)
+        joiners = _students(db, 30)
+    finally:
+        db.close()
+
+    def drop(user_id):
+        session = SessionLocal()
+        try:
+            remove_enrollment(session, user_id, course_id)
+        finally:
+            session.close()
+
+    def join(user_id):
+        session = SessionLocal()
+        try:
+            join_waitlist(session, user_id, course_id)
+        finally:
+            session.close()
+
+    tasks = [(join, user_id) for user_id in joiners]
+    for i, user_id in enumerate(holders):
+        tasks.insert(i * 6, (drop, user_id))
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda task: task[0](task[1]), tasks))
+
+    db = SessionLocal()
+    try:
+        enrolled = _enrolled(db, course_id)
+        queued = _queue(db, course_id)
+        assert len(enrolled) == 5
+        assert get_course(db, course_id).enrolled_count == 5
+        assert not enrolled & set(queued)
+        assert enrolled | set(queued) == set(joiners)
+    finally:
+        db.close()